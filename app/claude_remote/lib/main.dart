@@ -1,5 +1,6 @@
 import 'dart:async';
 import 'dart:convert';
+import 'dart:io' show zlib;
 import 'package:flutter/material.dart';
 import 'package:web_socket_channel/web_socket_channel.dart';
 import 'package:flutter_local_notifications/flutter_local_notifications.dart';
@@ -182,9 +183,27 @@ class _HomeScreenState extends State<HomeScreen> with WidgetsBindingObserver {
   int? _currentHwnd;
   String _windowTitle = "";
   Map<String, dynamic>? _currentRequest;
+  // API 프록시가 스트림에서 먼저 찾은 tool_use (권한 요청 / 작업 결과가 오면 사라짐)
+  Map<String, dynamic>? _toolPreview;
+  // 응답을 기다리는 권한 요청 (여러 개면 일괄 응답 가능)
+  final List<Map<String, dynamic>> _pendingRequests = [];
   final List<Map<String, dynamic>> _history = [];
   String? _lastClaudeResponse;
 
+  // 서버에 요청한 blob 전체 내용 (ref -> 응답 대기)
+  final Map<String, Completer<String?>> _blobRequests = {};
+
+  // Claude 세션 목록 + 구독 중인 세션 (null이면 전체)
+  List<Map<String, dynamic>> _sessions = [];
+  String? _sessionFilter;
+
+  // 서버 권한 정책 규칙 (allow / deny / ask)
+  List<Map<String, dynamic>> _policyRules = [];
+
+  // 세션 재개용 (서버 epoch + 마지막으로 받은 seq)
+  String? _serverEpoch;
+  int _lastSeq = 0;
+
   Timer? _reconnectTimer;
   Timer? _pingTimer;
 
@@ -206,11 +225,19 @@ class _HomeScreenState extends State<HomeScreen> with WidgetsBindingObserver {
     if (_currentRequest != null) {
       setState(() {
         _history.insert(0, {..._currentRequest!, 'type': 'permission', 'decision': 'handled'});
-        _currentRequest = null;
+        _removePending([_currentRequest!['request_id']]);
       });
     }
   }
 
+  // 처리된 요청을 대기 목록에서 제거하고 다음 요청 표시 (setState 안에서 호출)
+  void _removePending(List ids) {
+    _pendingRequests.removeWhere((r) => ids.contains(r['request_id']));
+    if (_currentRequest == null || ids.contains(_currentRequest!['request_id'])) {
+      _currentRequest = _pendingRequests.isNotEmpty ? _pendingRequests.last : null;
+    }
+  }
+
   Future<void> _requestNotificationPermission() async {
     final android = notificationsPlugin.resolvePlatformSpecificImplementation<
         AndroidFlutterLocalNotificationsPlugin>();
@@ -268,7 +295,13 @@ class _HomeScreenState extends State<HomeScreen> with WidgetsBindingObserver {
 
     try {
       final address = _addressController.text.trim();
-      _channel = WebSocketChannel.connect(Uri.parse('ws://$address'));
+      // 이전 연결이 있으면 마지막 seq부터 재개 요청
+      final query = <String>[
+        if (_serverEpoch != null) 'epoch=$_serverEpoch&resume=$_lastSeq',
+        if (_sessionFilter != null) 'sessions=$_sessionFilter',
+      ];
+      final resume = query.isNotEmpty ? '/?${query.join('&')}' : '';
+      _channel = WebSocketChannel.connect(Uri.parse('ws://$address$resume'));
       globalChannel = _channel;
 
       _channel!.stream.listen(
@@ -282,6 +315,13 @@ class _HomeScreenState extends State<HomeScreen> with WidgetsBindingObserver {
             final data = jsonDecode(message);
             final type = data['type'];
 
+          if (type == 'hello') {
+            _serverEpoch = data['epoch'];
+            if (data['resumed'] != true) _lastSeq = data['seq'] ?? 0;
+            return;
+          }
+          if (data['seq'] is int) _lastSeq = data['seq'];
+
           if (type == 'permission_request') {
             currentRequestId = data['request_id'];
             final prefs = await SharedPreferences.getInstance();
@@ -295,14 +335,98 @@ class _HomeScreenState extends State<HomeScreen> with WidgetsBindingObserver {
               body = toolInput['file_path'].toString();
             }
             showPermissionNotification('Claude Permission', body);
-            setState(() => _currentRequest = Map<String, dynamic>.from(data));
+            setState(() {
+              final request = Map<String, dynamic>.from(data);
+              // 구간별 지연 추적: 화면에 표시한 시각 (응답 때 서버로 전달)
+              request['_received_at'] = DateTime.now().millisecondsSinceEpoch;
+              _pendingRequests.removeWhere((r) => r['request_id'] == request['request_id']);
+              _pendingRequests.add(request);
+              _currentRequest = request;
+              _toolPreview = null;
+            });
+
+          } else if (type == 'permission_update') {
+            // 같은 내용의 요청이 합쳐짐 (한 번 응답으로 모두 처리)
+            setState(() {
+              for (final r in _pendingRequests) {
+                if (r['request_id'] == data['request_id']) r['count'] = data['count'];
+              }
+            });
+
+          } else if (type == 'permission_resolved') {
+            // 다른 앱 / 일괄 응답으로 결정된 요청 정리
+            final ids = (data['request_ids'] as List?) ?? [];
+            if (_currentRequest != null && ids.contains(_currentRequest!['request_id'])) {
+              notificationsPlugin.cancel(0);
+            }
+            setState(() => _removePending(ids));
+
+          } else if (type == 'permission_auto') {
+            // 서버 정책 규칙으로 자동 결정된 권한 요청
+            setState(() {
+              _history.insert(0, {
+                ...data,
+                'type': 'permission',
+                'auto': true,
+                'timestamp': DateTime.now().toString().split('.')[0],
+              });
+              if (_history.length > 100) _history.removeLast();
+            });
+
+          } else if (type == 'policy') {
+            setState(() {
+              _policyRules = ((data['rules'] as List?) ?? [])
+                  .map((r) => Map<String, dynamic>.from(r))
+                  .toList();
+            });
+            if (data['error'] != null) _showStatusMessage(data['error'], false);
 
           } else if (type == 'tool_result') {
             setState(() {
+              _toolPreview = null;
               _history.insert(0, {...data, 'type': 'tool_result'});
               if (_history.length > 100) _history.removeLast();
             });
 
+          } else if (type == 'sessions') {
+            setState(() {
+              _sessions = ((data['sessions'] as List?) ?? [])
+                  .map((e) => Map<String, dynamic>.from(e))
+                  .toList();
+            });
+
+          } else if (type == 'session_update') {
+            final session = Map<String, dynamic>.from(data['session']);
+            setState(() {
+              _sessions.removeWhere((e) => e['session_id'] == session['session_id']);
+              _sessions.insert(0, session);
+            });
+
+          } else if (type == 'subscribed') {
+            // 구독 범위가 바뀌면 이어서 오는 history_sync로 다시 채움
+            setState(() => _history.clear());
+
+          } else if (type == 'blob') {
+            // 미리보기로 받은 내용의 전체 (zlib+base64 압축일 수 있음)
+            final completer = _blobRequests.remove(data['ref']);
+            if (completer == null) return;
+            String? content = data['content'];
+            if (content != null && data['encoding'] == 'zlib+base64') {
+              content = utf8.decode(zlib.decode(base64Decode(content)));
+            }
+            completer.complete(content);
+
+          } else if (type == 'tool_result_batch') {
+            // 서버가 모아서 보낸 tool_result 여러 개 (한 번만 다시 그림)
+            final items = (data['items'] as List?) ?? [];
+            setState(() {
+              _toolPreview = null;
+              for (final item in items) {
+                _history.insert(0, {...item, 'type': 'tool_result'});
+              }
+              while (_history.length > 100) _history.removeLast();
+            });
+
           } else if (type == 'hwnd_update') {
             setState(() {
               _currentHwnd = data['hwnd'];
@@ -339,19 +463,79 @@ class _HomeScreenState extends State<HomeScreen> with WidgetsBindingObserver {
           } else if (type == 'pong') {
             // keep-alive response
 
+          } else if (type == 'tool_use_preview') {
+            // API 프록시가 스트림에서 찾은 tool_use (Hook보다 먼저 도착하는 미리보기)
+            setState(() => _toolPreview = Map<String, dynamic>.from(data));
+
+          } else if (type == 'claude_stream') {
+            // API 프록시가 전달한 생성 중인 텍스트 (토큰 단위로 이어 붙임)
+            final text = data['text']?.toString() ?? '';
+            if (text.isEmpty) return;
+            setState(() {
+              if (_history.isNotEmpty && _history[0]['live'] == true &&
+                  _history[0]['message_id'] == data['message_id']) {
+                _history[0] = {
+                  ..._history[0],
+                  'response': '${_history[0]['response']}$text',
+                };
+              } else {
+                _history.insert(0, {
+                  'type': 'claude_response',
+                  'response': text,
+                  'live': true,
+                  'streamed': true,
+                  'message_id': data['message_id'],
+                  'timestamp': DateTime.now().toString().split('.')[0],
+                });
+                if (_history.length > 100) _history.removeLast();
+              }
+            });
+
+          } else if (type == 'claude_delta') {
+            // 턴 진행 중 실시간 Claude 출력 (텍스트 블록만 표시)
+            // 프록시 스트림으로 이미 표시 중이면 transcript 내용은 중복이므로 무시
+            if (_history.isNotEmpty && _history[0]['streamed'] == true) return;
+            final text = ((data['blocks'] as List?) ?? [])
+                .where((b) => b['kind'] == 'text')
+                .map((b) => b['text'].toString())
+                .join('\n');
+            if (text.isEmpty) return;
+            setState(() {
+              if (_history.isNotEmpty && _history[0]['live'] == true) {
+                _history[0] = {
+                  ..._history[0],
+                  'response': '${_history[0]['response']}\n$text',
+                };
+              } else {
+                _history.insert(0, {
+                  'type': 'claude_response',
+                  'response': text,
+                  'live': true,
+                  'timestamp': DateTime.now().toString().split('.')[0],
+                });
+                if (_history.length > 100) _history.removeLast();
+              }
+            });
+
           } else if (type == 'claude_response') {
             // Claude 응답 수신
             final response = data['response'] ?? '';
             _showStatusMessage('Claude: ${response.length} chars', true);
             setState(() {
+              _toolPreview = null;
               _lastClaudeResponse = response;
-              // 히스토리에도 추가
-              _history.insert(0, {
+              final item = {
                 'type': 'claude_response',
                 'response': response,
                 'timestamp': DateTime.now().toString().split('.')[0],
-              });
-              if (_history.length > 100) _history.removeLast();
+              };
+              // 실시간 카드가 맨 위에 있으면 최종 응답으로 교체, 아니면 히스토리에 추가
+              if (_history.isNotEmpty && _history[0]['live'] == true) {
+                _history[0] = item;
+              } else {
+                _history.insert(0, item);
+                if (_history.length > 100) _history.removeLast();
+              }
             });
           }
           } catch (e) {
@@ -385,10 +569,14 @@ class _HomeScreenState extends State<HomeScreen> with WidgetsBindingObserver {
     _channel?.sink.close();
     _channel = null;
     globalChannel = null;
+    // 직접 끊은 뒤에는 화면 상태를 비우므로 다음 연결은 재개 대신 전체 동기화
+    _serverEpoch = null;
+    _lastSeq = 0;
     setState(() {
       _isConnecting = false;
       _isConnected = false;
       _currentRequest = null;
+      _pendingRequests.clear();
       _currentHwnd = null;
       _windowTitle = "";
     });
@@ -403,13 +591,16 @@ class _HomeScreenState extends State<HomeScreen> with WidgetsBindingObserver {
     }
   }
 
+  bool get _canSend => _currentHwnd != null || _sessionFilter != null;
+
   void _sendCommand() {
     final message = _messageController.text.trim();
-    if (message.isEmpty || _channel == null || _currentHwnd == null) return;
+    if (message.isEmpty || _channel == null || !_canSend) return;
 
+    // 세션을 골랐으면 서버가 그 세션 창으로 전송
     _channel!.sink.add(jsonEncode({
       'type': 'command',
-      'hwnd': _currentHwnd,
+      if (_sessionFilter != null) 'session_id': _sessionFilter else 'hwnd': _currentHwnd,
       'message': message,
     }));
 
@@ -433,6 +624,9 @@ class _HomeScreenState extends State<HomeScreen> with WidgetsBindingObserver {
       'type': 'permission_response',
       'request_id': _currentRequest!['request_id'],
       'decision': decision,
+      'trace_id': _currentRequest!['trace_id'],
+      'app_received_at': _currentRequest!['_received_at'],
+      'app_decided_at': DateTime.now().millisecondsSinceEpoch,
     }));
 
     notificationsPlugin.cancel(0);
@@ -443,7 +637,28 @@ class _HomeScreenState extends State<HomeScreen> with WidgetsBindingObserver {
 
     setState(() {
       _history.insert(0, {..._currentRequest!, 'type': 'permission', 'decision': decision});
-      _currentRequest = null;
+      _removePending([_currentRequest!['request_id']]);
+    });
+  }
+
+  void _respondAllPermissions(String decision) {
+    if (_pendingRequests.isEmpty || _channel == null) return;
+
+    final ids = _pendingRequests.map((r) => r['request_id']).toList();
+    _channel!.sink.add(jsonEncode({
+      'type': 'permission_batch',
+      'request_ids': ids,
+      'decision': decision,
+    }));
+
+    notificationsPlugin.cancel(0);
+    currentRequestId = null;
+
+    setState(() {
+      for (final r in _pendingRequests) {
+        _history.insert(0, {...r, 'type': 'permission', 'decision': decision});
+      }
+      _removePending(ids);
     });
   }
 
@@ -495,6 +710,252 @@ class _HomeScreenState extends State<HomeScreen> with WidgetsBindingObserver {
     _channel!.sink.add(jsonEncode({'type': 'refresh_windows'}));
   }
 
+  Future<String?> _fetchBlob(String ref) {
+    if (_channel == null) return Future.value(null);
+    final completer = _blobRequests.putIfAbsent(ref, () {
+      _channel!.sink.add(jsonEncode({'type': 'blob_fetch', 'ref': ref, 'compress': true}));
+      return Completer<String?>();
+    });
+    return completer.future.timeout(const Duration(seconds: 10), onTimeout: () {
+      _blobRequests.remove(ref);
+      return null;
+    });
+  }
+
+  // 미리보기로 잘린 필드의 전체 내용 (blob이 없거나 가져오지 못하면 fallback)
+  Future<String> _fullText(Map item, String path, String fallback) async {
+    final blobs = item['blobs'];
+    if (blobs is Map && blobs[path] != null) {
+      return await _fetchBlob(blobs[path]['ref']) ?? fallback;
+    }
+    return fallback;
+  }
+
+  // 서버가 계산한 unified diff (추가 줄 초록, 삭제 줄 빨강)
+  Widget _buildDiff(Map diff) {
+    final lines = (diff['diff'] ?? '').toString().split('\n');
+    return Column(
+      crossAxisAlignment: CrossAxisAlignment.start,
+      children: [
+        Text(
+          '${diff['file_path']}  +${diff['added']} -${diff['removed']}',
+          style: TextStyle(fontSize: 12, color: Colors.grey[700]),
+        ),
+        const SizedBox(height: 4),
+        ConstrainedBox(
+          constraints: const BoxConstraints(maxHeight: 220),
+          child: SingleChildScrollView(
+            child: Column(
+              crossAxisAlignment: CrossAxisAlignment.start,
+              children: [
+                for (final line in lines)
+                  Text(
+                    line,
+                    style: TextStyle(
+                      fontFamily: 'monospace',
+                      fontSize: 12,
+                      color: line.startsWith('+')
+                          ? Colors.green[800]
+                          : (line.startsWith('-')
+                              ? Colors.red[700]
+                              : (line.startsWith('@@') ? Colors.blueGrey : Colors.black87)),
+                    ),
+                  ),
+                if (diff['truncated'] == true)
+                  Text('...', style: TextStyle(color: Colors.grey[600])),
+              ],
+            ),
+          ),
+        ),
+      ],
+    );
+  }
+
+  Future<void> _showToolDetails(Map item) async {
+    final blobs = item['blobs'] is Map ? item['blobs'] as Map : {};
+    final parts = <String>[];
+    if (item['diff'] is Map) parts.add(item['diff']['diff'] ?? '');
+    for (final path in blobs.keys) {
+      final text = await _fullText(item, path, '(not available)');
+      parts.add('[$path]\n$text');
+    }
+    _showResponseDialog(parts.join('\n\n'), title: item['tool_name'] ?? 'Details');
+  }
+
+  void _subscribeSession(String? sessionId) {
+    if (_channel == null) return;
+    setState(() => _sessionFilter = sessionId);
+    _channel!.sink.add(jsonEncode({
+      'type': 'subscribe',
+      'session_ids': sessionId != null ? [sessionId] : null,
+    }));
+  }
+
+  String _sessionLabel(Map session) {
+    final cwd = (session['cwd'] ?? '').toString();
+    final name = cwd.isNotEmpty ? cwd.split(RegExp(r'[\\/]')).last : 'session';
+    final id = session['session_id'].toString();
+    return '$name (${id.length > 8 ? id.substring(0, 8) : id})';
+  }
+
+  void _showSessionDialog() {
+    _channel?.sink.add(jsonEncode({'type': 'session_list'}));
+    showDialog(
+      context: context,
+      builder: (context) => AlertDialog(
+        title: const Text('Claude Sessions'),
+        content: SizedBox(
+          width: double.maxFinite,
+          child: ListView(
+            shrinkWrap: true,
+            children: [
+              ListTile(
+                leading: const Icon(Icons.all_inclusive),
+                title: const Text('All sessions'),
+                selected: _sessionFilter == null,
+                onTap: () {
+                  Navigator.pop(context);
+                  _subscribeSession(null);
+                },
+              ),
+              for (final session in _sessions)
+                ListTile(
+                  leading: const Icon(Icons.terminal),
+                  title: Text(_sessionLabel(session)),
+                  subtitle: Text('HWND: ${session['hwnd'] ?? '-'}  pending: ${session['pending']}'),
+                  selected: _sessionFilter == session['session_id'],
+                  onTap: () {
+                    Navigator.pop(context);
+                    _subscribeSession(session['session_id']);
+                  },
+                ),
+            ],
+          ),
+        ),
+        actions: [
+          TextButton(
+            onPressed: () => Navigator.pop(context),
+            child: const Text('Close'),
+          ),
+        ],
+      ),
+    );
+  }
+
+  void _showPolicyDialog() {
+    if (_channel == null) return;
+    _channel!.sink.add(jsonEncode({'type': 'policy_list'}));
+
+    String action = 'allow';
+    final toolController = TextEditingController();
+    final patternController = TextEditingController();
+
+    showDialog(
+      context: context,
+      builder: (context) => StatefulBuilder(
+        builder: (context, setDialogState) => AlertDialog(
+          title: const Text('Permission Rules'),
+          content: SizedBox(
+            width: double.maxFinite,
+            child: Column(
+              mainAxisSize: MainAxisSize.min,
+              children: [
+                Flexible(
+                  child: _policyRules.isEmpty
+                      ? const Padding(
+                          padding: EdgeInsets.all(8),
+                          child: Text('No rules'),
+                        )
+                      : ListView.builder(
+                          shrinkWrap: true,
+                          itemCount: _policyRules.length,
+                          itemBuilder: (context, index) {
+                            final r = _policyRules[index];
+                            final pattern = r['command'] ?? r['file_path'] ?? '*';
+                            return ListTile(
+                              dense: true,
+                              leading: Icon(
+                                r['action'] == 'allow'
+                                    ? Icons.check_circle
+                                    : (r['action'] == 'deny' ? Icons.cancel : Icons.help),
+                                color: r['action'] == 'allow'
+                                    ? Colors.green
+                                    : (r['action'] == 'deny' ? Colors.red : Colors.orange),
+                              ),
+                              title: Text('${r['tool_name']}'),
+                              subtitle: Text('$pattern',
+                                  maxLines: 1, overflow: TextOverflow.ellipsis),
+                              trailing: IconButton(
+                                icon: const Icon(Icons.delete_outline),
+                                onPressed: () {
+                                  _channel?.sink.add(jsonEncode({
+                                    'type': 'policy_remove',
+                                    'rule_id': r['id'],
+                                  }));
+                                  setDialogState(() => _policyRules.removeAt(index));
+                                },
+                              ),
+                            );
+                          },
+                        ),
+                ),
+                const Divider(),
+                Row(
+                  children: [
+                    DropdownButton<String>(
+                      value: action,
+                      items: const ['allow', 'deny', 'ask']
+                          .map((a) => DropdownMenuItem(value: a, child: Text(a)))
+                          .toList(),
+                      onChanged: (v) => setDialogState(() => action = v ?? 'allow'),
+                    ),
+                    const SizedBox(width: 8),
+                    Expanded(
+                      child: TextField(
+                        controller: toolController,
+                        decoration: const InputDecoration(
+                          labelText: 'Tool (e.g. Bash)',
+                          isDense: true,
+                        ),
+                      ),
+                    ),
+                  ],
+                ),
+                TextField(
+                  controller: patternController,
+                  decoration: const InputDecoration(
+                    labelText: 'Command / path pattern (glob, optional)',
+                    isDense: true,
+                  ),
+                ),
+              ],
+            ),
+          ),
+          actions: [
+            TextButton(
+              onPressed: () => Navigator.pop(context),
+              child: const Text('Close'),
+            ),
+            TextButton(
+              onPressed: () {
+                final tool = toolController.text.trim();
+                final pattern = patternController.text.trim();
+                if (tool.isEmpty) return;
+                final rule = <String, dynamic>{'action': action, 'tool_name': tool};
+                if (pattern.isNotEmpty) {
+                  rule[tool == 'Bash' ? 'command' : 'file_path'] = pattern;
+                }
+                _channel?.sink.add(jsonEncode({'type': 'policy_add', 'rule': rule}));
+                Navigator.pop(context);
+              },
+              child: const Text('Add'),
+            ),
+          ],
+        ),
+      ),
+    );
+  }
+
   void _openCmd() {
     if (_channel == null) return;
     _channel!.sink.add(jsonEncode({'type': 'open_cmd'}));
@@ -520,6 +981,18 @@ class _HomeScreenState extends State<HomeScreen> with WidgetsBindingObserver {
       appBar: AppBar(
         title: const Text('Claude Remote'),
         actions: [
+          if (_isConnected)
+            IconButton(
+              icon: Icon(_sessionFilter != null ? Icons.filter_alt : Icons.layers),
+              onPressed: _showSessionDialog,
+              tooltip: 'Sessions',
+            ),
+          if (_isConnected)
+            IconButton(
+              icon: const Icon(Icons.rule),
+              onPressed: _showPolicyDialog,
+              tooltip: 'Permission rules',
+            ),
           IconButton(
             icon: Icon(_keepAwake ? Icons.light_mode : Icons.light_mode_outlined),
             onPressed: _toggleKeepAwake,
@@ -635,6 +1108,40 @@ class _HomeScreenState extends State<HomeScreen> with WidgetsBindingObserver {
             ),
           ),
 
+          // 곧 실행될 도구 미리보기 (권한 요청 카드가 없을 때만)
+          if (_currentRequest == null && _toolPreview != null)
+            Container(
+              margin: const EdgeInsets.symmetric(horizontal: 12),
+              padding: const EdgeInsets.all(12),
+              decoration: BoxDecoration(
+                color: const Color(0xFFE3F2FD),
+                border: Border.all(color: Colors.blue.shade200),
+                borderRadius: BorderRadius.circular(12),
+              ),
+              child: Column(
+                crossAxisAlignment: CrossAxisAlignment.start,
+                children: [
+                  Row(
+                    children: [
+                      const Icon(Icons.bolt, color: Colors.blue, size: 20),
+                      const SizedBox(width: 6),
+                      Text('Upcoming: ${_toolPreview!['tool_name']}',
+                          style: const TextStyle(fontWeight: FontWeight.bold, color: Colors.black87)),
+                    ],
+                  ),
+                  const SizedBox(height: 6),
+                  _toolPreview!['diff'] is Map
+                      ? _buildDiff(_toolPreview!['diff'])
+                      : Text(
+                          _formatInput(_toolPreview!['tool_input']),
+                          style: const TextStyle(fontFamily: 'monospace', fontSize: 12, color: Colors.black87),
+                          maxLines: 3,
+                          overflow: TextOverflow.ellipsis,
+                        ),
+                ],
+              ),
+            ),
+
           // 권한 요청 카드
           if (_currentRequest != null)
             Container(
@@ -655,6 +1162,10 @@ class _HomeScreenState extends State<HomeScreen> with WidgetsBindingObserver {
                         const SizedBox(width: 8),
                         const Text('Permission Request',
                             style: TextStyle(fontSize: 16, fontWeight: FontWeight.bold, color: Colors.black87)),
+                        const Spacer(),
+                        if ((_currentRequest!['count'] ?? 1) > 1)
+                          Text('x${_currentRequest!['count']}',
+                              style: const TextStyle(fontWeight: FontWeight.bold, color: Colors.deepOrange)),
                       ],
                     ),
                     const SizedBox(height: 10),
@@ -669,13 +1180,23 @@ class _HomeScreenState extends State<HomeScreen> with WidgetsBindingObserver {
                         borderRadius: BorderRadius.circular(6),
                         border: Border.all(color: Colors.grey.shade300),
                       ),
-                      child: Text(
-                        _formatInput(_currentRequest!['tool_input']),
-                        style: const TextStyle(fontFamily: 'monospace', fontSize: 13, color: Colors.black87),
-                        maxLines: 4,
-                        overflow: TextOverflow.ellipsis,
-                      ),
+                      child: _currentRequest!['diff'] is Map
+                          ? _buildDiff(_currentRequest!['diff'])
+                          : Text(
+                              _formatInput(_currentRequest!['tool_input']),
+                              style: const TextStyle(fontFamily: 'monospace', fontSize: 13, color: Colors.black87),
+                              maxLines: 4,
+                              overflow: TextOverflow.ellipsis,
+                            ),
                     ),
+                    if (_currentRequest!['blobs'] is Map)
+                      Align(
+                        alignment: Alignment.centerRight,
+                        child: TextButton(
+                          onPressed: () => _showToolDetails(_currentRequest!),
+                          child: const Text('Show full input'),
+                        ),
+                      ),
                     const SizedBox(height: 14),
                     Row(
                       children: [
@@ -716,6 +1237,23 @@ class _HomeScreenState extends State<HomeScreen> with WidgetsBindingObserver {
                         ),
                       ],
                     ),
+                    // 대기 중인 요청이 여러 개면 한 번에 응답
+                    if (_pendingRequests.length > 1)
+                      Row(
+                        children: [
+                          Text('${_pendingRequests.length} pending',
+                              style: TextStyle(fontSize: 12, color: Colors.grey[700])),
+                          const Spacer(),
+                          TextButton(
+                            onPressed: () => _respondAllPermissions('deny'),
+                            child: const Text('Deny all'),
+                          ),
+                          TextButton(
+                            onPressed: () => _respondAllPermissions('allow'),
+                            child: const Text('Allow all'),
+                          ),
+                        ],
+                      ),
                   ],
                 ),
               ),
@@ -780,7 +1318,8 @@ class _HomeScreenState extends State<HomeScreen> with WidgetsBindingObserver {
                         return Card(
                           color: Colors.grey.shade200,
                           child: InkWell(
-                            onTap: () => _showResponseDialog(item['response'] ?? ''),
+                            onTap: () async => _showResponseDialog(
+                                await _fullText(item, 'response', item['response'] ?? '')),
                             child: Padding(
                               padding: const EdgeInsets.all(12),
                               child: Column(
@@ -835,7 +1374,10 @@ class _HomeScreenState extends State<HomeScreen> with WidgetsBindingObserver {
                                     : Colors.red)
                                 : Colors.blue,
                           ),
-                          title: Text(toolName),
+                          onTap: item['blobs'] is Map || item['diff'] is Map
+                              ? () => _showToolDetails(item)
+                              : null,
+                          title: Text(item['auto'] == true ? '$toolName (auto)' : toolName),
                           subtitle: Text(
                             _formatInput(item['tool_input']),
                             maxLines: 1,
@@ -872,18 +1414,18 @@ class _HomeScreenState extends State<HomeScreen> with WidgetsBindingObserver {
                   child: TextField(
                     controller: _messageController,
                     decoration: InputDecoration(
-                      hintText: _currentHwnd != null ? 'Send command to Claude...' : 'Connect first...',
+                      hintText: _canSend ? 'Send command to Claude...' : 'Connect first...',
                       border: const OutlineInputBorder(),
                       isDense: true,
                     ),
-                    enabled: _isConnected && _currentHwnd != null,
+                    enabled: _isConnected && _canSend,
                     // onSubmitted 제거 - 한글 입력 중 의도치 않은 전송 방지
                     // 전송은 버튼으로만 가능
                   ),
                 ),
                 const SizedBox(width: 8),
                 IconButton.filled(
-                  onPressed: (_isConnected && _currentHwnd != null) ? _sendCommand : null,
+                  onPressed: (_isConnected && _canSend) ? _sendCommand : null,
                   icon: const Icon(Icons.send),
                 ),
               ],
@@ -912,7 +1454,7 @@ class _HomeScreenState extends State<HomeScreen> with WidgetsBindingObserver {
     });
   }
 
-  void _showResponseDialog(String response) {
+  void _showResponseDialog(String response, {String title = 'Claude Response'}) {
     showDialog(
       context: context,
       builder: (context) => AlertDialog(
@@ -920,7 +1462,7 @@ class _HomeScreenState extends State<HomeScreen> with WidgetsBindingObserver {
           children: [
             Icon(Icons.smart_toy, color: Colors.blue.shade700),
             const SizedBox(width: 8),
-            const Text('Claude Response'),
+            Flexible(child: Text(title)),
           ],
         ),
         content: SizedBox(
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Hook 프로세스 시작 + 전송 시간 벤치마크
+- 응답만 돌려주는 로컬 HTTP 스텁 서버를 띄우고 각 Hook 명령을 N번 실행
+- 얇은 클라이언트(hook_client.py) vs 기존 Hook 스크립트 비교
+  (기존 Hook은 win32gui가 없는 환경에서는 실행 실패로 표시됨)
+
+사용법:
+    python bench/bench_hook_startup.py --runs 30 --json
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+HOOKS = os.path.join(ROOT, 'hooks')
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """요청 본문을 읽고 빈 200 응답"""
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        self.send_response(200)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+def run_case(cmd, stdin, env, runs):
+    times = []
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        result = subprocess.run(cmd, input=stdin, env=env, capture_output=True)
+        elapsed = time.perf_counter() - t0
+        if result.returncode != 0:
+            return {"error": result.stderr.decode('utf-8', errors='replace').strip().splitlines()[-1:]}
+        times.append(elapsed * 1000)
+    times.sort()
+    return {
+        "min_ms": round(times[0], 2),
+        "median_ms": round(statistics.median(times), 2),
+        "p90_ms": round(times[int(len(times) * 0.9) - 1 if len(times) >= 10 else -1], 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--runs', type=int, default=20)
+    parser.add_argument('--port', type=int, default=8765, help='스텁 서버 포트 (기존 Hook은 8765 고정)')
+    parser.add_argument('--json', action='store_true')
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(('127.0.0.1', args.port), StubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    with tempfile.NamedTemporaryFile('w', suffix='.jsonl', delete=False) as f:
+        f.write(json.dumps({"type": "assistant", "message": {"content": [{"type": "text", "text": "done"}]}}) + "\n")
+        transcript = f.name
+
+    payload = json.dumps({
+        "session_id": "bench", "transcript_path": transcript, "hook_event_name": "PostToolUse",
+        "tool_name": "Read", "tool_input": {"file_path": "/tmp/x"}, "tool_response": "ok"
+    }).encode('utf-8')
+    env = dict(os.environ, CLAUDE_REMOTE_STOP_OFFSETS="0")
+    port = str(args.port)
+    py = sys.executable
+
+    cases = {
+        "python (empty)": [py, '-c', 'pass'],
+        "python -S (empty)": [py, '-S', '-c', 'pass'],
+        "hook_client.py tool-result": [py, os.path.join(HOOKS, 'hook_client.py'), 'tool-result', port],
+        "python -S hook_client.py tool-result": [py, '-S', os.path.join(HOOKS, 'hook_client.py'), 'tool-result', port],
+        "hook_post_tool.py (legacy)": [py, os.path.join(HOOKS, 'hook_post_tool.py')],
+        "hook_stop.py (legacy)": [py, os.path.join(HOOKS, 'hook_stop.py')],
+    }
+
+    results = {}
+    for name, cmd in cases.items():
+        results[name] = run_case(cmd, payload, env, args.runs)
+
+    server.shutdown()
+    os.remove(transcript)
+
+    if args.json:
+        print(json.dumps({"benchmark": "hook_startup", "runs": args.runs, "results": results}, indent=2))
+    else:
+        print(f"{'case':<40} {'min':>8} {'median':>8} {'p90':>8}")
+        for name, r in results.items():
+            if "error" in r:
+                print(f"{name:<40} error: {' '.join(r['error'])}")
+            else:
+                print(f"{name:<40} {r['min_ms']:>8} {r['median_ms']:>8} {r['p90_ms']:>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+hook_stop.py 마지막 assistant 응답 추출 벤치마크
+- 합성 transcript (기본 1MB / 10MB / 100MB, --sizes 1,500 등으로 지정) 생성
+- 기존 방식(readlines 후 역순 탐색) vs 역방향 블록 읽기 vs 오프셋 사이드카(마지막 Stop 이후 부분만) 비교
+
+사용법:
+    python bench/bench_hook_stop.py --sizes 1,10,100,500 --json
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'hooks'))
+
+from hook_stop import get_last_assistant_response  # noqa: E402
+
+MB = 1024 * 1024
+
+
+def legacy_get_last_assistant_response(transcript_path):
+    """기존 구현 (전체 파일 readlines)"""
+    with open(transcript_path, 'r', encoding='utf-8') as f:
+        lines = f.readlines()
+    for line in reversed(lines):
+        try:
+            msg = json.loads(line.strip())
+            if msg.get('type') != 'assistant':
+                continue
+            content = msg['message'].get('content', [])
+            return '\n'.join(p.get('text', '') for p in content
+                             if isinstance(p, dict) and p.get('type') == 'text')
+        except json.JSONDecodeError:
+            continue
+    return None
+
+
+def make_turn(i):
+    """user → assistant(tool_use) → tool_result → assistant(text) 한 턴"""
+    tool_output = ("line of tool output " * 40 + "\n") * 3
+    return [
+        {"type": "user", "message": {"role": "user", "content": f"request {i}"}},
+        {"type": "assistant", "message": {"id": f"msg_{i}a", "content": [
+            {"type": "tool_use", "id": f"tu_{i}", "name": "Read", "input": {"file_path": f"/src/f{i}.py"}}]}},
+        {"type": "user", "message": {"role": "user", "content": [
+            {"type": "tool_result", "tool_use_id": f"tu_{i}", "content": tool_output}]}},
+        {"type": "assistant", "message": {"id": f"msg_{i}b", "content": [
+            {"type": "text", "text": f"Answer for turn {i}. " * 10}]}},
+    ]
+
+
+def write_transcript(path, size_bytes):
+    """size_bytes 이상이 될 때까지 턴 추가. 마지막 Stop 직전 오프셋도 반환"""
+    written = 0
+    i = 0
+    last_turn_offset = 0
+    with open(path, 'w', encoding='utf-8') as f:
+        while written < size_bytes:
+            last_turn_offset = written
+            for msg in make_turn(i):
+                line = json.dumps(msg) + '\n'
+                f.write(line)
+                written += len(line.encode('utf-8'))
+            i += 1
+    return last_turn_offset
+
+
+def timeit(fn, repeat):
+    best = float('inf')
+    result = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - t0)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sizes', default='1,10,100', help='transcript 크기 목록 (MB)')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--json', action='store_true', help='결과를 JSON으로 출력')
+    args = parser.parse_args()
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for size_mb in [float(s) for s in args.sizes.split(',')]:
+            path = os.path.join(tmp, f"transcript_{size_mb}.jsonl")
+            sidecar_offset = write_transcript(path, int(size_mb * MB))
+
+            legacy_t, legacy_r = timeit(lambda: legacy_get_last_assistant_response(path), args.repeat)
+            reverse_t, reverse_r = timeit(lambda: get_last_assistant_response(path), args.repeat)
+            sidecar_t, sidecar_r = timeit(lambda: get_last_assistant_response(path, sidecar_offset), args.repeat)
+            assert legacy_r == reverse_r == sidecar_r, "추출 결과 불일치"
+
+            results.append({
+                "size_mb": size_mb,
+                "legacy_ms": round(legacy_t * 1000, 3),
+                "reverse_ms": round(reverse_t * 1000, 3),
+                "sidecar_ms": round(sidecar_t * 1000, 3),
+                "speedup": round(legacy_t / reverse_t, 1) if reverse_t else None,
+            })
+            os.remove(path)
+
+    if args.json:
+        print(json.dumps({"benchmark": "hook_stop", "results": results}, indent=2))
+    else:
+        print(f"{'size(MB)':>9} {'legacy(ms)':>11} {'reverse(ms)':>12} {'sidecar(ms)':>12} {'speedup':>8}")
+        for r in results:
+            print(f"{r['size_mb']:>9} {r['legacy_ms']:>11} {r['reverse_ms']:>12} {r['sidecar_ms']:>12} {r['speedup']:>7}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Hook → 서버 전송 방식 왕복 지연 벤치마크
+- 같은 처리 함수를 aiohttp HTTP 라우트와 로컬 IPC(ipc_transport.IpcServer)에 연결
+- 요청마다 새 연결을 여는 Hook 프로세스 동작을 그대로 재현해서 비교
+  1. urllib.request (기존 Hook 스크립트)
+  2. raw socket HTTP/1.0 (hook_client.forward)
+  3. Unix domain socket / named pipe (hook_client.forward_ipc)
+
+사용법 (pc/requirements.txt 설치 필요):
+    python bench/bench_ipc_transport.py --requests 2000 --json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+import urllib.request
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path[:0] = [os.path.join(ROOT, 'pc'), os.path.join(ROOT, 'hooks')]
+
+from aiohttp import web  # noqa: E402
+
+import hook_client  # noqa: E402
+from ipc_transport import IpcServer  # noqa: E402
+
+PAYLOAD = json.dumps({
+    "session_id": "bench", "tool_name": "Read",
+    "tool_input": {"file_path": "/src/app.py"}, "tool_response": "x" * 512
+}).encode('utf-8')
+
+
+async def process(path, body):
+    """두 전송 방식이 공유하는 처리 함수 (JSON 파싱 + 작은 응답)"""
+    json.loads(body)
+    return 200, b'{"status": "ok"}'
+
+
+async def http_handler(request):
+    status, body = await process(request.path, await request.read())
+    return web.Response(status=status, body=body, content_type='application/json')
+
+
+def call_urllib(port):
+    req = urllib.request.Request(
+        f"http://127.0.0.1:{port}/hook/tool-result", data=PAYLOAD,
+        headers={'Content-Type': 'application/json'}, method='POST'
+    )
+    with urllib.request.urlopen(req, timeout=5) as resp:
+        resp.read()
+
+
+def call_raw_http(port):
+    assert hook_client.forward('tool-result', PAYLOAD, port) is not None
+
+
+def call_ipc(address):
+    assert hook_client.forward_ipc('/hook/tool-result', PAYLOAD, address)[0] == 200
+
+
+def measure(fn, arg, count):
+    samples = []
+    for _ in range(count):
+        t0 = time.perf_counter()
+        fn(arg)
+        samples.append((time.perf_counter() - t0) * 1e6)
+    samples.sort()
+    return {
+        "mean_us": round(statistics.fmean(samples), 1),
+        "p50_us": round(samples[len(samples) // 2], 1),
+        "p99_us": round(samples[int(len(samples) * 0.99) - 1], 1),
+    }
+
+
+async def run(args):
+    app = web.Application()
+    app.router.add_post('/hook/{event}', http_handler)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, '127.0.0.1', args.port).start()
+
+    if sys.platform == 'win32':
+        address = r'\\.\pipe\claude-remote-bench'
+    else:
+        address = os.path.join(tempfile.gettempdir(), f"claude-remote-bench-{os.getpid()}.sock")
+    ipc = IpcServer(process, address)
+    await ipc.start()
+
+    loop = asyncio.get_running_loop()
+    cases = [
+        ("http urllib (legacy hooks)", call_urllib, args.port),
+        ("http raw socket (hook_client)", call_raw_http, args.port),
+        ("ipc (hook_client)", call_ipc, address),
+    ]
+    results = {}
+    for name, fn, arg in cases:
+        await loop.run_in_executor(None, measure, fn, arg, 50)  # 워밍업
+        results[name] = await loop.run_in_executor(None, measure, fn, arg, args.requests)
+
+    ipc.close()
+    await runner.cleanup()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--requests', type=int, default=1000)
+    parser.add_argument('--port', type=int, default=18765)
+    parser.add_argument('--json', action='store_true')
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args))
+    if args.json:
+        print(json.dumps({"benchmark": "ipc_transport", "requests": args.requests,
+                          "results": results}, indent=2))
+    else:
+        print(f"{'transport':<32} {'mean(us)':>10} {'p50(us)':>10} {'p99(us)':>10}")
+        for name, r in results.items():
+            print(f"{name:<32} {r['mean_us']:>10} {r['p50_us']:>10} {r['p99_us']:>10}")
+
+
+if __name__ == "__main__":
+    main()
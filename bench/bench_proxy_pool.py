@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+프록시 업스트림 연결 풀 벤치마크
+- 로컬 가짜 업스트림(짧은 SSE 응답)을 띄우고 pc_toast_v2.5/proxy.py 앱을 같은 프로세스에서 실행
+- 연결 풀 사용(keep-alive + DNS 캐시) vs 예전 동작(요청마다 새 연결, PROXY_POOL=0) 비교
+- 요청 지연 mean / p50 / p99와 업스트림이 받은 TCP 연결 수 출력
+  (로컬 HTTP라 TLS 핸드셰이크 비용은 빠져 있음, 실제 api.anthropic.com에서는 차이가 더 큼)
+
+사용법:
+    python bench/bench_proxy_pool.py --requests 500 --concurrency 8 --json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, os.path.join(ROOT, 'pc_toast_v2.5'))
+os.environ.setdefault("PROXY_BRIDGE", "0")  # PC 서버로 이벤트 전달 안 함
+
+import aiohttp  # noqa: E402
+from aiohttp import web  # noqa: E402
+
+import proxy  # noqa: E402
+
+SSE_BODY = b"".join(
+    f"event: {name}\ndata: {json.dumps(data)}\n\n".encode('utf-8')
+    for name, data in [
+        ("message_start", {"type": "message_start", "message": {"id": "msg_bench", "content": []}}),
+        ("content_block_start", {"type": "content_block_start", "index": 0,
+                                 "content_block": {"type": "text", "text": ""}}),
+        ("content_block_delta", {"type": "content_block_delta", "index": 0,
+                                 "delta": {"type": "text_delta", "text": "Hello"}}),
+        ("content_block_stop", {"type": "content_block_stop", "index": 0}),
+        ("message_stop", {"type": "message_stop"}),
+    ]
+)
+
+
+class Upstream:
+    """가짜 Anthropic API. 받은 TCP 연결 수를 기록"""
+
+    def __init__(self, port):
+        self.port = port
+        self.connections = set()
+        self.runner = None
+
+    async def handle(self, request):
+        self.connections.add(request.transport.get_extra_info('peername'))
+        await request.read()
+        response = web.StreamResponse(headers={'Content-Type': 'text/event-stream'})
+        await response.prepare(request)
+        await response.write(SSE_BODY)
+        await response.write_eof()
+        return response
+
+    async def start(self):
+        app = web.Application()
+        app.router.add_post('/v1/messages', self.handle)
+        self.runner = web.AppRunner(app, access_log=None)
+        await self.runner.setup()
+        await web.TCPSite(self.runner, '127.0.0.1', self.port).start()
+
+
+async def run_case(pooled, args, upstream):
+    proxy.POOL_ENABLED = pooled
+    runner = web.AppRunner(proxy.create_app(), access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, '127.0.0.1', args.proxy_port).start()
+    upstream.connections.clear()
+
+    url = f"http://127.0.0.1:{args.proxy_port}/v1/messages"
+    body = json.dumps({"model": "bench", "stream": True, "messages": []})
+    samples = []
+    queue = asyncio.Queue()
+    for _ in range(args.requests):
+        queue.put_nowait(None)
+
+    async with aiohttp.ClientSession() as client:
+        async def worker():
+            while not queue.empty():
+                queue.get_nowait()
+                t0 = time.perf_counter()
+                async with client.post(url, data=body) as resp:
+                    await resp.read()
+                samples.append((time.perf_counter() - t0) * 1000)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+        elapsed = time.perf_counter() - started
+
+    await runner.cleanup()
+    samples.sort()
+    return {
+        "requests": len(samples),
+        "throughput_per_s": round(len(samples) / elapsed, 1),
+        "mean_ms": round(statistics.fmean(samples), 3),
+        "p50_ms": round(samples[len(samples) // 2], 3),
+        "p99_ms": round(samples[int(len(samples) * 0.99) - 1], 3),
+        "upstream_connections": len(upstream.connections)
+    }
+
+
+async def run(args):
+    upstream = Upstream(args.upstream_port)
+    await upstream.start()
+    proxy.ANTHROPIC_API_URL = f"http://127.0.0.1:{args.upstream_port}"
+    results = {}
+    for name, pooled in (("per-request connection", False), ("pooled keep-alive", True)):
+        await run_case(pooled, args, upstream)  # 워밍업
+        results[name] = await run_case(pooled, args, upstream)
+    await upstream.runner.cleanup()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--requests', type=int, default=300)
+    parser.add_argument('--concurrency', type=int, default=4)
+    parser.add_argument('--proxy-port', type=int, default=13456)
+    parser.add_argument('--upstream-port', type=int, default=13457)
+    parser.add_argument('--json', action='store_true')
+    args = parser.parse_args()
+
+    # 요청마다 찍는 프록시 로그는 측정에서 제외
+    sys.stdout, stdout = open(os.devnull, 'w'), sys.stdout
+    try:
+        results = asyncio.run(run(args))
+    finally:
+        sys.stdout.close()
+        sys.stdout = stdout
+
+    if args.json:
+        print(json.dumps({"benchmark": "proxy_pool", "requests": args.requests,
+                          "concurrency": args.concurrency, "results": results}, indent=2))
+    else:
+        print(f"{'mode':<26} {'req/s':>9} {'mean(ms)':>10} {'p50(ms)':>10} {'p99(ms)':>10} {'conns':>7}")
+        for name, r in results.items():
+            print(f"{name:<26} {r['throughput_per_s']:>9} {r['mean_ms']:>10} {r['p50_ms']:>10} "
+                  f"{r['p99_ms']:>10} {r['upstream_connections']:>7}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+"""
+프록시 재생 벤치마크 (api.anthropic.com 없이 오프라인, 재현 가능)
+- 기록된 아카이브(PROXY_RECORD로 캡처) 또는 합성 아카이브를 replay_server로 재생
+- pc_toast_v2.5/proxy.py를 별도 프로세스로 실행하고 재생 서버를 업스트림으로 지정
+- 측정:
+  1. 청크별 추가 지연: 같은 기록을 직접 / 프록시 경유로 하나씩 받아서 같은 바이트 위치의 도착 시각 비교
+  2. 처리량: 지연 없는 재생(--throughput-speed 0)으로 동시 요청 처리량 (직접 vs 프록시)
+  3. 프록시 RSS 변화 (/proc, Linux)
+
+사용법:
+    python bench/bench_proxy_replay.py --json                          # 합성 아카이브
+    python bench/bench_proxy_replay.py --archive captures/traffic.jsonl.gz --speed 4
+"""
+
+import argparse
+import asyncio
+import bisect
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+PROXY_DIR = os.path.join(ROOT, 'pc_toast_v2.5')
+sys.path.insert(0, PROXY_DIR)
+
+import aiohttp  # noqa: E402
+from aiohttp import web  # noqa: E402
+
+import replay_server  # noqa: E402
+from traffic_archive import ArchiveWriter, load_archive  # noqa: E402
+
+
+def read_rss_kb(pid):
+    try:
+        with open(f"/proc/{pid}/status", 'r') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+
+def percentile(sorted_values, q):
+    if not sorted_values:
+        return 0
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * q))]
+
+
+def summarize_ms(samples):
+    samples = sorted(samples)
+    if not samples:
+        return {"count": 0}
+    return {
+        "count": len(samples),
+        "mean_ms": round(sum(samples) / len(samples) * 1000, 3),
+        "p50_ms": round(percentile(samples, 0.50) * 1000, 3),
+        "p99_ms": round(percentile(samples, 0.99) * 1000, 3),
+        "max_ms": round(samples[-1] * 1000, 3)
+    }
+
+
+def synthetic_events(i, text_chunks):
+    """text 블록 + tool_use(input_json_delta) 한 메시지"""
+    tool_input = json.dumps({"command": f"pytest tests/test_{i}.py -q", "description": "Run tests"})
+    events = [
+        {"type": "message_start", "message": {"id": f"msg_replay_{i}", "model": "replay", "content": []}},
+        {"type": "content_block_start", "index": 0, "content_block": {"type": "text", "text": ""}},
+    ]
+    events += [{"type": "content_block_delta", "index": 0,
+                "delta": {"type": "text_delta", "text": f"token {n} of the answer "}}
+               for n in range(text_chunks)]
+    events += [
+        {"type": "content_block_stop", "index": 0},
+        {"type": "content_block_start", "index": 1,
+         "content_block": {"type": "tool_use", "id": f"toolu_{i}", "name": "Bash", "input": {}}},
+    ]
+    events += [{"type": "content_block_delta", "index": 1,
+                "delta": {"type": "input_json_delta", "partial_json": tool_input[n:n + 12]}}
+               for n in range(0, len(tool_input), 12)]
+    events += [
+        {"type": "content_block_stop", "index": 1},
+        {"type": "message_delta", "delta": {"stop_reason": "tool_use"}, "usage": {"output_tokens": text_chunks}},
+        {"type": "message_stop"},
+    ]
+    return events
+
+
+def write_synthetic_archive(path, records, text_chunks, delay_ms, headers_ms):
+    """SSE 이벤트 하나 = 청크 하나, 헤더까지 headers_ms, 청크 간격 delay_ms인 아카이브 생성"""
+    writer = ArchiveWriter(path)
+    for i in range(records):
+        body = json.dumps({"model": "replay", "stream": True,
+                           "messages": [{"role": "user", "content": f"request {i}"}]}).encode('utf-8')
+        exchange = writer.begin('POST', '/v1/messages?beta=true', {'content-type': 'application/json'}, body)
+        exchange.response(200, {'Content-Type': 'text/event-stream; charset=utf-8'}, headers_ms)
+        for event in synthetic_events(i, text_chunks):
+            data = f"event: {event['type']}\ndata: {json.dumps(event)}\n\n".encode('utf-8')
+            exchange.chunk(data, delay_ms)
+        writer.finish(exchange)
+    writer.close()
+
+
+async def fetch(client, url, body):
+    """(요청 시작 기준 [(도착 시각, 누적 바이트)], 전체 바이트)"""
+    arrivals = []
+    total = 0
+    t0 = time.perf_counter()
+    async with client.post(url, data=body, headers={'Content-Type': 'application/json'}) as resp:
+        async for chunk in resp.content.iter_any():
+            total += len(chunk)
+            arrivals.append((time.perf_counter() - t0, total))
+    return arrivals, total
+
+
+def added_per_chunk(direct, proxied):
+    """직접 받은 각 청크 경계 바이트가 프록시 경유로 도착하기까지 늦어진 시간 목록"""
+    proxied_bytes = [b for _, b in proxied]
+    delays = []
+    for t_direct, offset in direct:
+        i = bisect.bisect_left(proxied_bytes, offset)
+        if i < len(proxied):
+            delays.append(max(0.0, proxied[i][0] - t_direct))
+    return delays
+
+
+async def throughput(client, url, records, count, concurrency):
+    queue = list(range(count))
+    latencies = []
+    total_bytes = 0
+
+    async def worker():
+        nonlocal total_bytes
+        while queue:
+            i = queue.pop()
+            arrivals, size = await fetch(client, url, records[i % len(records)]["request_body"])
+            latencies.append(arrivals[-1][0] if arrivals else 0)
+            total_bytes += size
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    return {
+        "requests": count,
+        "throughput_per_s": round(count / elapsed, 1),
+        "mb_per_s": round(total_bytes / elapsed / 1e6, 2),
+        "latency": summarize_ms(latencies)
+    }
+
+
+async def wait_ready(client, url, proc, timeout=15):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"proxy.py 종료됨 (code {proc.returncode})")
+        try:
+            async with client.get(url) as resp:
+                if resp.status == 200:
+                    return
+        except aiohttp.ClientError:
+            pass
+        await asyncio.sleep(0.1)
+    raise RuntimeError("proxy.py 시작 대기 시간 초과")
+
+
+async def run(args, records):
+    app, upstream = replay_server.create_app(records, args.speed)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, '127.0.0.1', args.replay_port).start()
+
+    env = dict(os.environ, ANTHROPIC_API_URL=f"http://127.0.0.1:{args.replay_port}",
+               PROXY_PORT=str(args.proxy_port), PROXY_BRIDGE="0", PROXY_RECORD="")
+    proc = subprocess.Popen([sys.executable, os.path.join(PROXY_DIR, 'proxy.py')], cwd=PROXY_DIR,
+                            env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    path = records[0]["path"]
+    direct_url = f"http://127.0.0.1:{args.replay_port}{path}"
+    proxy_url = f"http://127.0.0.1:{args.proxy_port}{path}"
+    try:
+        async with aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=0)) as client:
+            await wait_ready(client, f"http://127.0.0.1:{args.proxy_port}/health", proc)
+            rss_start = read_rss_kb(proc.pid)
+
+            # 1. 청크별 추가 지연 (기록된 속도로 하나씩)
+            ttfb_added, ttlb_added, chunk_added = [], [], []
+            for i in range(args.latency_requests):
+                body = records[i % len(records)]["request_body"]
+                direct, _ = await fetch(client, direct_url, body)
+                proxied, _ = await fetch(client, proxy_url, body)
+                if direct and proxied:
+                    ttfb_added.append(max(0.0, proxied[0][0] - direct[0][0]))
+                    ttlb_added.append(max(0.0, proxied[-1][0] - direct[-1][0]))
+                    chunk_added.extend(added_per_chunk(direct, proxied))
+
+            # 2. 처리량 (지연 없이)
+            upstream.speed = args.throughput_speed
+            direct_tp = await throughput(client, direct_url, records, args.requests, args.concurrency)
+            proxy_tp = await throughput(client, proxy_url, records, args.requests, args.concurrency)
+            rss_end = read_rss_kb(proc.pid)
+    finally:
+        proc.terminate()
+        proc.wait(5)
+        await runner.cleanup()
+
+    return {
+        "benchmark": "proxy_replay",
+        "config": {
+            "records": len(records),
+            "chunks_per_record": round(sum(len(r["chunks"]) for r in records) / len(records), 1),
+            "speed": args.speed,
+            "throughput_speed": args.throughput_speed,
+            "latency_requests": args.latency_requests,
+            "requests": args.requests,
+            "concurrency": args.concurrency
+        },
+        "added_latency": {
+            "ttfb": summarize_ms(ttfb_added),
+            "last_byte": summarize_ms(ttlb_added),
+            "per_chunk": summarize_ms(chunk_added)
+        },
+        "throughput": {"direct": direct_tp, "proxy": proxy_tp},
+        "proxy_memory": {
+            "rss_start_kb": rss_start,
+            "rss_end_kb": rss_end,
+            "rss_growth_kb": rss_end - rss_start if rss_start and rss_end else None
+        },
+        "replay": {"served": upstream.served, "unmatched": upstream.unmatched}
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="프록시 기록 재생 벤치마크")
+    parser.add_argument('--archive', help="PROXY_RECORD로 기록한 아카이브 (없으면 합성)")
+    parser.add_argument('--records', type=int, default=20, help="합성 아카이브 레코드 수")
+    parser.add_argument('--text-chunks', type=int, default=60, help="합성 레코드별 텍스트 청크 수")
+    parser.add_argument('--chunk-delay-ms', type=float, default=5.0, help="합성 청크 간격")
+    parser.add_argument('--headers-delay-ms', type=float, default=50.0, help="합성 응답 헤더까지 걸린 시간")
+    parser.add_argument('--speed', type=float, default=1.0, help="지연 측정 단계 재생 속도 배수")
+    parser.add_argument('--throughput-speed', type=float, default=0.0, help="처리량 단계 재생 속도 (0 = 지연 없음)")
+    parser.add_argument('--latency-requests', type=int, default=20)
+    parser.add_argument('--requests', type=int, default=300)
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--proxy-port', type=int, default=13466)
+    parser.add_argument('--replay-port', type=int, default=13467)
+    parser.add_argument('--json', action='store_true')
+    args = parser.parse_args()
+
+    if args.archive:
+        records = load_archive(args.archive)
+    else:
+        path = os.path.join(tempfile.gettempdir(), f"proxy-replay-{os.getpid()}.jsonl.gz")
+        write_synthetic_archive(path, args.records, args.text_chunks, args.chunk_delay_ms,
+                                args.headers_delay_ms)
+        records = load_archive(path)
+        os.remove(path)
+    if not records:
+        parser.error("아카이브에 기록이 없음")
+
+    result = asyncio.run(run(args, records))
+    if args.json:
+        print(json.dumps(result, indent=2))
+        return
+
+    c = result["config"]
+    print(f"{c['records']} recordings, {c['chunks_per_record']} chunks each, speed x{c['speed']:g}")
+    print(f"{'added latency':<22} {'mean(ms)':>10} {'p50(ms)':>10} {'p99(ms)':>10}")
+    for name, r in result["added_latency"].items():
+        print(f"{name:<22} {r.get('mean_ms', '-'):>10} {r.get('p50_ms', '-'):>10} {r.get('p99_ms', '-'):>10}")
+    print(f"{'throughput':<22} {'req/s':>10} {'MB/s':>10} {'p99(ms)':>10}")
+    for name, r in result["throughput"].items():
+        print(f"{name:<22} {r['throughput_per_s']:>10} {r['mb_per_s']:>10} {r['latency'].get('p99_ms', '-'):>10}")
+    m = result["proxy_memory"]
+    print(f"proxy RSS: {m['rss_start_kb']} → {m['rss_end_kb']} KB (growth {m['rss_growth_kb']})")
+
+
+if __name__ == "__main__":
+    main()
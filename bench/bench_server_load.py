@@ -0,0 +1,379 @@
+#!/usr/bin/env python3
+"""
+server.py 부하 벤치마크 (Windows API 없이 Linux CI에서 실행 가능)
+- server.py를 fake 창 백엔드(CLAUDE_REMOTE_BACKEND=fake)로 별도 프로세스 실행
+  (포트 / IPC / 히스토리 DB / 정책 / trace 파일은 임시 경로로 분리)
+- 앱 클라이언트 M개: WebSocket 연결, 권한 요청마다 정해진 지연 후 allow 응답
+  (--decision-delays 50,200,-1 → 클라이언트별로 순서대로 배정, 음수는 응답하지 않고 수신만)
+- Hook 클라이언트 N개: 세션 하나씩 맡아서 한 턴(권한 요청 → 작업 결과 K개 → Stop)을 반복
+  (hook_client.py와 같은 /hook/{event} 경로, 요청마다 새 연결)
+- 결과: 이벤트별 처리량 / p50 / p99 (ms), 작업 결과가 앱에 도착하기까지의 지연,
+  서버 RSS 증가량, 서버 /stats. --json 또는 --output으로 기계가 읽을 수 있는 형식
+
+사용법 (pc/requirements.txt의 websockets / aiohttp 필요):
+    python bench/bench_server_load.py --hooks 20 --apps 3 --turns 50 --json
+    python bench/bench_server_load.py --decision-delays 20,500 --output load.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+import aiohttp
+import websockets
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+SERVER = os.path.join(ROOT, 'pc', 'server.py')
+
+EVENTS = ('permission', 'tool-result', 'stop')
+
+
+def percentile(sorted_values, q):
+    if not sorted_values:
+        return 0
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * q))]
+
+
+def summarize(samples, elapsed=None):
+    """지연 목록(초) → 통계 (ms)"""
+    samples = sorted(samples)
+    result = {"count": len(samples)}
+    if elapsed:
+        result["throughput_per_s"] = round(len(samples) / elapsed, 1)
+    if samples:
+        result.update({
+            "mean_ms": round(sum(samples) / len(samples) * 1000, 2),
+            "p50_ms": round(percentile(samples, 0.50) * 1000, 2),
+            "p99_ms": round(percentile(samples, 0.99) * 1000, 2),
+            "max_ms": round(samples[-1] * 1000, 2)
+        })
+    return result
+
+
+def read_rss_kb(pid):
+    """프로세스 RSS (KB). /proc이 없는 환경이면 None"""
+    try:
+        with open(f"/proc/{pid}/status", 'r') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+
+class ServerProcess:
+    """임시 경로 / 포트로 server.py 실행"""
+
+    def __init__(self, http_port, ws_port, verbose=False):
+        self.http_port = http_port
+        self.ws_port = ws_port
+        self.verbose = verbose
+        self.tmpdir = tempfile.mkdtemp(prefix="claude-remote-load-")
+        self.proc = None
+
+    def start(self):
+        env = dict(
+            os.environ,
+            CLAUDE_REMOTE_BACKEND="fake",
+            CLAUDE_REMOTE_HTTP_PORT=str(self.http_port),
+            CLAUDE_REMOTE_WS_PORT=str(self.ws_port),
+            CLAUDE_REMOTE_IPC=os.path.join(self.tmpdir, "ipc.sock"),
+            CLAUDE_REMOTE_HISTORY_DB=os.path.join(self.tmpdir, "history.db"),
+            CLAUDE_REMOTE_POLICY=os.path.join(self.tmpdir, "policy.json"),
+            CLAUDE_REMOTE_TRACE_FILE=os.path.join(self.tmpdir, "traces.jsonl"),
+            PYTHONUNBUFFERED="1"
+        )
+        output = None if self.verbose else subprocess.DEVNULL
+        self.proc = subprocess.Popen([sys.executable, SERVER], cwd=os.path.dirname(SERVER),
+                                     env=env, stdout=output, stderr=output)
+
+    async def wait_ready(self, session, timeout=15):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if self.proc.poll() is not None:
+                raise RuntimeError(f"server.py 종료됨 (code {self.proc.returncode})")
+            try:
+                async with session.get(f"http://127.0.0.1:{self.http_port}/stats") as resp:
+                    if resp.status == 200:
+                        return
+            except aiohttp.ClientError:
+                pass
+            await asyncio.sleep(0.1)
+        raise RuntimeError("server.py 시작 대기 시간 초과")
+
+    def rss_kb(self):
+        return read_rss_kb(self.proc.pid)
+
+    def stop(self):
+        if self.proc and self.proc.poll() is None:
+            self.proc.terminate()
+            try:
+                self.proc.wait(5)
+            except subprocess.TimeoutExpired:
+                self.proc.kill()
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+
+class AppClient:
+    """앱 흉내: 권한 요청에 정해진 지연 후 응답, 작업 결과 도착 지연 기록"""
+
+    def __init__(self, index, url, decision_delay):
+        self.index = index
+        self.url = url
+        self.decision_delay = decision_delay  # 초, None이면 응답하지 않음
+        self.frames = 0
+        self.permissions = 0
+        self.responses = 0
+        self.delivery = []  # tool_result 전송 → 앱 수신 (초)
+        self.ws = None
+        self._tasks = set()
+
+    async def connect(self):
+        self.ws = await websockets.connect(self.url, max_size=None)
+
+    async def _respond(self, request_id):
+        await asyncio.sleep(self.decision_delay)
+        try:
+            await self.ws.send(json.dumps({
+                "type": "permission_response",
+                "request_id": request_id,
+                "decision": "allow"
+            }))
+            self.responses += 1
+        except websockets.ConnectionClosed:
+            pass
+
+    def _record_tool_result(self, item, now):
+        sent_at = (item.get("tool_input") or {}).get("sent_at")
+        if isinstance(sent_at, (int, float)):
+            self.delivery.append(now - sent_at)
+
+    async def run(self):
+        try:
+            async for message in self.ws:
+                now = time.time()
+                self.frames += 1
+                data = json.loads(message)
+                kind = data.get("type")
+                if kind == "permission_request":
+                    self.permissions += 1
+                    if self.decision_delay is not None:
+                        task = asyncio.create_task(self._respond(data["request_id"]))
+                        self._tasks.add(task)
+                        task.add_done_callback(self._tasks.discard)
+                elif kind == "tool_result":
+                    self._record_tool_result(data, now)
+                elif kind == "tool_result_batch":
+                    for item in data.get("items", []):
+                        self._record_tool_result(item, now)
+        except websockets.ConnectionClosed:
+            pass
+
+    async def close(self):
+        for task in list(self._tasks):
+            task.cancel()
+        if self.ws:
+            await self.ws.close()
+
+
+class HookClient:
+    """Claude 세션 하나의 Hook 흉내 (권한 요청 → 작업 결과 K개 → Stop 반복)"""
+
+    def __init__(self, index, base_url, session, tmpdir, tool_results):
+        self.session_id = f"load-{index:04d}-{os.urandom(4).hex()}"
+        self.base_url = base_url
+        self.session = session
+        self.tool_results = tool_results
+        self.transcript_path = os.path.join(tmpdir, f"{self.session_id}.jsonl")
+        self.latency = {event: [] for event in EVENTS}
+        self.errors = {event: 0 for event in EVENTS}
+        self.counter = 0
+        open(self.transcript_path, 'w').close()
+
+    def _payload(self, **extra):
+        return {
+            "session_id": self.session_id,
+            "transcript_path": self.transcript_path,
+            "cwd": "/bench",
+            **extra
+        }
+
+    async def _post(self, event, payload):
+        t0 = time.perf_counter()
+        try:
+            async with self.session.post(f"{self.base_url}/hook/{event}",
+                                         data=json.dumps(payload)) as resp:
+                await resp.read()
+                ok = resp.status == 200
+        except aiohttp.ClientError:
+            ok = False
+        if ok:
+            self.latency[event].append(time.perf_counter() - t0)
+        else:
+            self.errors[event] += 1
+
+    def _append_turn(self, turn):
+        with open(self.transcript_path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps({"type": "assistant", "message": {
+                "id": f"msg_{turn}", "content": [{"type": "text", "text": f"Done with turn {turn}. " * 8}]
+            }}) + "\n")
+
+    async def run_turn(self, turn):
+        # 같은 입력은 서버가 하나로 합치므로 매번 다른 명령
+        await self._post('permission', self._payload(
+            tool_name="Bash", tool_input={"command": f"echo {self.session_id} {turn}"}
+        ))
+        for _ in range(self.tool_results):
+            self.counter += 1
+            await self._post('tool-result', self._payload(
+                tool_name="Read",
+                tool_input={"file_path": f"/bench/src/f{self.counter}.py", "sent_at": time.time()},
+                tool_response="line of output\n" * 20
+            ))
+        self._append_turn(turn)
+        await self._post('stop', self._payload())
+
+
+async def run(args):
+    delays = [None if d < 0 else d / 1000 for d in args.decision_delays]
+    server = ServerProcess(args.http_port, args.ws_port, args.verbose)
+    server.start()
+    # Hook 프로세스처럼 요청마다 새 연결
+    connector = aiohttp.TCPConnector(force_close=True, limit=0)
+    try:
+        async with aiohttp.ClientSession(connector=connector) as session:
+            await server.wait_ready(session)
+
+            apps = [AppClient(i, f"ws://127.0.0.1:{args.ws_port}", delays[i % len(delays)])
+                    for i in range(args.apps)]
+            for app in apps:
+                await app.connect()
+            app_tasks = [asyncio.create_task(app.run()) for app in apps]
+
+            base_url = f"http://127.0.0.1:{args.http_port}"
+            hooks = [HookClient(i, base_url, session, server.tmpdir, args.tool_results)
+                     for i in range(args.hooks)]
+
+            # 워밍업 한 턴 후 메모리 기준값
+            await asyncio.gather(*(hook.run_turn(-1) for hook in hooks))
+            await asyncio.sleep(0.3)
+            for hook in hooks:
+                hook.latency = {event: [] for event in EVENTS}
+                hook.errors = {event: 0 for event in EVENTS}
+            for app in apps:
+                app.delivery = []
+            rss_start = server.rss_kb()
+            rss_samples = []
+
+            async def sample_memory():
+                while True:
+                    rss_samples.append(server.rss_kb())
+                    await asyncio.sleep(0.5)
+
+            sampler = asyncio.create_task(sample_memory())
+
+            async def hook_loop(hook):
+                for turn in range(args.turns):
+                    await hook.run_turn(turn)
+
+            started = time.perf_counter()
+            await asyncio.gather(*(hook_loop(hook) for hook in hooks))
+            elapsed = time.perf_counter() - started
+
+            # 배치 창 동안 남은 작업 결과 도착 대기
+            await asyncio.sleep(0.3)
+            sampler.cancel()
+            rss_end = server.rss_kb()
+
+            async with session.get(f"{base_url}/stats") as resp:
+                server_stats = await resp.json()
+
+            for app in apps:
+                await app.close()
+            await asyncio.gather(*app_tasks, return_exceptions=True)
+    finally:
+        server.stop()
+
+    events = {}
+    for event in EVENTS:
+        samples = [s for hook in hooks for s in hook.latency[event]]
+        events[event] = {**summarize(samples, elapsed),
+                         "errors": sum(hook.errors[event] for hook in hooks)}
+    total = sum(e["count"] for e in events.values())
+    rss_values = [r for r in rss_samples if r is not None]
+
+    return {
+        "benchmark": "server_load",
+        "config": {
+            "hooks": args.hooks, "apps": args.apps, "turns": args.turns,
+            "tool_results_per_turn": args.tool_results,
+            "decision_delays_ms": args.decision_delays
+        },
+        "elapsed_s": round(elapsed, 3),
+        "throughput_per_s": round(total / elapsed, 1),
+        "events": events,
+        "tool_result_delivery": summarize([s for app in apps for s in app.delivery]),
+        "apps": [{"frames": app.frames, "permissions": app.permissions,
+                  "responses": app.responses} for app in apps],
+        "memory": {
+            "rss_start_kb": rss_start,
+            "rss_end_kb": rss_end,
+            "rss_peak_kb": max(rss_values) if rss_values else None,
+            "rss_growth_kb": rss_end - rss_start if rss_start and rss_end else None
+        },
+        "server_stats": server_stats
+    }
+
+
+def parse_delays(value):
+    return [float(v) for v in value.split(',') if v.strip()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="server.py 부하 벤치마크")
+    parser.add_argument('--hooks', type=int, default=10, help="동시 Hook 클라이언트(세션) 수")
+    parser.add_argument('--apps', type=int, default=2, help="WebSocket 앱 클라이언트 수")
+    parser.add_argument('--turns', type=int, default=20, help="Hook 클라이언트별 턴 수")
+    parser.add_argument('--tool-results', type=int, default=3, help="턴별 작업 결과 수")
+    parser.add_argument('--decision-delays', type=parse_delays, default=[50.0],
+                        help="앱별 권한 응답 지연 ms (쉼표 구분, 음수는 응답 안 함)")
+    parser.add_argument('--http-port', type=int, default=18765)
+    parser.add_argument('--ws-port', type=int, default=18766)
+    parser.add_argument('--json', action='store_true')
+    parser.add_argument('--output', help="결과 JSON 파일 경로")
+    parser.add_argument('--verbose', action='store_true', help="서버 로그 출력")
+    args = parser.parse_args()
+    if args.apps < 1 or not args.decision_delays:
+        parser.error("--apps는 1 이상, --decision-delays는 하나 이상 필요")
+
+    result = asyncio.run(run(args))
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(result, f, indent=2)
+    if args.json:
+        print(json.dumps(result, indent=2))
+        return
+
+    print(f"hooks {args.hooks} x turns {args.turns}, apps {args.apps}, "
+          f"{result['elapsed_s']}s, {result['throughput_per_s']} req/s")
+    print(f"{'event':<22} {'count':>7} {'req/s':>9} {'p50(ms)':>9} {'p99(ms)':>9} {'errors':>7}")
+    for event, r in result["events"].items():
+        print(f"{event:<22} {r['count']:>7} {r.get('throughput_per_s', 0):>9} "
+              f"{r.get('p50_ms', '-'):>9} {r.get('p99_ms', '-'):>9} {r['errors']:>7}")
+    d = result["tool_result_delivery"]
+    print(f"{'tool_result → app':<22} {d['count']:>7} {'':>9} "
+          f"{d.get('p50_ms', '-'):>9} {d.get('p99_ms', '-'):>9}")
+    m = result["memory"]
+    print(f"server RSS: {m['rss_start_kb']} → {m['rss_end_kb']} KB "
+          f"(peak {m['rss_peak_kb']}, growth {m['rss_growth_kb']})")
+
+
+if __name__ == "__main__":
+    main()
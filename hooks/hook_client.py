@@ -0,0 +1,145 @@
+"""
+얇은 Hook 클라이언트 (Hook 데몬 모드)
+- stdin 원본을 그대로 server.py의 /hook/<event>로 전달하고 응답만 출력
+- 로컬 IPC(Unix domain socket / named pipe)를 먼저 시도하고, 없으면 HTTP로 전송
+- win32gui / urllib / requests는 물론 socket 모듈(enum 등)도 import하지 않아 인터프리터 시작이 빠름
+  (활성 창 확인, transcript 파싱 등은 서버가 처리)
+
+사용법 (Claude Code Hook 명령, 포트는 생략 가능):
+    python -S hooks/hook_client.py permission [port]    # PermissionRequest
+    python -S hooks/hook_client.py tool-result [port]   # PostToolUse
+    python -S hooks/hook_client.py stop [port]          # Stop
+"""
+
+import time
+HOOK_START = time.time()  # 인터프리터 시작 직후 (trace: hook.to_server 구간 시작)
+
+import _socket
+import sys
+
+SERVER_HOST = "127.0.0.1"
+SERVER_PORT = 8765
+
+# 서버 ipc_transport.IPC_ADDRESS 기본값과 같아야 함
+if sys.platform == 'win32':
+    IPC_ADDRESS = r'\\.\pipe\claude-remote'
+else:
+    import posix
+    IPC_ADDRESS = f"/tmp/claude-remote-{posix.getuid()}.sock"
+
+# 권한 요청은 앱 응답을 기다려야 하므로 길게
+TIMEOUTS = {"permission": 58}
+DEFAULT_TIMEOUT = 5
+
+
+def new_trace_id():
+    """구간별 지연 추적용 trace ID (os 모듈 없이 urandom 사용)"""
+    if sys.platform == 'win32':
+        import nt
+        return nt.urandom(8).hex()
+    return posix.urandom(8).hex()
+
+
+def _read_exact(read, size):
+    data = b""
+    while len(data) < size:
+        chunk = read(size - len(data))
+        if not chunk:
+            raise OSError("connection closed")
+        data += chunk
+    return data
+
+
+def forward_ipc(path, body, address=IPC_ADDRESS, timeout=DEFAULT_TIMEOUT):
+    """길이 접두 프레임으로 요청 한 번. (status, 본문) 반환, IPC를 쓸 수 없으면 None"""
+    path_bytes = path.encode('ascii')
+    frame = ((2 + len(path_bytes) + len(body)).to_bytes(4, 'big')
+             + len(path_bytes).to_bytes(2, 'big') + path_bytes + body)
+
+    if sys.platform == 'win32':
+        try:
+            pipe = open(address, 'r+b', buffering=0)
+        except OSError:
+            return None
+        conn, send, read = pipe, pipe.write, pipe.read
+    else:
+        conn = _socket.socket(_socket.AF_UNIX, _socket.SOCK_STREAM)
+        try:
+            conn.settimeout(timeout)
+            conn.connect(address)
+        except OSError:
+            conn.close()
+            return None
+        send, read = conn.sendall, conn.recv
+
+    try:
+        send(frame)
+        size = int.from_bytes(_read_exact(read, 4), 'big')
+        response = _read_exact(read, size)
+    except OSError:
+        return 0, b""
+    finally:
+        conn.close()
+    return int.from_bytes(response[:2], 'big'), response[2:]
+
+
+def forward(event, body, port=SERVER_PORT, query=""):
+    """HTTP/1.0 POST 한 번. 200 응답 본문 반환, 실패 시 None"""
+    request = (
+        b"POST /hook/" + (event + query).encode('ascii') + b" HTTP/1.0\r\n"
+        b"Host: localhost\r\n"
+        b"Content-Type: application/json\r\n"
+        b"Content-Length: " + str(len(body)).encode('ascii') + b"\r\n\r\n"
+    ) + body
+
+    chunks = []
+    sock = _socket.socket(_socket.AF_INET, _socket.SOCK_STREAM)
+    try:
+        sock.settimeout(2)
+        sock.connect((SERVER_HOST, port))
+        sock.settimeout(TIMEOUTS.get(event, DEFAULT_TIMEOUT))
+        sock.sendall(request)
+        while True:
+            data = sock.recv(65536)
+            if not data:
+                break
+            chunks.append(data)
+    except OSError:
+        return None
+    finally:
+        sock.close()
+
+    head, _, payload = b"".join(chunks).partition(b"\r\n\r\n")
+    status_line = head.split(b"\r\n", 1)[0]
+    if b" 200 " not in status_line + b" ":
+        return None
+    return payload
+
+
+def main():
+    if len(sys.argv) < 2:
+        return
+    event = sys.argv[1]
+    port = int(sys.argv[2]) if len(sys.argv) > 2 else SERVER_PORT
+    body = sys.stdin.buffer.read()
+    if not body:
+        return
+
+    # 서버가 Hook 시작부터의 구간을 기록하도록 trace ID + 시작 시각 전달
+    query = "?trace=" + new_trace_id() + "&t0=" + repr(HOOK_START)
+    result = forward_ipc("/hook/" + event + query, body, timeout=TIMEOUTS.get(event, DEFAULT_TIMEOUT))
+    if result is None:
+        payload = forward(event, body, port, query)
+    else:
+        status, payload = result
+        if status != 200:
+            payload = None
+
+    # 서버가 Hook 출력을 돌려준 경우만 출력 (없으면 Claude 기본 동작)
+    if payload and payload.strip():
+        sys.stdout.buffer.write(payload)
+        sys.stdout.flush()
+
+
+if __name__ == "__main__":
+    main()
@@ -5,10 +5,14 @@ PermissionRequest Hook
 - 앱에서 응답 받아서 반환
 """
 
+import time
+HOOK_START = time.time()  # 인터프리터 시작 직후 (trace: hook.startup 구간 시작)
+
 import sys
 import json
 import urllib.request
 import urllib.error
+import uuid
 import win32gui
 
 SERVER_URL = "http://localhost:8765/"
@@ -58,12 +62,23 @@ def main():
 
     # 서버에 요청 전송
     request_data = {
-        "request_id": f"{session_id}_{tool_name}_{id(input_data)}",
+        # 프로세스마다 id()가 겹칠 수 있으므로 uuid 사용
+        "request_id": uuid.uuid4().hex,
+        "session_id": session_id,
+        "cwd": input_data.get("cwd", ""),
+        "transcript_path": input_data.get("transcript_path", ""),
         "tool_name": tool_name,
         "tool_input": tool_input,
         "hwnd": hwnd
     }
 
+    # 구간별 지연 추적용 trace (서버 / 앱 메시지에 그대로 전달됨)
+    request_data["trace"] = {
+        "id": uuid.uuid4().hex[:16],
+        "hook_start": HOOK_START,
+        "hook_send": time.time()
+    }
+
     response = send_to_server(request_data)
 
     if response:
@@ -4,8 +4,12 @@ PostToolUse Hook
 - 서버에 결과 전송 → 핸드폰에서 확인 가능
 """
 
+import time
+HOOK_START = time.time()  # 인터프리터 시작 직후 (trace: hook.startup 구간 시작)
+
 import sys
 import json
+import uuid
 import urllib.request
 import urllib.error
 import win32gui
@@ -47,16 +51,21 @@ def main():
     tool_name = input_data.get("tool_name", "unknown")
     tool_input = input_data.get("tool_input", {})
     tool_result = input_data.get("tool_result", "")
+    session_id = input_data.get("session_id", "")
 
     # 현재 창 HWND 가져오기
     hwnd = get_current_hwnd()
 
     # 서버에 결과 전송
     result_data = {
+        "session_id": session_id,
+        "transcript_path": input_data.get("transcript_path", ""),
         "tool_name": tool_name,
         "tool_input": tool_input,
         "tool_result": tool_result,
-        "hwnd": hwnd
+        "hwnd": hwnd,
+        # 구간별 지연 추적용 trace
+        "trace": {"id": uuid.uuid4().hex[:16], "hook_start": HOOK_START, "hook_send": time.time()}
     }
 
     send_to_server(result_data)
@@ -4,55 +4,126 @@ Stop Hook - Claude 응답 완료 시 마지막 응답을 앱으로 전송
 transcript_path에서 마지막 assistant 메시지를 추출
 """
 
+import time
+HOOK_START = time.time()  # 인터프리터 시작 직후 (trace: hook.startup 구간 시작)
+
 import json
+import os
 import sys
-import requests
+import tempfile
+import uuid
 
 SERVER_URL = "http://localhost:8765/claude-response"
 
+# 파일 끝에서부터 읽는 블록 크기
+BLOCK_SIZE = 64 * 1024
+
+# 세션별 "마지막 Stop 시점 오프셋" 저장 위치 (CLAUDE_REMOTE_STOP_OFFSETS=0이면 사용 안 함)
+SIDECAR_DIR = os.path.join(tempfile.gettempdir(), "claude_remote_stop")
+SIDECAR_ENABLED = os.environ.get("CLAUDE_REMOTE_STOP_OFFSETS", "1") != "0"
+
+
+def iter_lines_reversed(f, end, start=0, block_size=BLOCK_SIZE):
+    """파일의 [start, end) 구간을 끝에서부터 블록 단위로 읽어 줄(bytes)을 역순으로 반환"""
+    pos = end
+    buffer = b''
+    while pos > start:
+        size = min(block_size, pos - start)
+        pos -= size
+        f.seek(pos)
+        buffer = f.read(size) + buffer
+        lines = buffer.split(b'\n')
+        # 첫 줄은 앞부분이 아직 안 읽혔을 수 있음
+        buffer = lines[0]
+        for line in reversed(lines[1:]):
+            yield line
+    if buffer:
+        yield buffer
+
+
+def extract_text(msg):
+    """assistant 메시지에서 텍스트 추출. content가 없으면 None"""
+    content = None
+    if 'message' in msg and isinstance(msg['message'], dict):
+        content = msg['message'].get('content', [])
+    elif 'content' in msg:
+        content = msg['content']
+
+    if content is None:
+        return None
 
-def get_last_assistant_response(transcript_path):
-    """transcript 파일에서 마지막 assistant 응답 추출"""
-    try:
-        with open(transcript_path, 'r', encoding='utf-8') as f:
-            lines = f.readlines()
-
-        # 역순으로 탐색해서 마지막 assistant 메시지 찾기
-        for line in reversed(lines):
-            try:
-                msg = json.loads(line.strip())
-                if msg.get('type') != 'assistant':
-                    continue
-
-                # content에서 텍스트 추출
-                content = None
-                if 'message' in msg and isinstance(msg['message'], dict):
-                    content = msg['message'].get('content', [])
-                elif 'content' in msg:
-                    content = msg['content']
+    text_parts = []
+    if isinstance(content, list):
+        for part in content:
+            if isinstance(part, dict) and part.get('type') == 'text':
+                text_parts.append(part.get('text', ''))
+            elif isinstance(part, str):
+                text_parts.append(part)
+    elif isinstance(content, str):
+        text_parts.append(content)
 
-                if content is None:
-                    continue
+    return '\n'.join(text_parts)
 
-                text_parts = []
-                if isinstance(content, list):
-                    for part in content:
-                        if isinstance(part, dict) and part.get('type') == 'text':
-                            text_parts.append(part.get('text', ''))
-                        elif isinstance(part, str):
-                            text_parts.append(part)
-                elif isinstance(content, str):
-                    text_parts.append(content)
 
-                return '\n'.join(text_parts)
+def get_last_assistant_response(transcript_path, start=0):
+    """transcript 파일에서 마지막 assistant 응답 추출.
+    파일 끝에서부터 필요한 줄만 읽음 (start 이전 구간은 읽지 않음)"""
+    try:
+        with open(transcript_path, 'rb') as f:
+            end = f.seek(0, os.SEEK_END)
+            for line in iter_lines_reversed(f, end, start):
+                # JSON 파싱 전에 빠르게 거르기
+                if b'assistant' not in line:
+                    continue
+                try:
+                    msg = json.loads(line.strip())
+                except (json.JSONDecodeError, UnicodeDecodeError):
+                    continue
+                if not isinstance(msg, dict) or msg.get('type') != 'assistant':
+                    continue
 
-            except json.JSONDecodeError:
-                continue
+                text = extract_text(msg)
+                if text is None:
+                    continue
+                return text
         return None
     except Exception:
         return None
 
 
+def sidecar_path(session_id):
+    safe_id = "".join(c for c in session_id if c.isalnum() or c in "-_")
+    return os.path.join(SIDECAR_DIR, f"{safe_id}.json")
+
+
+def load_offset(session_id, transcript_path):
+    """지난 Stop 때 기록한 파일 크기. 없거나 파일이 바뀌었으면 0"""
+    if not SIDECAR_ENABLED or not session_id:
+        return 0
+    try:
+        with open(sidecar_path(session_id), 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        offset = int(data.get('offset', 0))
+        if data.get('path') != transcript_path or offset > os.path.getsize(transcript_path):
+            return 0
+        return offset
+    except (OSError, ValueError, json.JSONDecodeError):
+        return 0
+
+
+def save_offset(session_id, transcript_path, offset):
+    if not SIDECAR_ENABLED or not session_id:
+        return
+    try:
+        os.makedirs(SIDECAR_DIR, exist_ok=True)
+        tmp = sidecar_path(session_id) + ".tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump({"path": transcript_path, "offset": offset}, f)
+        os.replace(tmp, sidecar_path(session_id))
+    except OSError:
+        pass
+
+
 def main():
     try:
         input_data = json.load(sys.stdin)
@@ -65,14 +136,31 @@ def main():
     if not transcript_path:
         sys.exit(0)
 
-    response_text = get_last_assistant_response(transcript_path)
+    # 지난 Stop 이후 추가된 부분만 읽음
+    start = load_offset(session_id, transcript_path)
+    try:
+        end = os.path.getsize(transcript_path)
+    except OSError:
+        sys.exit(0)
+    response_text = get_last_assistant_response(transcript_path, start)
+    save_offset(session_id, transcript_path, end)
 
     if response_text:
         try:
-            requests.post(SERVER_URL, json={
-                "session_id": session_id,
-                "response": response_text
-            }, timeout=5)
+            import urllib.request
+            req = urllib.request.Request(
+                SERVER_URL,
+                data=json.dumps({
+                    "session_id": session_id,
+                    "transcript_path": transcript_path,
+                    "response": response_text,
+                    "trace": {"id": uuid.uuid4().hex[:16], "hook_start": HOOK_START,
+                              "hook_send": time.time()}
+                }).encode('utf-8'),
+                headers={'Content-Type': 'application/json'},
+                method='POST'
+            )
+            urllib.request.urlopen(req, timeout=5).close()
         except Exception:
             pass
 
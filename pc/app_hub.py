@@ -0,0 +1,195 @@
+"""
+앱 연결 허브
+- 여러 앱 클라이언트(핸드폰/태블릿) 동시 연결 관리
+- 클라이언트별 송신 큐 + writer 태스크 (느린 클라이언트가 Hook 처리를 막지 않음)
+- 브로드캐스트 메시지는 한 번만 직렬화해서 모든 클라이언트가 공유
+- 브로드캐스트마다 증가하는 seq 번호 + 리플레이 로그 (재연결 시 빠진 구간만 재전송)
+- 스트리밍 텍스트처럼 놓쳐도 되는 프레임은 seq / 리플레이 로그 없이 전송 (broadcast_transient)
+- 클라이언트별 세션 구독 (session_id가 있는 메시지는 구독한 클라이언트에만 전송)
+"""
+
+import asyncio
+import json
+import time
+import uuid
+from collections import deque
+
+# 클라이언트별 송신 큐 크기 (초과 시 느린 클라이언트로 보고 연결 종료)
+SEND_QUEUE_SIZE = 256
+
+# 프레임 하나 전송 제한 시간 (초)
+SEND_TIMEOUT = 10
+
+# 리플레이 로그에 보관할 최근 브로드캐스트 프레임 수
+REPLAY_LOG_SIZE = 1000
+
+
+class AppClient:
+    """연결된 앱 하나 (송신 큐 + writer 태스크)"""
+
+    def __init__(self, websocket, queue_size=SEND_QUEUE_SIZE, send_observer=None):
+        self.websocket = websocket
+        self.send_observer = send_observer  # 프레임 전송 시간(초)을 받는 콜백 (메트릭)
+        self.queue = asyncio.Queue(maxsize=queue_size)
+        self.closed = False
+        self.writer_task = None
+        self.sessions = None  # 구독 중인 session_id 집합 (None이면 전체)
+
+    def wants(self, session_id):
+        """이 세션의 메시지를 받는지 (session_id가 없는 메시지는 모두 받음)"""
+        return self.sessions is None or not session_id or session_id in self.sessions
+
+    def enqueue(self, frame):
+        """직렬화된 프레임을 송신 큐에 추가. 큐가 가득 차면 False"""
+        if self.closed:
+            return False
+        try:
+            self.queue.put_nowait(frame)
+            return True
+        except asyncio.QueueFull:
+            return False
+
+    async def send(self, message):
+        """이 클라이언트에만 메시지 전송 (큐 경유, 순서 보장)"""
+        return self.enqueue(json.dumps(message))
+
+    async def run_writer(self):
+        """큐에서 프레임을 꺼내 순서대로 전송"""
+        try:
+            while True:
+                frame = await self.queue.get()
+                started = time.perf_counter()
+                await asyncio.wait_for(self.websocket.send(frame), timeout=SEND_TIMEOUT)
+                if self.send_observer:
+                    self.send_observer(time.perf_counter() - started)
+        except asyncio.CancelledError:
+            raise
+        except asyncio.TimeoutError:
+            print("[허브] 전송 시간 초과 - 클라이언트 연결 종료")
+            await self.close(1011, "send timeout")
+        except Exception:
+            # 연결 끊김 등 - 수신 루프에서 정리됨
+            pass
+        finally:
+            self.closed = True
+
+    async def close(self, code=1000, reason=""):
+        self.closed = True
+        try:
+            await self.websocket.close(code=code, reason=reason)
+        except Exception:
+            pass
+
+
+class AppHub:
+    """앱 클라이언트 집합 + 팬아웃 브로드캐스트 + 리플레이 로그"""
+
+    def __init__(self, queue_size=SEND_QUEUE_SIZE, replay_size=REPLAY_LOG_SIZE, send_observer=None):
+        self.queue_size = queue_size
+        self.send_observer = send_observer
+        self.clients = set()
+        self.dropped_clients = 0
+        self.skipped_transient = 0
+        # 서버 실행마다 바뀌는 ID (재시작 후에는 seq가 이어지지 않으므로 재개 불가)
+        self.epoch = uuid.uuid4().hex[:12]
+        self.seq = 0
+        self.replay_log = deque(maxlen=replay_size)  # (seq, frame, session_id)
+
+    def __len__(self):
+        return len(self.clients)
+
+    def register(self, websocket):
+        """새 연결 등록 + writer 태스크 시작"""
+        client = AppClient(websocket, self.queue_size, self.send_observer)
+        client.writer_task = asyncio.ensure_future(client.run_writer())
+        self.clients.add(client)
+        print(f"[허브] 클라이언트 등록 (총 {len(self.clients)}개)")
+        return client
+
+    async def unregister(self, client):
+        """연결 해제 + writer 태스크 정리"""
+        if client not in self.clients:
+            return
+        self.clients.discard(client)
+        client.closed = True
+        if client.writer_task:
+            client.writer_task.cancel()
+            try:
+                await client.writer_task
+            except (asyncio.CancelledError, Exception):
+                pass
+        print(f"[허브] 클라이언트 해제 (남은 {len(self.clients)}개)")
+
+    def drop(self, client, reason):
+        """느린 클라이언트 연결 종료 (앱은 재연결해서 따라잡음)"""
+        if client.closed:
+            return
+        self.dropped_clients += 1
+        print(f"[허브] 느린 클라이언트 종료: {reason}")
+        client.closed = True
+        asyncio.ensure_future(client.close(1013, reason))
+
+    def broadcast(self, message):
+        """모든 클라이언트에 전송. 직렬화는 한 번만, 전송은 각 writer 태스크가 담당.
+        연결된 클라이언트가 없어도 seq를 붙여 리플레이 로그에 남김.
+        session_id가 있으면 그 세션을 구독한 클라이언트에만 전송.
+        큐에 넣은 클라이언트 수 반환 (블로킹 없음)"""
+        self.seq += 1
+        session_id = message.get("session_id")
+        frame = json.dumps({**message, "seq": self.seq})
+        self.replay_log.append((self.seq, frame, session_id))
+        return self.broadcast_frame(frame, session_id)
+
+    def replay_since(self, last_seq, client=None):
+        """last_seq 이후의 프레임 목록 (client가 구독하지 않는 세션은 제외).
+        로그에서 이미 밀려나 구간을 채울 수 없으면 None"""
+        if last_seq > self.seq:
+            return None
+        if last_seq == self.seq:
+            return []
+        if not self.replay_log or self.replay_log[0][0] > last_seq + 1:
+            return None
+        return [frame for seq, frame, session_id in self.replay_log
+                if seq > last_seq and (client is None or client.wants(session_id))]
+
+    def resume(self, client, epoch, last_seq):
+        """재연결한 클라이언트에 빠진 구간 재전송. 성공하면 True, 전체 동기화가 필요하면 False.
+        register() 직후 await 없이 호출해야 새 브로드캐스트와 순서가 섞이지 않음"""
+        if epoch != self.epoch or last_seq is None:
+            return False
+        frames = self.replay_since(last_seq, client)
+        # 빠진 구간이 송신 큐보다 크면 전체 동기화가 더 저렴함
+        if frames is None or len(frames) > client.queue.maxsize - client.queue.qsize():
+            return False
+        for frame in frames:
+            client.enqueue(frame)
+        print(f"[허브] 세션 재개: seq {last_seq} 이후 {len(frames)}개 재전송")
+        return True
+
+    def broadcast_frame(self, frame, session_id=None):
+        """이미 직렬화된 프레임을 (해당 세션을 구독한) 클라이언트 큐에 추가"""
+        delivered = 0
+        for client in list(self.clients):
+            if not client.wants(session_id):
+                continue
+            if client.enqueue(frame):
+                delivered += 1
+            else:
+                self.drop(client, "send queue full")
+        return delivered
+
+    def broadcast_transient(self, message):
+        """seq 없이 전송, 리플레이 로그에도 남기지 않음 (재연결 때 재전송하지 않는 프레임).
+        송신 큐가 절반 이상 찬 클라이언트는 연결을 끊지 않고 건너뜀 (상태를 바꾸는 프레임 자리 확보)"""
+        session_id = message.get("session_id")
+        frame = json.dumps(message)
+        delivered = 0
+        for client in list(self.clients):
+            if not client.wants(session_id) or client.closed:
+                continue
+            if client.queue.qsize() >= client.queue.maxsize // 2:
+                self.skipped_transient += 1
+                continue
+            if client.enqueue(frame):
+                delivered += 1
+        return delivered
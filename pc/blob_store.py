@@ -0,0 +1,116 @@
+"""
+큰 내용 저장소 (content-addressed, LRU)
+- Write / Edit의 파일 내용, 긴 도구 결과, 긴 Claude 응답 등을 해시 주소로 메모리에 보관
+- 앱에 보내는 프레임에는 미리보기 + blob 참조만 넣고, 전체 내용은 앱이 필요할 때 요청
+  (WebSocket blob_fetch 또는 GET /blob/{ref})
+- 전체 크기 상한을 넘으면 가장 오래 사용하지 않은 내용부터 삭제
+"""
+
+import base64
+import hashlib
+import os
+import zlib
+from collections import OrderedDict
+
+# 메모리에 보관하는 최대 크기 (bytes)
+BLOB_MAX_BYTES = int(os.environ.get("CLAUDE_REMOTE_BLOB_MAX_MB", "64")) * 1024 * 1024
+
+# 이보다 긴 문자열은 blob으로 분리 (글자 수)
+INLINE_LIMIT = 1024
+
+# 프레임에 남기는 미리보기 길이 (글자 수)
+PREVIEW_LENGTH = 300
+
+# 이보다 작은 내용은 압축 요청이 있어도 그대로 전송 (bytes)
+COMPRESS_MIN_SIZE = 512
+
+
+def blob_ref(data):
+    """내용 → 해시 주소"""
+    return hashlib.sha256(data).hexdigest()[:32]
+
+
+def preview_text(text, length=PREVIEW_LENGTH):
+    return text[:length] + f"... ({len(text)} chars)"
+
+
+class BlobStore:
+    """해시 → 내용(bytes). 같은 내용은 한 번만 저장"""
+
+    def __init__(self, max_bytes=BLOB_MAX_BYTES, inline_limit=INLINE_LIMIT):
+        self.max_bytes = max_bytes
+        self.inline_limit = inline_limit
+        self._blobs = OrderedDict()
+        self.size = 0
+        self.evicted = 0
+
+    def __len__(self):
+        return len(self._blobs)
+
+    def __contains__(self, ref):
+        return ref in self._blobs
+
+    def put(self, text):
+        """내용 저장 후 ref 반환"""
+        data = text.encode('utf-8')
+        ref = blob_ref(data)
+        if ref in self._blobs:
+            self._blobs.move_to_end(ref)
+            return ref
+        if len(data) > self.max_bytes:
+            return None
+        self._blobs[ref] = data
+        self.size += len(data)
+        while self.size > self.max_bytes:
+            _, old = self._blobs.popitem(last=False)
+            self.size -= len(old)
+            self.evicted += 1
+        return ref
+
+    def get(self, ref):
+        """내용(bytes) 반환. 없거나 이미 삭제됐으면 None"""
+        data = self._blobs.get(ref)
+        if data is not None:
+            self._blobs.move_to_end(ref)
+        return data
+
+    def fetch_message(self, ref, compress=False):
+        """blob_fetch 응답 메시지. compress면 zlib + base64 (작은 내용은 그대로)"""
+        data = self.get(ref)
+        if data is None:
+            return {"type": "blob", "ref": ref, "error": "not found"}
+        if compress and len(data) >= COMPRESS_MIN_SIZE:
+            return {
+                "type": "blob", "ref": ref, "size": len(data), "encoding": "zlib+base64",
+                "content": base64.b64encode(zlib.compress(data)).decode('ascii')
+            }
+        return {"type": "blob", "ref": ref, "size": len(data), "content": data.decode('utf-8')}
+
+    def compact(self, value, prefix):
+        """value 안의 긴 문자열을 blob으로 분리.
+        (미리보기로 바꾼 value, {"경로": {"ref", "size"}}) 반환. 분리할 게 없으면 blobs는 빈 dict"""
+        blobs = {}
+        compacted = self._compact(value, prefix, blobs)
+        return compacted, blobs
+
+    def _compact(self, value, path, blobs):
+        if isinstance(value, str):
+            if len(value) <= self.inline_limit:
+                return value
+            ref = self.put(value)
+            if ref is not None:
+                blobs[path] = {"ref": ref, "size": len(value)}
+            return preview_text(value)
+        if isinstance(value, dict):
+            return {k: self._compact(v, f"{path}.{k}", blobs) for k, v in value.items()}
+        if isinstance(value, list):
+            return [self._compact(v, f"{path}.{i}", blobs) for i, v in enumerate(value)]
+        return value
+
+    def stats(self):
+        return {
+            "blobs": len(self._blobs),
+            "bytes": self.size,
+            "max_bytes": self.max_bytes,
+            "evicted": self.evicted
+        }
@@ -0,0 +1,188 @@
+"""
+Edit / Write / MultiEdit 입력의 unified diff 미리보기
+- old_string / new_string / content 원본 대신 디스크의 파일과 비교한 짧은 diff를 앱에 전송
+- 권한 요청 시점(적용 전)과 작업 결과 시점(적용 후) 모두 처리
+  (적용 후면 new_string이 파일에 있으므로 거꾸로 되돌려서 비교, 호출하는 쪽이 applied=True로 알려줌)
+- (경로, mtime, 입력 해시, 적용 여부)로 캐시, 같은 입력의 마지막 diff도 보관
+  (Write 결과처럼 적용 후에는 이전 내용을 알 수 없는 경우 권한 요청 때 만든 diff 재사용)
+"""
+
+import difflib
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+
+# 변경 부분 앞뒤로 보여줄 줄 수
+CONTEXT_LINES = 3
+
+# diff 최대 줄 수 (넘으면 잘라서 truncated 표시)
+MAX_DIFF_LINES = 120
+
+# 이보다 큰 파일은 읽지 않고 입력끼리만 비교 (bytes)
+MAX_FILE_SIZE = 2 * 1024 * 1024
+
+CACHE_SIZE = 256
+
+DIFF_TOOLS = ('Edit', 'Write', 'MultiEdit')
+
+# diff로 대체하는 원본 입력 필드
+RAW_FIELDS = ('content', 'old_string', 'new_string', 'edits')
+
+
+def _input_hash(tool_name, tool_input):
+    data = json.dumps([tool_name, tool_input], sort_keys=True, default=str).encode('utf-8')
+    return hashlib.sha1(data).hexdigest()
+
+
+def _stat_file(path):
+    """(mtime_ns, 크기). 없으면 (None, 0)"""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None, 0
+    return st.st_mtime_ns, st.st_size
+
+
+def _read_file(path, mtime, size):
+    """_stat_file 결과로 내용 읽기. 없으면 "", 너무 크거나 읽을 수 없으면 None"""
+    if mtime is None:
+        return ""
+    if size > MAX_FILE_SIZE:
+        return None
+    try:
+        with open(path, 'r', encoding='utf-8', errors='replace', newline='') as f:
+            return f.read()
+    except OSError:
+        return None
+
+
+def _apply_edits(text, edits):
+    """edits를 순서대로 적용. 하나라도 old_string을 찾지 못하면 None"""
+    for edit in edits:
+        old = edit.get('old_string', '')
+        new = edit.get('new_string', '')
+        if not old or old not in text:
+            return None
+        text = text.replace(old, new) if edit.get('replace_all') else text.replace(old, new, 1)
+    return text
+
+
+def _revert_edits(text, edits):
+    """적용된 edits를 거꾸로 되돌림. 되돌릴 수 없으면 None"""
+    reverted = [{'old_string': e.get('new_string', ''), 'new_string': e.get('old_string', ''),
+                 'replace_all': e.get('replace_all')} for e in reversed(edits)]
+    return _apply_edits(text, reverted)
+
+
+def _before_after(tool_name, tool_input, current, applied=None):
+    """(변경 전, 변경 후, 적용 여부) 추정. current는 디스크 내용 (읽지 못했으면 None)
+    applied: True면 이미 적용된 결과 (되돌리기만 시도), None이면 파일 내용으로 판단"""
+    if tool_name == 'Write':
+        content = tool_input.get('content', '')
+        if applied or (current is not None and current == content):
+            return None  # 이미 적용됨 - 이전 내용을 알 수 없음
+        return current or "", content, False
+
+    if tool_name == 'Edit':
+        edits = [tool_input]
+    else:
+        edits = tool_input.get('edits') or []
+    if not edits:
+        return None
+
+    if current is not None:
+        # 적용 후에 다시 적용하면 new_string이 old_string을 포함할 때 두 번 적용됨
+        if not applied:
+            after = _apply_edits(current, edits)
+            if after is not None:
+                return current, after, False
+        before = _revert_edits(current, edits)
+        if before is not None:
+            return before, current, True
+
+    # 파일과 맞지 않으면 입력끼리 비교
+    before = "\n".join(e.get('old_string', '') for e in edits)
+    after = "\n".join(e.get('new_string', '') for e in edits)
+    return before, after, False
+
+
+def unified_diff(path, before, after):
+    """(diff 텍스트, 추가 줄 수, 삭제 줄 수, 잘림 여부)"""
+    lines = list(difflib.unified_diff(
+        before.splitlines(), after.splitlines(),
+        fromfile=f"a/{os.path.basename(path)}", tofile=f"b/{os.path.basename(path)}",
+        n=CONTEXT_LINES, lineterm=''
+    ))
+    added = sum(1 for l in lines if l.startswith('+') and not l.startswith('+++'))
+    removed = sum(1 for l in lines if l.startswith('-') and not l.startswith('---'))
+    truncated = len(lines) > MAX_DIFF_LINES
+    if truncated:
+        lines = lines[:MAX_DIFF_LINES]
+    return "\n".join(lines), added, removed, truncated
+
+
+class DiffPreviewer:
+    """diff 미리보기 계산 + 캐시 (executor 스레드에서 호출해도 안전)"""
+
+    def __init__(self, cache_size=CACHE_SIZE):
+        self.cache_size = cache_size
+        self._cache = OrderedDict()     # (path, mtime_ns, input_hash, applied) -> preview
+        self._by_input = OrderedDict()  # input_hash -> 마지막 preview
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _remember(self, cache, key, value):
+        cache[key] = value
+        cache.move_to_end(key)
+        while len(cache) > self.cache_size:
+            cache.popitem(last=False)
+
+    def preview(self, tool_name, tool_input, applied=None):
+        """diff 미리보기 dict 반환. 대상 도구가 아니거나 만들 수 없으면 None
+        applied=True: 작업 결과 시점 (파일에 이미 적용됨)"""
+        if tool_name not in DIFF_TOOLS or not isinstance(tool_input, dict):
+            return None
+        path = tool_input.get('file_path')
+        if not isinstance(path, str) or not path:
+            return None
+
+        # 캐시 확인은 stat만으로 (파일 내용은 캐시에 없을 때만 읽음)
+        input_hash = _input_hash(tool_name, tool_input)
+        mtime, size = _stat_file(path)
+        key = (path, mtime, input_hash, applied)
+        with self._lock:
+            if key in self._cache:
+                self.hits += 1
+                self._cache.move_to_end(key)
+                return self._cache[key]
+
+        current = _read_file(path, mtime, size)
+        result = _before_after(tool_name, tool_input, current, applied)
+        if result is None:
+            # 이미 적용된 Write 등: 같은 입력으로 만든 이전 diff 재사용
+            with self._lock:
+                previous = self._by_input.get(input_hash)
+                if previous is not None:
+                    self.hits += 1
+                    return {**previous, "applied": True}
+                self.misses += 1
+            return None
+
+        before, after, applied = result
+        diff, added, removed, truncated = unified_diff(path, before, after)
+        preview = {
+            "file_path": path,
+            "diff": diff,
+            "added": added,
+            "removed": removed,
+            "truncated": truncated,
+            "applied": applied
+        }
+        with self._lock:
+            self.misses += 1
+            self._remember(self._cache, key, preview)
+            self._remember(self._by_input, input_hash, preview)
+        return preview
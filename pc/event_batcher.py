@@ -0,0 +1,81 @@
+"""
+이벤트 마이크로 배치
+- Read / Grep 등이 연달아 실행될 때 tool_result를 짧은 시간 창 동안 모아서 한 프레임으로 전송
+- 창(window)이 끝나거나 개수 임계값에 도달하면 flush
+- 배치 크기 / 배치로 늘어난 지연 통계 수집 (GET /stats)
+"""
+
+import asyncio
+import os
+import time
+
+# 모으는 시간 (ms). 0이면 배치 없이 바로 전송
+BATCH_WINDOW_MS = float(os.environ.get("CLAUDE_REMOTE_BATCH_WINDOW_MS", "50"))
+
+# 이 개수가 모이면 창이 끝나기 전에 바로 전송
+BATCH_MAX_SIZE = int(os.environ.get("CLAUDE_REMOTE_BATCH_MAX", "20"))
+
+
+class EventBatcher:
+    """add()로 받은 항목을 모아 flush_cb(items)로 전달 (이벤트 루프 스레드에서만 사용)"""
+
+    def __init__(self, flush_cb, window_ms=BATCH_WINDOW_MS, max_size=BATCH_MAX_SIZE):
+        self.flush_cb = flush_cb
+        self.window = window_ms / 1000
+        self.max_size = max(1, max_size)
+        self._items = []
+        self._added_at = []
+        self._timer = None
+
+        # 통계
+        self.batches = 0
+        self.items = 0
+        self.max_batch = 0
+        self.total_delay = 0.0
+        self.max_delay = 0.0
+
+    def __len__(self):
+        return len(self._items)
+
+    def add(self, item):
+        """항목 추가. 임계값에 도달하면 바로 flush"""
+        self._items.append(item)
+        self._added_at.append(time.monotonic())
+        if self.window <= 0 or len(self._items) >= self.max_size:
+            self.flush()
+        elif self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(self.window, self.flush)
+
+    def flush(self):
+        """모인 항목 전송 (다른 프레임보다 먼저 보내야 할 때도 호출)"""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._items:
+            return
+        items, added_at = self._items, self._added_at
+        self._items, self._added_at = [], []
+
+        now = time.monotonic()
+        self.batches += 1
+        self.items += len(items)
+        self.max_batch = max(self.max_batch, len(items))
+        for t in added_at:
+            delay = now - t
+            self.total_delay += delay
+            self.max_delay = max(self.max_delay, delay)
+
+        self.flush_cb(items)
+
+    def stats(self):
+        return {
+            "window_ms": self.window * 1000,
+            "max_size": self.max_size,
+            "batches": self.batches,
+            "items": self.items,
+            "avg_batch_size": round(self.items / self.batches, 2) if self.batches else 0,
+            "max_batch_size": self.max_batch,
+            "avg_added_delay_ms": round(self.total_delay / self.items * 1000, 2) if self.items else 0,
+            "max_added_delay_ms": round(self.max_delay * 1000, 2),
+            "pending": len(self._items)
+        }
@@ -0,0 +1,173 @@
+"""
+작업 히스토리 저장소
+- SQLite append-only 저널 (서버 재시작 후에도 유지)
+- 최근 항목은 링버퍼 핫 캐시에서 바로 응답
+- 시간 / 도구 이름 / 세션 인덱스 + 커서 기반 페이지 조회
+"""
+
+import asyncio
+import json
+import os
+import sqlite3
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+DB_PATH = os.environ.get(
+    "CLAUDE_REMOTE_HISTORY_DB",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "history.db")
+)
+
+# 메모리에 유지할 최근 항목 수
+HOT_CACHE_SIZE = 500
+
+# 한 페이지 최대 항목 수
+MAX_PAGE_SIZE = 200
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS history (
+    id INTEGER PRIMARY KEY,
+    ts REAL NOT NULL,
+    tool_name TEXT,
+    session_id TEXT,
+    entry TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_history_ts ON history (ts);
+CREATE INDEX IF NOT EXISTS idx_history_tool ON history (tool_name, id);
+CREATE INDEX IF NOT EXISTS idx_history_session ON history (session_id, id);
+"""
+
+
+def _matches(entry, tool_name=None, session_id=None, since=None, until=None):
+    """핫 캐시 항목이 필터 조건에 맞는지"""
+    if tool_name and entry.get("tool_name") != tool_name:
+        return False
+    if session_id and entry.get("session_id") != session_id:
+        return False
+    ts = entry.get("ts", 0)
+    if since is not None and ts < since:
+        return False
+    if until is not None and ts > until:
+        return False
+    return True
+
+
+class HistoryStore:
+    """SQLite 저널 + 핫 캐시. 쓰기/조회는 전용 스레드 하나에서 순서대로 실행"""
+
+    def __init__(self, path=DB_PATH, hot_size=HOT_CACHE_SIZE):
+        self.path = path
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="history")
+
+        # 최근 항목을 핫 캐시에 적재
+        rows = self.conn.execute(
+            "SELECT entry FROM history ORDER BY id DESC LIMIT ?", (hot_size,)
+        ).fetchall()
+        self.hot = deque((json.loads(r[0]) for r in reversed(rows)), maxlen=hot_size)
+
+        row = self.conn.execute("SELECT MIN(id), MAX(id) FROM history").fetchone()
+        self._first_id = row[0]
+        self._next_id = (row[1] or 0) + 1
+        print(f"[히스토리] {path} 로드 (최근 {len(self.hot)}개 캐시)")
+
+    def __len__(self):
+        return self._next_id - (self._first_id or self._next_id)
+
+    def append(self, entry):
+        """항목 추가. id를 바로 부여하고 디스크 기록은 백그라운드 스레드에서 수행"""
+        entry = {"id": self._next_id, **entry}
+        self._next_id += 1
+        if self._first_id is None:
+            self._first_id = entry["id"]
+        self.hot.append(entry)
+        self._executor.submit(self._insert, entry)
+        return entry
+
+    def _insert(self, entry):
+        try:
+            with self.conn:
+                self.conn.execute(
+                    "INSERT INTO history (id, ts, tool_name, session_id, entry) VALUES (?, ?, ?, ?, ?)",
+                    (entry["id"], entry.get("ts", 0), entry.get("tool_name"),
+                     entry.get("session_id"), json.dumps(entry))
+                )
+        except Exception as e:
+            print(f"[히스토리] 저장 실패: {e}")
+
+    def recent(self, limit):
+        """최근 limit개 (오래된 것 → 최신 순)"""
+        if limit <= 0:
+            return []
+        return list(self.hot)[-limit:]
+
+    async def page(self, cursor=None, limit=50, tool_name=None, session_id=None,
+                   since=None, until=None):
+        """cursor(id)보다 오래된 항목 중 최신 limit개 조회.
+        반환: (items 오래된 것 → 최신 순, next_cursor 또는 None)"""
+        limit = max(1, min(int(limit), MAX_PAGE_SIZE))
+        filters = dict(tool_name=tool_name, session_id=session_id, since=since, until=until)
+
+        result = self._page_from_hot(cursor, limit, filters)
+        if result is not None:
+            return result
+
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._executor, self._page_from_db, cursor, limit, filters
+        )
+
+    def _page_from_hot(self, cursor, limit, filters):
+        """핫 캐시만으로 답할 수 있으면 결과 반환, 아니면 None"""
+        items = []
+        for entry in reversed(self.hot):
+            if cursor is not None and entry["id"] >= cursor:
+                continue
+            if _matches(entry, **filters):
+                items.append(entry)
+                if len(items) > limit:
+                    break
+
+        if len(items) > limit:
+            items = items[:limit]
+            return list(reversed(items)), items[-1]["id"]
+
+        # 캐시가 저널 전체를 담고 있으면 더 오래된 항목이 없음
+        if not self.hot or self.hot[0]["id"] == self._first_id:
+            return list(reversed(items)), None
+        return None
+
+    def _page_from_db(self, cursor, limit, filters):
+        where, args = [], []
+        if cursor is not None:
+            where.append("id < ?")
+            args.append(cursor)
+        if filters["tool_name"]:
+            where.append("tool_name = ?")
+            args.append(filters["tool_name"])
+        if filters["session_id"]:
+            where.append("session_id = ?")
+            args.append(filters["session_id"])
+        if filters["since"] is not None:
+            where.append("ts >= ?")
+            args.append(filters["since"])
+        if filters["until"] is not None:
+            where.append("ts <= ?")
+            args.append(filters["until"])
+
+        sql = "SELECT entry FROM history"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY id DESC LIMIT ?"
+        args.append(limit + 1)
+
+        rows = self.conn.execute(sql, args).fetchall()
+        items = [json.loads(r[0]) for r in rows[:limit]]
+        next_cursor = items[-1]["id"] if len(rows) > limit else None
+        return list(reversed(items)), next_cursor
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+        self.conn.close()
@@ -0,0 +1,141 @@
+"""
+입력 전송 디스패처
+- 창(HWND)별 순서 보장 큐 + 단일 워커 (클립보드/키보드는 워커 스레드 하나만 사용)
+- 같은 창에 연달아 들어온 명령은 한 번의 창 활성화로 묶어서 전송
+- 명령마다 queued / started / finished 시각 기록 (지연 시간 확인용)
+"""
+
+import asyncio
+import itertools
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+# 한 번에 묶어서 보낼 최대 명령 수
+COALESCE_MAX = 8
+
+
+class Command:
+    """전송 대기 중인 명령 하나"""
+
+    _ids = itertools.count(1)
+
+    def __init__(self, hwnd, message, command_id=None):
+        self.command_id = command_id or f"cmd-{next(self._ids)}"
+        self.hwnd = hwnd
+        self.message = message
+        self.queued_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.batch_size = 1
+        self.success = False
+        self.error = None
+        self.future = asyncio.get_running_loop().create_future()
+
+    def timing(self):
+        """앱에 보낼 시각 정보 (ms 단위 epoch + 구간별 소요 시간)"""
+        return {
+            "command_id": self.command_id,
+            "queued_at": int(self.queued_at * 1000),
+            "started_at": int(self.started_at * 1000) if self.started_at else None,
+            "finished_at": int(self.finished_at * 1000) if self.finished_at else None,
+            "queue_ms": round((self.started_at - self.queued_at) * 1000, 1) if self.started_at else None,
+            "send_ms": round((self.finished_at - self.started_at) * 1000, 1) if self.finished_at else None,
+            "coalesced": self.batch_size
+        }
+
+
+class InputDispatcher:
+    """창별 큐를 라운드 로빈으로 처리하는 단일 워커"""
+
+    def __init__(self, backend, coalesce=True, coalesce_max=COALESCE_MAX, send_observer=None):
+        self.backend = backend
+        self.send_observer = send_observer  # 창 입력 한 번에 걸린 시간(초)을 받는 콜백 (메트릭)
+        self.coalesce = coalesce
+        self.coalesce_max = coalesce_max
+        self.queues = {}        # hwnd -> deque[Command]
+        self.ready = deque()    # 처리 대기 중인 hwnd 순서
+        self._wakeup = asyncio.Event()
+        # 클립보드/키보드를 소유하는 전용 스레드 (명령끼리 붙여넣기 단계가 섞이지 않음)
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="input")
+        self._task = None
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.ensure_future(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self._executor.shutdown(wait=False)
+
+    def pending(self):
+        return sum(len(q) for q in self.queues.values())
+
+    def submit(self, hwnd, message, command_id=None):
+        """명령을 창별 큐에 추가. 완료되면 command.future에 (success, error) 설정"""
+        cmd = Command(hwnd, message, command_id)
+        queue = self.queues.get(hwnd)
+        if queue is None:
+            queue = self.queues[hwnd] = deque()
+            self.ready.append(hwnd)
+        queue.append(cmd)
+        self._wakeup.set()
+        self.start()
+        return cmd
+
+    def _next_batch(self):
+        """다음 창의 큐에서 묶어 보낼 명령들 꺼내기"""
+        hwnd = self.ready.popleft()
+        queue = self.queues[hwnd]
+        batch = [queue.popleft()]
+        while self.coalesce and queue and len(batch) < self.coalesce_max:
+            batch.append(queue.popleft())
+
+        if queue:
+            # 남은 명령은 다른 창 다음 차례로
+            self.ready.append(hwnd)
+        else:
+            del self.queues[hwnd]
+        return hwnd, batch
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            if not self.ready:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+
+            hwnd, batch = self._next_batch()
+            started = time.time()
+            for cmd in batch:
+                cmd.started_at = started
+                cmd.batch_size = len(batch)
+
+            try:
+                results = await loop.run_in_executor(
+                    self._executor, self.backend.send_messages, hwnd, [c.message for c in batch]
+                )
+            except Exception as e:
+                results = [(False, f"메시지 전송 실패: {e}")] * len(batch)
+            results = list(results) + [(False, "메시지 전송 안 됨")] * (len(batch) - len(results))
+
+            finished = time.time()
+            if self.send_observer:
+                self.send_observer(finished - started)
+            for cmd, (success, error) in zip(batch, results):
+                cmd.finished_at = finished
+                cmd.success = success
+                cmd.error = error
+                if not cmd.future.done():
+                    cmd.future.set_result((success, error))
+
+            if len(batch) > 1:
+                print(f"[디스패처] HWND {hwnd}: 명령 {len(batch)}개 묶어서 전송 "
+                      f"({(finished - started) * 1000:.0f} ms)")
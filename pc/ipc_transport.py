@@ -0,0 +1,94 @@
+"""
+Hook → 서버 로컬 IPC 전송 계층
+- Linux/macOS: Unix domain socket, Windows: named pipe
+- TCP/HTTP 대신 길이 접두 프레임으로 요청/응답 (연결 하나로 여러 요청 가능)
+- 기존 aiohttp 라우트와 같은 경로('/', '/tool-result', '/claude-response', '/hook/...')를 처리
+
+프레임 형식 (정수는 big-endian):
+    요청: [u32 길이][u16 경로 길이][경로][본문]
+    응답: [u32 길이][u16 상태 코드][본문]
+"""
+
+import asyncio
+import os
+import sys
+
+if sys.platform == 'win32':
+    IPC_ADDRESS = os.environ.get("CLAUDE_REMOTE_IPC", r'\\.\pipe\claude-remote')
+else:
+    IPC_ADDRESS = os.environ.get("CLAUDE_REMOTE_IPC", f"/tmp/claude-remote-{os.getuid()}.sock")
+
+# 프레임 최대 크기 (이보다 크면 연결 종료)
+MAX_FRAME_SIZE = 16 * 1024 * 1024
+
+
+def pack_request(path, body):
+    path_bytes = path.encode('utf-8')
+    size = 2 + len(path_bytes) + len(body)
+    return size.to_bytes(4, 'big') + len(path_bytes).to_bytes(2, 'big') + path_bytes + body
+
+
+def pack_response(status, body):
+    return (2 + len(body)).to_bytes(4, 'big') + status.to_bytes(2, 'big') + body
+
+
+def unpack_request(frame):
+    path_len = int.from_bytes(frame[:2], 'big')
+    return frame[2:2 + path_len].decode('utf-8'), frame[2 + path_len:]
+
+
+class IpcServer:
+    """프레임 단위로 handler(path, body) → (status, body)를 호출하는 로컬 서버"""
+
+    def __init__(self, handler, address=IPC_ADDRESS):
+        self.handler = handler
+        self.address = address
+        self._servers = []
+
+    async def start(self):
+        loop = asyncio.get_running_loop()
+        if sys.platform == 'win32':
+            # ProactorEventLoop(Windows 기본)만 named pipe 서버 지원
+            if not hasattr(loop, 'start_serving_pipe'):
+                print("[IPC] 현재 이벤트 루프는 named pipe를 지원하지 않음 - HTTP만 사용")
+                return False
+            self._servers = await loop.start_serving_pipe(
+                lambda: asyncio.StreamReaderProtocol(asyncio.StreamReader(), self._on_client),
+                self.address
+            )
+        else:
+            # 이전 실행에서 남은 소켓 파일 제거
+            if os.path.exists(self.address):
+                os.remove(self.address)
+            server = await asyncio.start_unix_server(self._on_client, path=self.address)
+            os.chmod(self.address, 0o600)
+            self._servers = [server]
+        print(f"[IPC] 로컬 IPC 서버 시작: {self.address}")
+        return True
+
+    async def _on_client(self, reader, writer):
+        try:
+            while True:
+                header = await reader.readexactly(4)
+                size = int.from_bytes(header, 'big')
+                if size < 2 or size > MAX_FRAME_SIZE:
+                    break
+                path, body = unpack_request(await reader.readexactly(size))
+                try:
+                    status, response = await self.handler(path, body)
+                except Exception as e:
+                    print(f"[IPC] 요청 처리 실패 {path}: {e}")
+                    status, response = 500, b''
+                writer.write(pack_response(status, response))
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    def close(self):
+        for server in self._servers:
+            server.close()
+        self._servers = []
+        if sys.platform != 'win32' and os.path.exists(self.address):
+            os.remove(self.address)
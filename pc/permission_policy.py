@@ -0,0 +1,267 @@
+"""
+권한 정책 엔진
+- 앱까지 왕복하지 않고 서버에서 바로 권한 요청에 답하는 allow / deny / ask 규칙
+- tool_name과 tool_input의 command / file_path 필드를 glob 패턴으로 매칭
+- allow 규칙은 사람 확인 없이 허용하므로 더 좁게 매칭
+  - command: 와일드카드 패턴은 ; & | ` $( 줄바꿈 등 명령을 잇는 문자가 있으면 매칭하지 않음 (정확히 같은 명령만 예외)
+  - file_path: 정규화한 경로와 비교, *와 ?는 /를 넘지 않음 (여러 단계는 **)
+  - deny / ask 규칙은 넓게 매칭 (*가 /도 포함, 경로는 정규화 후 비교)
+- 규칙은 추가/삭제 시 한 번만 컴파일 (tool_name별 인덱스 + 정규식), 요청마다 dict 조회 + match만 수행
+- JSON 파일에 저장, 앱에서 policy_list / policy_add / policy_remove로 편집
+- 우선순위: deny > ask > allow (Claude Code 설정과 동일)
+"""
+
+import json
+import os
+import posixpath
+import re
+import time
+import uuid
+from fnmatch import translate
+
+# 규칙 저장 파일
+POLICY_PATH = os.environ.get(
+    "CLAUDE_REMOTE_POLICY",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "permission_policy.json")
+)
+
+ACTIONS = ('deny', 'ask', 'allow')
+
+# tool_input에서 매칭하는 필드
+MATCH_FIELDS = ('command', 'file_path')
+
+WILDCARD_CHARS = set('*?[')
+
+# 명령 하나에 다른 명령을 잇거나 끼워 넣는 셸 문자 (allow 규칙의 와일드카드 command는 거부)
+SHELL_OPERATORS = (';', '&', '|', '`', '$(', '<(', '>', '\n', '\r')
+
+
+def compile_pattern(pattern):
+    """glob 패턴 → 매칭 함수. 와일드카드가 없으면 문자열 비교"""
+    if not WILDCARD_CHARS & set(pattern):
+        return pattern.__eq__
+    return re.compile(translate(pattern), re.DOTALL).match
+
+
+def normalize_path(path):
+    """비교용 경로 (구분자는 /, . / .. 정리)"""
+    return posixpath.normpath(path.replace('\\', '/'))
+
+
+def _translate_path(pattern):
+    """경로 glob → 정규식. *와 ?는 /를 넘지 않고 **만 여러 단계와 매칭"""
+    parts = []
+    i, n = 0, len(pattern)
+    while i < n:
+        c = pattern[i]
+        if pattern.startswith('**', i):
+            parts.append('.*')
+            i += 2
+            continue
+        if c == '*':
+            parts.append('[^/]*')
+        elif c == '?':
+            parts.append('[^/]')
+        elif c == '[' and pattern.find(']', i + 2) != -1:
+            j = pattern.find(']', i + 2)
+            body = pattern[i + 1:j]
+            negate = body.startswith('!')
+            if negate:
+                body = body[1:] + '/'  # 부정 범위도 /는 포함하지 않음
+            body = ''.join('\\' + ch if ch in '\\[]^&~|' else ch for ch in body)
+            parts.append(('[^' if negate else '[') + body + ']')
+            i = j + 1
+            continue
+        else:
+            parts.append(re.escape(c))
+        i += 1
+    return r'(?s:' + ''.join(parts) + r')\Z'
+
+
+def compile_path_pattern(pattern):
+    """allow 규칙의 file_path 패턴 → 매칭 함수 (정규화한 경로 기준)"""
+    pattern = normalize_path(pattern)
+    if not WILDCARD_CHARS & set(pattern):
+        return pattern.__eq__
+    return re.compile(_translate_path(pattern)).match
+
+
+def compile_command_pattern(pattern):
+    """allow 규칙의 command 패턴 → 매칭 함수.
+    와일드카드 패턴은 셸 연산자가 있는 명령과 매칭하지 않음 ("git status*"가 "git status; rm ..."을 허용하지 않도록)"""
+    match = compile_pattern(pattern)
+    if not WILDCARD_CHARS & set(pattern):
+        return match
+    return lambda value: not any(op in value for op in SHELL_OPERATORS) and match(value)
+
+
+def compile_field(name, pattern, action):
+    """규칙 필드 → 매칭 함수 (allow는 좁게, deny / ask는 넓게)"""
+    if action == 'allow':
+        if name == 'command':
+            return compile_command_pattern(pattern)
+        if name == 'file_path':
+            return compile_path_pattern(pattern)
+    if name == 'file_path':
+        return compile_pattern(normalize_path(pattern))
+    return compile_pattern(pattern)
+
+
+class PolicyRule:
+    """규칙 하나 + 컴파일된 필드 매처"""
+
+    def __init__(self, action, tool_name="*", command=None, file_path=None,
+                 rule_id=None, created_at=None, source="app"):
+        if action not in ACTIONS:
+            raise ValueError(f"알 수 없는 action: {action}")
+        if not tool_name:
+            raise ValueError("tool_name이 필요함")
+        for name, value in (('tool_name', tool_name), ('command', command), ('file_path', file_path)):
+            if value is not None and not isinstance(value, str):
+                raise ValueError(f"{name}은 문자열이어야 함")
+        self.id = rule_id or uuid.uuid4().hex[:8]
+        self.action = action
+        self.tool_name = tool_name
+        self.fields = {}
+        if command:
+            self.fields['command'] = command
+        if file_path:
+            self.fields['file_path'] = file_path
+        self.created_at = created_at or time.time()
+        self.source = source
+
+        self._tool_match = compile_pattern(tool_name)
+        self._matchers = [(name, compile_field(name, p, action)) for name, p in self.fields.items()]
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(
+            action=data.get('action'),
+            tool_name=data.get('tool_name') or "*",
+            command=data.get('command'),
+            file_path=data.get('file_path'),
+            rule_id=data.get('id'),
+            created_at=data.get('created_at'),
+            source=data.get('source', "app")
+        )
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "action": self.action,
+            "tool_name": self.tool_name,
+            **self.fields,
+            "created_at": self.created_at,
+            "source": self.source
+        }
+
+    def matches(self, tool_input):
+        for name, match in self._matchers:
+            value = tool_input.get(name)
+            if not isinstance(value, str):
+                return False
+            if name == 'file_path':
+                value = normalize_path(value)
+            if not match(value):
+                return False
+        return True
+
+
+def rule_for_request(tool_name, tool_input, action="allow", source="always"):
+    """앱에서 '항상 허용'한 요청과 같은 요청에 맞는 규칙 생성
+    (command / file_path가 있으면 그 값 그대로, 없으면 도구 전체)"""
+    fields = {}
+    if isinstance(tool_input, dict):
+        for name in MATCH_FIELDS:
+            value = tool_input.get(name)
+            if isinstance(value, str) and value:
+                # 값 안의 glob 문자는 그대로 매칭되도록 이스케이프
+                fields[name] = re.sub(r'([*?\[])', r'[\1]', value)
+    return PolicyRule(action, tool_name, source=source, **fields)
+
+
+class PermissionPolicy:
+    """규칙 목록 관리 + 요청 평가"""
+
+    def __init__(self, path=POLICY_PATH):
+        self.path = path
+        self.rules = []
+        self._index = {}     # tool_name -> [rule] (와일드카드 없는 tool_name)
+        self._wildcard = []  # tool_name에 와일드카드가 있는 규칙
+        self.load()
+
+    def load(self):
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            self.rules = [PolicyRule.from_dict(item) for item in data.get('rules', [])]
+        except (OSError, ValueError) as e:
+            print(f"[정책] 규칙 파일 읽기 실패: {e}")
+            self.rules = []
+        self._rebuild()
+        print(f"[정책] 규칙 {len(self.rules)}개 로드")
+
+    def save(self):
+        if not self.path:
+            return
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({"rules": self.to_list()}, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.path)
+
+    def _rebuild(self):
+        """규칙 변경 시 tool_name 인덱스 재구성 (deny > ask > allow 순으로 정렬)"""
+        order = {action: i for i, action in enumerate(ACTIONS)}
+        rules = sorted(self.rules, key=lambda r: order[r.action])
+        self._index = {}
+        self._wildcard = []
+        for rule in rules:
+            if WILDCARD_CHARS & set(rule.tool_name):
+                self._wildcard.append(rule)
+            else:
+                self._index.setdefault(rule.tool_name, []).append(rule)
+
+    def add(self, rule):
+        """규칙 추가. 같은 내용의 규칙이 이미 있으면 그 규칙 반환"""
+        for existing in self.rules:
+            if (existing.action, existing.tool_name, existing.fields) == \
+                    (rule.action, rule.tool_name, rule.fields):
+                return existing
+        self.rules.append(rule)
+        self._rebuild()
+        self.save()
+        return rule
+
+    def remove(self, rule_id):
+        before = len(self.rules)
+        self.rules = [r for r in self.rules if r.id != rule_id]
+        if len(self.rules) == before:
+            return False
+        self._rebuild()
+        self.save()
+        return True
+
+    def evaluate(self, tool_name, tool_input):
+        """(action, rule) 반환. 맞는 규칙이 없으면 (None, None)"""
+        if not isinstance(tool_input, dict):
+            tool_input = {}
+        best = None
+        for rule in self._index.get(tool_name, ()):
+            if rule.matches(tool_input):
+                best = rule
+                break
+        if self._wildcard and (best is None or best.action != 'deny'):
+            for rule in self._wildcard:
+                if best is not None and ACTIONS.index(rule.action) >= ACTIONS.index(best.action):
+                    break
+                if rule._tool_match(tool_name) and rule.matches(tool_input):
+                    best = rule
+                    break
+        if best is None:
+            return None, None
+        return best.action, best
+
+    def to_list(self):
+        return [rule.to_dict() for rule in self.rules]
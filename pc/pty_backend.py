@@ -0,0 +1,188 @@
+"""
+PTY 세션 백엔드 (Linux / macOS)
+- server.py가 Claude CLI를 가상 터미널(PTY) 아래에서 직접 실행하고 소유
+- 명령은 PTY master에 바로 기록 (창 활성화, 클립보드, sleep 없음)
+- 출력은 세션별 스크롤백 버퍼(크기 제한)에 저장, 앱이 요청하면 전송
+"""
+
+import atexit
+import fcntl
+import os
+import re
+import shlex
+import struct
+import subprocess
+import termios
+import threading
+from collections import deque
+
+from window_registry import WindowBackend
+
+# 실행할 명령 / 작업 폴더
+PTY_COMMAND = os.environ.get("CLAUDE_REMOTE_PTY_CMD", "claude")
+PTY_CWD = os.environ.get("CLAUDE_REMOTE_PTY_CWD") or None
+
+# 세션별 스크롤백 최대 크기 (bytes)
+SCROLLBACK_SIZE = 256 * 1024
+
+# 가상 터미널 크기
+PTY_ROWS = 40
+PTY_COLS = 120
+
+# 터미널 제어 시퀀스 (CSI / OSC / 기타 ESC)
+ANSI_RE = re.compile(r'\x1b\[[0-?]*[ -/]*[@-~]|\x1b\][^\x07\x1b]*(?:\x07|\x1b\\)|\x1b[@-Z\\-_]')
+
+# 여러 줄 메시지를 한 번에 입력하기 위한 bracketed paste
+PASTE_START = b'\x1b[200~'
+PASTE_END = b'\x1b[201~'
+
+
+def strip_ansi(text):
+    """터미널 제어 시퀀스 제거"""
+    return ANSI_RE.sub('', text).replace('\r\n', '\n').replace('\r', '\n')
+
+
+class PtySession:
+    """PTY 아래에서 실행 중인 프로세스 하나 + 출력 스크롤백"""
+
+    def __init__(self, handle, command=PTY_COMMAND, cwd=PTY_CWD, scrollback_size=SCROLLBACK_SIZE):
+        self.handle = handle
+        self.command = command
+        self.scrollback_size = scrollback_size
+        self._chunks = deque()
+        self._size = 0
+        self._lock = threading.Lock()
+
+        self.master_fd, slave_fd = os.openpty()
+        fcntl.ioctl(slave_fd, termios.TIOCSWINSZ, struct.pack('HHHH', PTY_ROWS, PTY_COLS, 0, 0))
+        env = dict(os.environ, TERM=os.environ.get("TERM", "xterm-256color"))
+        try:
+            self.process = subprocess.Popen(
+                shlex.split(command),
+                stdin=slave_fd, stdout=slave_fd, stderr=slave_fd,
+                cwd=cwd, env=env, start_new_session=True, close_fds=True
+            )
+        finally:
+            os.close(slave_fd)
+
+        self._reader = threading.Thread(target=self._read_loop, daemon=True,
+                                        name=f"pty-{handle}")
+        self._reader.start()
+        print(f"[PTY] 세션 {handle} 시작: {command} (pid {self.process.pid})")
+
+    @property
+    def title(self):
+        return f"{self.command} (pid {self.process.pid})"
+
+    def is_alive(self):
+        return self.process.poll() is None
+
+    def _read_loop(self):
+        """PTY 출력 수신 → 스크롤백에 추가 (오래된 부분부터 버림)"""
+        while True:
+            try:
+                data = os.read(self.master_fd, 4096)
+            except OSError:
+                break
+            if not data:
+                break
+            with self._lock:
+                self._chunks.append(data)
+                self._size += len(data)
+                while self._size > self.scrollback_size and len(self._chunks) > 1:
+                    self._size -= len(self._chunks.popleft())
+        print(f"[PTY] 세션 {self.handle} 출력 종료")
+
+    def write(self, message):
+        """메시지 입력 + Enter. 여러 줄이면 bracketed paste로 한 번에 입력"""
+        data = message.encode('utf-8')
+        if b'\n' in data:
+            data = PASTE_START + data + PASTE_END
+        os.write(self.master_fd, data + b'\r')
+
+    def scrollback(self, max_bytes=None, raw=False):
+        with self._lock:
+            data = b''.join(self._chunks)
+        if max_bytes:
+            data = data[-max_bytes:]
+        text = data.decode('utf-8', errors='replace')
+        return text if raw else strip_ansi(text)
+
+    def close(self):
+        if self.is_alive():
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=3)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+        try:
+            os.close(self.master_fd)
+        except OSError:
+            pass
+
+
+class PtyBackend(WindowBackend):
+    """Claude CLI를 PTY로 직접 실행하는 백엔드. 세션 번호가 hwnd 역할"""
+
+    name = "pty"
+
+    def __init__(self, command=PTY_COMMAND, cwd=PTY_CWD, autostart=True):
+        self.command = command
+        self.cwd = cwd
+        self.sessions = {}  # handle -> PtySession
+        self._next_handle = 1
+        self._lock = threading.Lock()
+        atexit.register(self.close)
+        if autostart:
+            self.open_terminal()
+
+    def spawn(self, command=None):
+        """새 세션 시작 후 handle 반환"""
+        with self._lock:
+            handle = self._next_handle
+            self._next_handle += 1
+        session = PtySession(handle, command or self.command, self.cwd)
+        self.sessions[handle] = session
+        return handle
+
+    def enumerate_windows(self):
+        # 종료된 세션 정리
+        for handle, session in list(self.sessions.items()):
+            if not session.is_alive():
+                session.close()
+                del self.sessions[handle]
+        return [{'hwnd': h, 'title': s.title, 'class_name': 'pty'}
+                for h, s in self.sessions.items()]
+
+    def classify(self, window):
+        return 'PTY'
+
+    def is_window(self, hwnd):
+        session = self.sessions.get(hwnd)
+        return bool(session and session.is_alive())
+
+    def get_title(self, hwnd):
+        session = self.sessions.get(hwnd)
+        return session.title if session else ""
+
+    def send_message(self, hwnd, message):
+        session = self.sessions.get(hwnd)
+        if not session or not session.is_alive():
+            return False, f"유효하지 않은 PTY 세션: {hwnd}"
+        try:
+            session.write(message)
+            return True, None
+        except OSError as e:
+            return False, f"메시지 전송 실패: {e}"
+
+    def open_terminal(self):
+        self.spawn()
+
+    def get_scrollback(self, hwnd, max_bytes=None):
+        session = self.sessions.get(hwnd)
+        return session.scrollback(max_bytes) if session else None
+
+    def close(self):
+        for session in self.sessions.values():
+            session.close()
+        self.sessions.clear()
@@ -7,15 +7,35 @@ Claude Remote Control Server
 
 import asyncio
 import json
+import os
+import sys
 import websockets
 from aiohttp import web
 import time
 import socket
-import subprocess
-from window_controller import (
-    send_message_to_window, is_window_valid, get_window_title,
-    find_windows_by_title, find_windows_by_class, TERMINAL_CLASSES, VSCODE_CLASS
-)
+import uuid
+from urllib.parse import urlsplit, parse_qs, parse_qsl
+from app_hub import AppHub
+from history_store import HistoryStore
+from window_registry import WindowRegistry, create_backend
+from input_dispatch import InputDispatcher
+from transcript_tailer import TranscriptTailer
+from ipc_transport import IpcServer
+from event_batcher import EventBatcher
+from blob_store import BlobStore, COMPRESS_MIN_SIZE
+from diff_preview import DiffPreviewer, DIFF_TOOLS, RAW_FIELDS
+from session_router import SessionRouter
+from metrics import MetricsRegistry
+from trace_recorder import TraceRecorder
+from permission_policy import PermissionPolicy, PolicyRule, rule_for_request
+
+# Hook 데몬 모드에서 Stop 이벤트 처리에 hook_stop.py의 추출 함수 재사용
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'hooks'))
+from hook_stop import get_last_assistant_response  # noqa: E402
+
+# 포트 (Hook은 HTTP 포트로, 앱은 WebSocket 포트로 연결). 벤치마크 등에서 환경변수로 변경
+HTTP_PORT = int(os.environ.get("CLAUDE_REMOTE_HTTP_PORT", "8765"))
+WS_PORT = int(os.environ.get("CLAUDE_REMOTE_WS_PORT", "8766"))
 
 
 def get_local_ip():
@@ -30,78 +50,355 @@ def get_local_ip():
         return '127.0.0.1'
 
 
-# 연결된 앱 클라이언트
-connected_app = None
-
-# 현재 Claude 창 HWND
+# 메트릭 (GET /metrics, Prometheus 텍스트 형식)
+metrics = MetricsRegistry()
+permission_rtt = metrics.histogram(
+    "claude_remote_permission_rtt_seconds",
+    "권한 요청 수신부터 결정까지 걸린 시간 (source: app / policy / timeout)", ("source",))
+send_message_seconds = metrics.histogram(
+    "claude_remote_send_message_seconds", "Claude 창에 메시지를 입력하는 데 걸린 시간")
+ws_send_seconds = metrics.histogram(
+    "claude_remote_ws_send_seconds", "앱에 WebSocket 프레임 하나를 보내는 데 걸린 시간")
+hook_requests = metrics.counter(
+    "claude_remote_hook_requests_total", "Hook 요청 수", ("event",))
+permission_decisions = metrics.counter(
+    "claude_remote_permission_decisions_total", "권한 결정 수", ("decision", "source"))
+permission_timeouts = metrics.counter(
+    "claude_remote_permission_timeouts_total", "앱 응답 시간 초과로 거부된 권한 요청 수")
+proxy_events = metrics.counter(
+    "claude_remote_proxy_events_total", "API 프록시에서 받은 이벤트 수", ("type",))
+proxy_tokens = metrics.counter(
+    "claude_remote_proxy_tokens_total", "API 프록시가 본 토큰 사용량", ("kind",))
+
+# 구간별 지연 기록 (Hook이 만든 trace ID 기준, pc/traces.jsonl)
+tracer = TraceRecorder()
+
+# 연결된 앱 클라이언트 (여러 개 가능)
+hub = AppHub(send_observer=ws_send_seconds.observe)
+
+# 창 백엔드 + 창 목록 캐시 (CLAUDE_REMOTE_BACKEND로 선택, 기본 win32)
+backend = create_backend()
+registry = WindowRegistry(backend)
+
+# 창별 명령 전송 큐 (클립보드/키보드는 워커 하나만 사용)
+dispatcher = InputDispatcher(backend, send_observer=send_message_seconds.observe)
+
+# 앱에서 고른 기본 Claude 창 HWND (session_id 없는 명령의 대상)
 current_hwnd = None
 
-# 권한 요청 대기열
+# Claude 세션별 상태 (창, 최근 히스토리, 대기 중인 권한 요청)
+sessions = SessionRouter()
+
+# 권한 요청 대기열 (request_id -> PermissionRequest, 합쳐진 요청은 같은 객체를 가리킴)
 pending_requests = {}
 
-# 작업 히스토리 (최근 100개)
-tool_history = []
-MAX_HISTORY = 100
+# 같은 내용의 대기 중 권한 요청 (permission_key -> PermissionRequest)
+pending_keys = {}
+
+# 응답을 기다리지 않는 백그라운드 작업 (GC 방지용 참조)
+background_tasks = set()
+
+# 작업 히스토리 (SQLite 저널 + 핫 캐시)
+history = HistoryStore()
+
+# 권한 정책 (규칙에 맞는 요청은 앱에 묻지 않고 바로 결정)
+policy = PermissionPolicy()
+
+# 큰 내용 저장소 (프레임에는 미리보기 + ref만, 전체 내용은 앱이 요청할 때 전송)
+blob_store = BlobStore()
+
+# Edit / Write / MultiEdit diff 미리보기 (경로, mtime, 입력 해시로 캐시)
+differ = DiffPreviewer()
+
+# 현재 상태 게이지 (/metrics 요청 때 읽음)
+metrics.gauge("claude_remote_pending_requests", "앱 결정을 기다리는 권한 요청 수",
+              lambda: len(open_permission_requests()))
+metrics.gauge("claude_remote_history_size", "작업 히스토리 항목 수", lambda: len(history))
+metrics.gauge("claude_remote_connected_clients", "연결된 앱 수", lambda: len(hub))
+metrics.counter_callback("claude_remote_dropped_clients_total", "느려서 연결을 끊은 앱 수 (누적)",
+                         lambda: hub.dropped_clients)
+metrics.gauge("claude_remote_sessions", "추적 중인 Claude 세션 수", lambda: len(sessions))
+
+# permission_decisions의 decision 라벨 값 (앱이 보낸 값은 이 중 하나로 정리, '항상 허용'은 allow)
+DECISION_LABELS = {'allow': 'allow', 'always': 'allow', 'deny': 'deny', 'ask': 'ask'}
+
+
+def decision_label(decision):
+    """앱이 보낸 decision → 메트릭 라벨 (목록에 없거나 문자열이 아니면 other)"""
+    if not isinstance(decision, str):
+        return 'other'
+    return DECISION_LABELS.get(decision, 'other')
+
+
+# 연결 시 history_sync로 보내는 최근 항목 수 (이전 항목은 history_page로 조회)
+HISTORY_SYNC_SIZE = 20
+
+
+async def compute_diff(tool_name, tool_input, applied=None):
+    """diff 미리보기 (파일 읽기 + difflib은 executor에서). 대상이 아니면 None
+    applied=True: 작업 결과처럼 파일에 이미 적용된 뒤 (되돌려서 비교)"""
+    if tool_name not in DIFF_TOOLS:
+        return None
+    loop = asyncio.get_running_loop()
+    try:
+        return await loop.run_in_executor(None, differ.preview, tool_name, tool_input, applied)
+    except Exception as e:
+        print(f"[서버] diff 생성 실패: {e}")
+        return None
+
+
+def compact_input(tool_input, diff=None):
+    """앱에 보낼 입력. 긴 값은 미리보기 + blob 참조, diff가 있으면 원본 내용 필드는 빼고 diff로 대체"""
+    preview, blobs = blob_store.compact(tool_input, "tool_input")
+    if diff and isinstance(preview, dict):
+        for field in RAW_FIELDS:
+            preview.pop(field, None)
+    return preview, blobs
 
 
 class PermissionRequest:
-    def __init__(self, request_id, tool_name, tool_input):
+    def __init__(self, request_id, tool_name, tool_input, hwnd=None, key=None, diff=None,
+                 session_id="", trace_id=None):
         self.request_id = request_id
+        self.session_id = session_id
+        self.trace_id = trace_id
+        self.app_timing = None  # 앱이 보낸 표시 / 결정 시각 (앱 시계, ms)
         self.tool_name = tool_name
         self.tool_input = tool_input
+        self.hwnd = hwnd
+        self.key = key
+        self.request_ids = [request_id]  # 이 결정을 공유하는 Hook 요청들
+        self.waiters = 0
         self.response = None
         self.event = asyncio.Event()
+        self.seq = None  # 앱에 브로드캐스트된 permission_request의 seq
+        self.learned = False  # '항상 허용' 규칙 저장 여부
+        # 앱에 보낼 입력 (긴 값은 미리보기 + blob 참조)
+        self.diff = diff
+        self.input_preview, self.blobs = compact_input(tool_input, diff)
+
+    def to_message(self):
+        message = {
+            "type": "permission_request",
+            "request_id": self.request_id,
+            "session_id": self.session_id,
+            "trace_id": self.trace_id,
+            "tool_name": self.tool_name,
+            "tool_input": self.input_preview,
+            "hwnd": self.hwnd,
+            "count": len(self.request_ids)
+        }
+        if self.diff:
+            message["diff"] = self.diff
+        if self.blobs:
+            message["blobs"] = self.blobs
+        return message
+
+
+def permission_key(tool_name, tool_input, cwd="", session_id=""):
+    """같은 요청인지 판단하는 키 (세션 + 도구 + 입력 전체 + 작업 폴더).
+    subagent는 부모 세션 ID를 쓰므로 병렬 subagent의 중복 요청만 합쳐짐"""
+    return session_id or "", tool_name, json.dumps(tool_input, sort_keys=True, default=str), cwd or ""
+
+
+def open_permission_requests():
+    """아직 결정되지 않은 권한 요청 (합쳐진 요청은 한 번만)"""
+    unique = {id(req): req for req in pending_requests.values() if not req.event.is_set()}
+    return list(unique.values())
+
+
+def start_trace(data):
+    """Hook이 보낸 trace 정보로 Hook 구간 기록. (trace_id, 서버 수신 시각) 반환"""
+    received = time.time()
+    trace = data.get("trace") if isinstance(data.get("trace"), dict) else {}
+    trace_id = trace.get("id") or uuid.uuid4().hex[:16]
+    hook_start, hook_send = trace.get("hook_start"), trace.get("hook_send")
+    tracer.span(trace_id, "hook.startup", hook_start, hook_send)
+    tracer.span(trace_id, "hook.to_server", hook_send or hook_start, received)
+    return trace_id, received
+
+
+def app_timing(data):
+    """permission_response에 앱이 넣은 표시 / 결정 시각 (없으면 None)"""
+    received, decided = data.get("app_received_at"), data.get("app_decided_at")
+    if isinstance(received, (int, float)) and isinstance(decided, (int, float)):
+        return received / 1000, decided / 1000
+    return None
+
+
+async def resolve_permissions(request_ids, decision, timing=None):
+    """권한 요청들에 결정 적용 후 모든 앱에 알림. 결정된 PermissionRequest 목록 반환"""
+    resolved = []
+    for request_id in request_ids:
+        req = pending_requests.get(request_id)
+        if req is None or req.event.is_set():
+            continue
+        req.app_timing = timing
+        req.response = decision
+        req.event.set()
+        resolved.append(req)
+    if resolved:
+        await broadcast_to_app({
+            "type": "permission_resolved",
+            "request_ids": [req.request_id for req in resolved],
+            "decision": decision
+        })
+    return resolved
+
+
+# tool_result 배치를 기다리지 않고 바로 보내는 프레임 (결정 대기 중인 권한 요청 관련)
+URGENT_TYPES = {"permission_request", "permission_update", "permission_resolved", "permission_auto",
+                "tool_use_preview"}
 
 
 async def broadcast_to_app(message):
-    """앱에 메시지 전송"""
-    global connected_app
-    if connected_app:
-        try:
-            await connected_app.send(json.dumps(message))
-            return True
-        except Exception:
-            return False
-    return False
+    """모든 앱에 메시지 전송 (클라이언트별 송신 큐에 넣고 바로 반환)"""
+    if message.get("type") not in URGENT_TYPES:
+        # 모아둔 tool_result를 먼저 보내서 순서 유지
+        tool_batcher.flush()
+    return hub.broadcast(message) > 0
 
 
-async def detect_claude_windows():
-    """Claude 창 감지 및 앱에 알림"""
-    global current_hwnd
+def flush_tool_results(items):
+    """모인 tool_result를 세션별로 전송 (하나면 기존 tool_result 프레임 그대로)"""
+    by_session = {}
+    for item in items:
+        by_session.setdefault(item.get("session_id", ""), []).append(item)
+    for session_id, group in by_session.items():
+        if len(group) == 1:
+            hub.broadcast(group[0])
+        else:
+            hub.broadcast({"type": "tool_result_batch", "session_id": session_id, "items": group})
+
+
+# tool_result 마이크로 배치 (연속 실행되는 Read / Grep 결과를 한 프레임으로)
+tool_batcher = EventBatcher(flush_tool_results)
 
-    loop = asyncio.get_event_loop()
+# 프록시 텍스트 조각을 모으는 시간 (ms) / 최대 조각 수 (넘으면 바로 전송)
+STREAM_WINDOW_MS = float(os.environ.get("CLAUDE_REMOTE_STREAM_WINDOW_MS", "100"))
+STREAM_MAX_CHUNKS = int(os.environ.get("CLAUDE_REMOTE_STREAM_MAX_CHUNKS", "64"))
 
-    # 1. Class Name으로 터미널 창 찾기
-    terminal_windows = await loop.run_in_executor(None, find_windows_by_class, TERMINAL_CLASSES)
 
-    # 2. 제목에 'claude' 포함된 창 찾기 (VSCode 등)
-    claude_title_windows = await loop.run_in_executor(None, find_windows_by_title, "claude")
+def flush_stream_text(items):
+    """모인 텍스트 조각을 메시지별로 이어 붙여 claude_stream으로 전송.
+    seq / 리플레이 로그 없이 보냄 (긴 스트림이 리플레이 로그와 느린 앱의 송신 큐를 채우지 않도록,
+    최종 텍스트는 claude_delta / claude_response로 다시 옴)"""
+    merged = []
+    for item in items:
+        last = merged[-1] if merged else None
+        if last and (last["session_id"], last["message_id"]) == (item["session_id"], item["message_id"]):
+            last["text"] += item["text"]
+        else:
+            merged.append(dict(item))
+    for message in merged:
+        hub.broadcast_transient(message)
 
-    # 3. VSCode에서 Claude 실행 중인 창 찾기
-    vscode_claude = [w for w in claude_title_windows
-                     if w.get('class_name') == VSCODE_CLASS and 'Visual Studio Code' in w['title']]
 
-    # 중복 제거 (hwnd 기준)
-    seen = set()
-    all_windows = []
+# claude_stream 배치 (토큰 단위 조각 → 짧은 시간 창 단위 프레임)
+stream_batcher = EventBatcher(flush_stream_text, STREAM_WINDOW_MS, STREAM_MAX_CHUNKS)
 
-    # 터미널 창 추가
-    for w in terminal_windows:
-        if w['hwnd'] not in seen:
-            seen.add(w['hwnd'])
-            # 제목이 없으면 "Terminal" 표시
-            if not w['title']:
-                w['title'] = "[Terminal] (No Title)"
-            else:
-                w['title'] = f"[Terminal] {w['title']}"
-            all_windows.append(w)
 
-    # VSCode Claude 창 추가
-    for w in vscode_claude:
-        if w['hwnd'] not in seen:
-            seen.add(w['hwnd'])
-            w['title'] = f"[VSCode] {w['title']}"
-            all_windows.append(w)
+def _background_done(task):
+    background_tasks.discard(task)
+    if not task.cancelled() and task.exception() is not None:
+        print(f"[서버] 백그라운드 작업 실패: {task.exception()!r}")
+
+
+def run_in_background(coro):
+    """완료를 기다리지 않고 실행 (Hook에는 바로 응답). 실패하면 예외를 로그로 남김"""
+    task = asyncio.ensure_future(coro)
+    background_tasks.add(task)
+    task.add_done_callback(_background_done)
+    return task
+
+
+async def broadcast_claude_delta(session_id, delta):
+    """transcript에 새로 기록된 assistant 블록을 바로 앱에 전송"""
+    await broadcast_to_app({
+        "type": "claude_delta",
+        "session_id": session_id,
+        **delta
+    })
+
+
+# 세션별 transcript 실시간 추적
+tailer = TranscriptTailer(broadcast_claude_delta)
+
+
+async def track_session(data):
+    """Hook 데이터로 세션 상태 갱신 후 이 이벤트의 창 HWND 반환.
+    세션 창은 처음 정해지면 다른 Hook이 바꾸지 않음"""
+    global current_hwnd
+    session_id = data.get("session_id", "")
+    tailer.watch(data.get("transcript_path"), session_id)
+    if not session_id:
+        # session_id가 없는 예전 Hook은 Hook이 알려준 창 사용
+        return data.get("hwnd") or current_hwnd
+
+    session, changed = sessions.touch(
+        session_id, data.get("hwnd"), data.get("cwd"), data.get("transcript_path")
+    )
+    if changed:
+        await broadcast_to_app({"type": "session_update", "session": session.to_dict()})
+
+    # 앱에서 고른 창이 없으면 이 세션 창을 기본으로 (창 하나일 때 기존 동작)
+    if session.hwnd and current_hwnd is None:
+        current_hwnd = session.hwnd
+        await broadcast_to_app({
+            "type": "hwnd_update",
+            "hwnd": current_hwnd,
+            "title": await registry.lookup(current_hwnd) or ""
+        })
+    return session.hwnd or current_hwnd
+
+
+def command_target(data):
+    """명령 대상 창: hwnd > session_id의 창 > 앱에서 고른 기본 창"""
+    if data.get('hwnd'):
+        return data['hwnd']
+    session = sessions.get(data.get('session_id'))
+    if session and session.hwnd:
+        return session.hwnd
+    return current_hwnd
+
+
+def subscribed_history(client):
+    """구독 범위의 최근 히스토리 (오래된 것 → 최신 순)"""
+    if client.sessions is None:
+        return history.recent(HISTORY_SYNC_SIZE)
+    items = []
+    for session_id in client.sessions:
+        session = sessions.get(session_id)
+        if session:
+            items.extend(session.history)
+    items.sort(key=lambda e: e["id"])
+    return items[-HISTORY_SYNC_SIZE:]
+
+
+async def send_session_state(client):
+    """구독 범위의 세션 목록 + 최근 히스토리 + 대기 중인 권한 요청 전송"""
+    await client.send({"type": "sessions", "sessions": sessions.to_list()})
+
+    recent = subscribed_history(client)
+    if recent:
+        message = {"type": "history_sync", "history": recent, "next_cursor": None}
+        if client.sessions is None and len(history) > len(recent):
+            message["next_cursor"] = recent[0]["id"]
+        elif client.sessions is not None and len(client.sessions) == 1:
+            # 세션 하나만 구독하면 history_page(filter.session_id)로 이전 항목 조회 가능
+            message["next_cursor"] = recent[0]["id"]
+        await client.send(message)
+
+    for req in open_permission_requests():
+        if client.wants(req.session_id):
+            await client.send({**req.to_message(), "redelivered": True})
+
+
+async def detect_claude_windows(force=False):
+    """Claude 창 감지 및 앱에 알림 (레지스트리 캐시가 유효하면 재순회 생략)"""
+    global current_hwnd
+
+    all_windows = await registry.scan(force=force)
 
     if not all_windows:
         print("[서버] Claude 창 없음")
@@ -125,29 +422,90 @@ async def detect_claude_windows():
         })
 
 
+async def send_command_result(client, cmd):
+    """명령 전송 완료 후 결과 + 구간별 시각을 요청한 앱에 전송"""
+    success, error_msg = await cmd.future
+    if not success:
+        # 창이 닫혔을 수 있으므로 다음 조회 때 다시 순회
+        registry.invalidate()
+        if await registry.lookup(cmd.hwnd) is None:
+            sessions.forget_window(cmd.hwnd)
+    result = {
+        "type": "command_result",
+        "success": success,
+        "message": cmd.message[:50],
+        **cmd.timing()
+    }
+    if error_msg:
+        result["error"] = error_msg
+    print(f"[서버] 명령 완료: 대기 {result['queue_ms']} ms, 전송 {result['send_ms']} ms")
+    await client.send(result)
+
+
+def get_connect_query(websocket):
+    """연결 URL의 쿼리 파라미터"""
+    request = getattr(websocket, 'request', None)
+    path = getattr(request, 'path', None) or getattr(websocket, 'path', '') or ''
+    return parse_qs(urlsplit(path).query)
+
+
+def get_resume_cursor(query):
+    """?epoch=...&resume=N 파싱. 재개 요청이 아니면 (None, None)"""
+    try:
+        return query['epoch'][0], int(query['resume'][0])
+    except (KeyError, IndexError, ValueError):
+        return None, None
+
+
+def get_subscription(query):
+    """?sessions=a,b 파싱. 없으면 None (전체 세션)"""
+    value = query.get('sessions', [''])[0]
+    if not value:
+        return None
+    return set(value.split(','))
+
+
 async def handle_app_connection(websocket):
     """앱 WebSocket 연결 처리"""
-    global connected_app, current_hwnd
-    connected_app = websocket
-    print("[서버] 앱 연결됨")
+    global current_hwnd
+    query = get_connect_query(websocket)
+    epoch, last_seq = get_resume_cursor(query)
+    client = hub.register(websocket)
+    client.sessions = get_subscription(query)
+
+    # 재개 요청이면 빠진 구간만 재전송 (register 직후 await 없이 처리)
+    resumed = hub.resume(client, epoch, last_seq)
+    client.enqueue(json.dumps({
+        "type": "hello",
+        "epoch": hub.epoch,
+        "seq": hub.seq,
+        "resumed": resumed
+    }))
+
+    if resumed:
+        print(f"[서버] 앱 재연결 (seq {last_seq}부터 재개)")
+        # 앱이 이미 받았던 대기 중 권한 요청은 다시 전달 (알림을 놓쳤을 수 있음)
+        for req in open_permission_requests():
+            if req.seq is not None and req.seq <= last_seq and client.wants(req.session_id):
+                await client.send({**req.to_message(), "redelivered": True})
+    else:
+        print("[서버] 앱 연결됨")
 
-    # 연결 시 Claude 창 감지
-    await detect_claude_windows()
+        # 연결 시 Claude 창 감지
+        await detect_claude_windows()
 
-    # 현재 HWND가 있으면 전송
-    if current_hwnd and is_window_valid(current_hwnd):
-        await websocket.send(json.dumps({
+    # 현재 HWND가 있으면 전송 (재개 때도: 앱이 연결을 끊으면서 HWND를 지웠을 수 있음)
+    title = await registry.lookup(current_hwnd)
+    if title is not None:
+        await client.send({
             "type": "hwnd_update",
             "hwnd": current_hwnd,
-            "title": get_window_title(current_hwnd)
-        }))
+            "title": title
+        })
 
-    # 최근 히스토리 전송
-    if tool_history:
-        await websocket.send(json.dumps({
-            "type": "history_sync",
-            "history": tool_history[-20:]  # 최근 20개
-        }))
+    if not resumed:
+        # 세션 목록, 최근 히스토리, 대기 중인 권한 요청 전송 (구독 범위만)
+        await send_session_state(client)
 
     try:
         async for message in websocket:
@@ -155,177 +513,403 @@ async def handle_app_connection(websocket):
             print(f"[서버] 앱에서 수신: {data.get('type')}")
 
             if data.get('type') == 'command':
-                # 핸드폰에서 명령 수신 → Claude 창에 전송
-                hwnd = data.get('hwnd') or current_hwnd
+                # 핸드폰에서 명령 수신 → Claude 창에 전송 (session_id가 있으면 그 세션 창)
+                hwnd = command_target(data)
                 msg = data.get('message', '')
 
                 if hwnd and msg:
-                    # 비동기로 창 제어 실행 (블로킹 방지)
-                    loop = asyncio.get_event_loop()
-                    success, error_msg = await loop.run_in_executor(
-                        None, send_message_to_window, hwnd, msg
-                    )
-                    result = {
-                        "type": "command_result",
-                        "success": success,
-                        "message": msg[:50]
-                    }
-                    if error_msg:
-                        result["error"] = error_msg
-                    await websocket.send(json.dumps(result))
+                    # 창별 큐에 넣고 바로 다음 메시지 수신 (결과는 완료 후 전송)
+                    cmd = dispatcher.submit(hwnd, msg, data.get('command_id'))
+                    run_in_background(send_command_result(client, cmd))
                 else:
-                    await websocket.send(json.dumps({
+                    await client.send({
                         "type": "command_result",
                         "success": False,
                         "error": "HWND or message missing"
-                    }))
+                    })
 
             elif data.get('type') == 'permission_response':
                 # 권한 응답
                 request_id = data.get("request_id")
-                if request_id and request_id in pending_requests:
-                    req = pending_requests[request_id]
-                    req.response = data.get("decision", "deny")
-                    req.event.set()
+                if request_id:
+                    await resolve_permissions([request_id], data.get("decision", "deny"),
+                                              app_timing(data))
+
+            elif data.get('type') == 'permission_batch':
+                # 대기 중인 권한 요청 여러 개를 한 번에 결정 (request_ids 생략 시 전체)
+                decision = data.get("decision", "deny")
+                request_ids = data.get("request_ids")
+                if request_ids is None:
+                    # 이 앱이 구독한 세션의 요청만
+                    request_ids = [req.request_id for req in open_permission_requests()
+                                   if client.wants(req.session_id)]
+                resolved = await resolve_permissions(request_ids, decision, app_timing(data))
+                print(f"[서버] 권한 일괄 응답: {decision} {len(resolved)}건")
+                await client.send({
+                    "type": "permission_batch_result",
+                    "decision": decision,
+                    "request_ids": [req.request_id for req in resolved],
+                    "count": sum(len(req.request_ids) for req in resolved)
+                })
+
+            elif data.get('type') == 'policy_list':
+                await client.send({"type": "policy", "rules": policy.to_list()})
+
+            elif data.get('type') == 'policy_add':
+                # 규칙 추가 {"rule": {"action", "tool_name", "command"?, "file_path"?}}
+                try:
+                    rule_data = data.get('rule') or {}
+                    if not isinstance(rule_data, dict):
+                        raise ValueError("rule은 객체여야 함")
+                    rule = policy.add(PolicyRule.from_dict(rule_data))
+                    print(f"[서버] 정책 추가: {rule.action} {rule.tool_name} {rule.fields}")
+                    await broadcast_policy()
+                except (ValueError, TypeError, OSError) as e:
+                    await client.send({"type": "policy", "rules": policy.to_list(), "error": str(e)})
+
+            elif data.get('type') == 'policy_remove':
+                try:
+                    if policy.remove(data.get('rule_id')):
+                        print(f"[서버] 정책 삭제: {data.get('rule_id')}")
+                    await broadcast_policy()
+                except (ValueError, TypeError, OSError) as e:
+                    await client.send({"type": "policy", "rules": policy.to_list(), "error": str(e)})
+
+            elif data.get('type') == 'subscribe':
+                # 구독할 세션 지정 (session_ids가 없으면 전체)
+                session_ids = data.get('session_ids')
+                client.sessions = set(session_ids) if session_ids else None
+                print(f"[서버] 세션 구독: {'전체' if client.sessions is None else len(client.sessions)}")
+                await client.send({
+                    "type": "subscribed",
+                    "session_ids": sorted(client.sessions) if client.sessions is not None else None
+                })
+                await send_session_state(client)
+
+            elif data.get('type') == 'session_list':
+                await client.send({"type": "sessions", "sessions": sessions.to_list()})
+
+            elif data.get('type') == 'bind_session':
+                # 세션의 창을 앱에서 직접 지정
+                session_id = data.get('session_id')
+                hwnd = data.get('hwnd')
+                if session_id and hwnd and await registry.lookup(hwnd) is not None:
+                    session = sessions.bind(session_id, hwnd)
+                    await broadcast_to_app({"type": "session_update", "session": session.to_dict()})
+
+            elif data.get('type') == 'blob_fetch':
+                # 미리보기로 보낸 내용의 전체 요청 (compress: zlib + base64)
+                await client.send(blob_store.fetch_message(data.get('ref'), bool(data.get('compress'))))
 
             elif data.get('type') == 'select_window':
                 # 앱에서 창 선택
                 hwnd = data.get('hwnd')
-                if hwnd and is_window_valid(hwnd):
+                title = await registry.lookup(hwnd)
+                if title is not None:
                     current_hwnd = hwnd
-                    title = get_window_title(hwnd)
                     print(f"[서버] 창 선택됨: {title}")
-                    await websocket.send(json.dumps({
+                    await client.send({
                         "type": "hwnd_update",
                         "hwnd": current_hwnd,
                         "title": title
-                    }))
+                    })
 
             elif data.get('type') == 'refresh_windows':
                 # 앱에서 창 새로고침 요청
-                await detect_claude_windows()
+                await detect_claude_windows(force=True)
+
+            elif data.get('type') == 'history_page':
+                # 히스토리 페이지 조회 (cursor 이전 항목, 필터 적용)
+                filters = data.get('filter') or {}
+                try:
+                    items, next_cursor = await history.page(
+                        cursor=data.get('cursor'),
+                        limit=data.get('limit', 50),
+                        tool_name=filters.get('tool_name'),
+                        session_id=filters.get('session_id'),
+                        since=filters.get('since'),
+                        until=filters.get('until')
+                    )
+                    await client.send({
+                        "type": "history_page",
+                        "cursor": data.get('cursor'),
+                        "items": items,
+                        "next_cursor": next_cursor
+                    })
+                except Exception as e:
+                    await client.send({
+                        "type": "history_page",
+                        "cursor": data.get('cursor'),
+                        "items": [],
+                        "next_cursor": None,
+                        "error": str(e)
+                    })
+
+            elif data.get('type') == 'scrollback':
+                # 세션 출력 요청 (출력을 캡처하는 백엔드만 지원: pty / tmux)
+                hwnd = command_target(data)
+                loop = asyncio.get_running_loop()
+                text = await loop.run_in_executor(None, backend.get_scrollback, hwnd,
+                                                  data.get('max_bytes', 16384))
+                reply = {"type": "scrollback", "hwnd": hwnd, "text": text or ""}
+                if text is None:
+                    reply["error"] = f"{backend.name} 백엔드는 출력 캡처를 지원하지 않음"
+                await client.send(reply)
 
             elif data.get('type') == 'ping':
-                await websocket.send(json.dumps({"type": "pong"}))
+                await client.send({"type": "pong"})
 
             elif data.get('type') == 'open_cmd':
                 # 새 CMD 창 열기
                 try:
-                    subprocess.Popen('start cmd', shell=True)
+                    loop = asyncio.get_running_loop()
+                    await loop.run_in_executor(None, backend.open_terminal)
+                    registry.invalidate()
                     print("[서버] CMD 창 열기 요청")
-                    await websocket.send(json.dumps({
+                    await client.send({
                         "type": "cmd_result",
                         "success": True
-                    }))
+                    })
                     # 잠시 후 창 목록 새로고침
                     await asyncio.sleep(0.5)
-                    await detect_claude_windows()
+                    await detect_claude_windows(force=True)
                 except Exception as e:
                     print(f"[서버] CMD 열기 실패: {e}")
-                    await websocket.send(json.dumps({
+                    await client.send({
                         "type": "cmd_result",
                         "success": False,
                         "error": str(e)
-                    }))
+                    })
 
     except websockets.exceptions.ConnectionClosed:
         print("[서버] 앱 연결 끊김")
     finally:
-        # 현재 websocket이 connected_app과 같을 때만 초기화
-        if connected_app == websocket:
-            connected_app = None
-            print("[서버] connected_app 초기화됨")
+        await hub.unregister(client)
 
 
-async def handle_permission_request(request):
-    """Hook에서 권한 요청 수신"""
-    global current_hwnd
+async def broadcast_policy():
+    """규칙 변경을 모든 앱에 알림"""
+    await broadcast_to_app({"type": "policy", "rules": policy.to_list()})
 
-    data = await request.json()
+
+async def process_permission_request(data):
+    """권한 요청 처리 (HTTP / Hook 데몬 공통). {"decision": ...} 반환"""
+    received_at = time.perf_counter()
+    hook_requests.labels("permission").inc()
+    trace_id, received = start_trace(data)
     tool_name = data.get("tool_name", "unknown")
     tool_input = data.get("tool_input", {})
-    request_id = data.get("request_id", str(time.time()))
-    hwnd = data.get("hwnd")
+    request_id = data.get("request_id") or uuid.uuid4().hex
+    session_id = data.get("session_id", "")
 
-    # HWND 업데이트
-    if hwnd:
-        current_hwnd = hwnd
-        await broadcast_to_app({
-            "type": "hwnd_update",
-            "hwnd": hwnd,
-            "title": get_window_title(hwnd) if is_window_valid(hwnd) else ""
-        })
+    # 세션 상태 갱신 (창은 세션 기준)
+    hwnd = await track_session(data)
+    session = sessions.get(session_id)
 
     print(f"[서버] 권한 요청: {tool_name}")
 
+    # 정책 규칙에 맞으면 앱을 기다리지 않고 바로 결정 (결정 내용은 앱에 알림)
+    action, rule = policy.evaluate(tool_name, tool_input)
+    if action in ('allow', 'deny'):
+        print(f"[서버] 정책 자동 결정: {action} (규칙 {rule.id})")
+        input_preview, input_blobs = blob_store.compact(tool_input, "tool_input")
+        message = {
+            "type": "permission_auto",
+            "request_id": request_id,
+            "session_id": session_id,
+            "tool_name": tool_name,
+            "tool_input": input_preview,
+            "hwnd": hwnd,
+            "trace_id": trace_id,
+            "decision": action,
+            "rule_id": rule.id
+        }
+        if input_blobs:
+            message["blobs"] = input_blobs
+        await broadcast_to_app(message)
+        permission_rtt.labels("policy").observe(time.perf_counter() - received_at)
+        permission_decisions.labels(action, "policy").inc()
+        tracer.span(trace_id, "server.total", received, time.time(), source="policy", tool=tool_name)
+        return {"decision": action}
+
     # 앱이 연결되어 있지 않으면 Hook 무시 (Claude Code 기본 동작)
-    if connected_app is None:
+    if not hub.clients:
         print("[서버] 앱 미연결 - PC에서 처리")
-        return web.json_response({"decision": ""})
+        return {"decision": ""}
+
+    # 같은 내용의 요청이 이미 대기 중이면 그 결정을 공유 (병렬 subagent의 중복 요청)
+    key = permission_key(tool_name, tool_input, data.get("cwd"), session_id)
+    diff = await compute_diff(tool_name, tool_input)
+    req = pending_keys.get(key)
+    if req is not None and not req.event.is_set():
+        req.request_ids.append(request_id)
+        pending_requests[request_id] = req
+        print(f"[서버] 같은 권한 요청 합침: {req.request_id} ({len(req.request_ids)}건)")
+        await broadcast_to_app({
+            "type": "permission_update",
+            "request_id": req.request_id,
+            "session_id": req.session_id,
+            "count": len(req.request_ids)
+        })
+    else:
+        # 대기열에 추가
+        req = PermissionRequest(request_id, tool_name, tool_input, hwnd, key, diff, session_id,
+                                trace_id)
+        pending_requests[request_id] = req
+        pending_keys[key] = req
 
-    # 대기열에 추가
-    req = PermissionRequest(request_id, tool_name, tool_input)
-    pending_requests[request_id] = req
+        # 앱에 알림 전송
+        await broadcast_to_app(req.to_message())
+        req.seq = hub.seq
 
-    # 앱에 알림 전송
-    await broadcast_to_app({
-        "type": "permission_request",
-        "request_id": request_id,
-        "tool_name": tool_name,
-        "tool_input": tool_input,
-        "hwnd": current_hwnd
-    })
+    dispatched = time.time()
+    tracer.span(trace_id, "server.dispatch", received, dispatched, tool=tool_name,
+                coalesced=req.trace_id != trace_id)
+
+    if session:
+        session.pending.add(request_id)
 
     # 응답 대기
+    req.waiters += 1
     try:
         await asyncio.wait_for(req.event.wait(), timeout=55)
         decision = req.response
+        source = "app"
     except asyncio.TimeoutError:
         decision = "deny"
-
-    # 대기열에서 제거
-    if request_id in pending_requests:
-        del pending_requests[request_id]
-
+        source = "timeout"
+        permission_timeouts.inc()
+    finally:
+        req.waiters -= 1
+        if session:
+            session.pending.discard(request_id)
+
+    # 기다리는 Hook이 없으면 대기열에서 제거 (합쳐진 request_id 포함)
+    if req.waiters == 0:
+        for rid in req.request_ids:
+            if pending_requests.get(rid) is req:
+                del pending_requests[rid]
+        if pending_keys.get(key) is req:
+            del pending_keys[key]
+        if not req.event.is_set():
+            # 결정 전에 모든 Hook이 시간 초과 - 앱에 표시된 요청 정리
+            req.event.set()
+            await broadcast_to_app({
+                "type": "permission_resolved",
+                "request_ids": list(req.request_ids),
+                "decision": "timeout"
+            })
+
+    # '항상 허용'은 규칙으로 저장 (다음 같은 요청은 서버가 바로 허용)
+    if decision == "always" and not req.learned:
+        req.learned = True
+        try:
+            new_rule = policy.add(rule_for_request(tool_name, tool_input))
+            print(f"[서버] 정책 추가 (항상 허용): {new_rule.tool_name} {new_rule.fields}")
+            await broadcast_policy()
+        except OSError as e:
+            print(f"[서버] 정책 저장 실패: {e}")
+
+    permission_rtt.labels(source).observe(time.perf_counter() - received_at)
+    permission_decisions.labels(decision_label(decision), source).inc()
+    now = time.time()
+    tracer.span(trace_id, "app.wait", dispatched, now, source=source)
+    if req.app_timing and trace_id == req.trace_id:
+        tracer.span(trace_id, "app.decide", *req.app_timing, clock="app")
+    tracer.span(trace_id, "server.total", received, now, source=source, tool=tool_name)
     print(f"[서버] 권한 응답: {decision}")
-    return web.json_response({"decision": decision})
+    return {"decision": decision}
 
 
-async def handle_tool_result(request):
-    """Hook에서 작업 결과 수신"""
-    global current_hwnd
-
-    data = await request.json()
+async def process_tool_result(data):
+    """작업 결과 처리 (HTTP / Hook 데몬 공통)"""
+    hook_requests.labels("tool-result").inc()
+    trace_id, received = start_trace(data)
     tool_name = data.get("tool_name", "unknown")
     tool_input = data.get("tool_input", {})
     tool_result = data.get("tool_result", "")
-    hwnd = data.get("hwnd")
+    session_id = data.get("session_id", "")
+
+    # 세션 상태 갱신 (창은 세션 기준)
+    hwnd = await track_session(data)
 
-    # HWND 업데이트
-    if hwnd:
-        current_hwnd = hwnd
+    # 긴 입력 / 결과는 blob으로 분리 (히스토리와 프레임에는 미리보기만)
+    diff = await compute_diff(tool_name, tool_input, applied=True)
+    input_preview, entry_blobs = compact_input(tool_input, diff)
+    result_text = str(tool_result)
+    if len(result_text) > 200:
+        ref = blob_store.put(result_text)
+        if ref:
+            entry_blobs["result"] = {"ref": ref, "size": len(result_text)}
 
     # 히스토리에 저장
     entry = {
+        "ts": time.time(),
         "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "session_id": session_id,
         "tool_name": tool_name,
-        "tool_input": tool_input,
-        "result_summary": str(tool_result)[:200],  # 요약
-        "hwnd": current_hwnd
+        "tool_input": input_preview,
+        "result_summary": result_text[:200],  # 요약
+        "hwnd": hwnd,
+        "trace_id": trace_id
     }
-    tool_history.append(entry)
-    if len(tool_history) > MAX_HISTORY:
-        tool_history.pop(0)
+    if diff:
+        entry["diff"] = diff
+    if entry_blobs:
+        entry["blobs"] = entry_blobs
+    entry = history.append(entry)
+    session = sessions.get(session_id)
+    if session:
+        session.history.append(entry)
 
     print(f"[서버] 작업 결과: {tool_name}")
 
-    # 앱에 전송
-    await broadcast_to_app({
+    # 앱에 전송 (짧은 시간 창 동안 모아서 한 프레임으로)
+    tool_batcher.add({
         "type": "tool_result",
         **entry
     })
+    tracer.span(trace_id, "server.process", received, time.time(), event="tool-result",
+                tool=tool_name)
+
+    return {"status": "ok"}
+
 
-    return web.json_response({"status": "ok"})
+async def process_claude_response(data):
+    """Claude 응답 처리 (HTTP / Hook 데몬 공통)"""
+    hook_requests.labels("stop").inc()
+    trace_id, received = start_trace(data)
+    response_text = data.get("response", "")
+    session_id = data.get("session_id", "")
+    await track_session(data)
+
+    if response_text:
+        print(f"[서버] Claude 응답 수신: {len(response_text)} chars")
+
+        # 앱에 전송 (긴 응답은 미리보기 + blob 참조)
+        response_preview, response_blobs = blob_store.compact(response_text, "response")
+        message = {
+            "type": "claude_response",
+            "session_id": session_id,
+            "trace_id": trace_id,
+            "response": response_preview
+        }
+        if response_blobs:
+            message["blobs"] = response_blobs
+        await broadcast_to_app(message)
+    tracer.span(trace_id, "server.process", received, time.time(), event="stop")
+
+    return {"status": "ok"}
+
+
+async def handle_permission_request(request):
+    """Hook에서 권한 요청 수신"""
+    return web.json_response(await process_permission_request(await request.json()))
+
+
+async def handle_tool_result(request):
+    """Hook에서 작업 결과 수신"""
+    return web.json_response(await process_tool_result(await request.json()))
 
 
 async def handle_app_http_response(request):
@@ -336,32 +920,257 @@ async def handle_app_http_response(request):
     request_id = data.get("request_id")
     decision = data.get("decision", "deny")
 
-    if request_id and request_id in pending_requests:
-        req = pending_requests[request_id]
-        req.response = decision
-        req.event.set()
+    if request_id and await resolve_permissions([request_id], decision, app_timing(data)):
         return web.json_response({"status": "ok"})
 
     return web.json_response({"status": "not_found"}, status=404)
 
 
+async def handle_stats(request):
+    """서버 상태 / 배치 통계"""
+    return web.json_response({
+        "clients": len(hub),
+        "dropped_clients": hub.dropped_clients,
+        "seq": hub.seq,
+        "pending_permissions": len(open_permission_requests()),
+        "sessions": len(sessions),
+        "tool_result_batch": tool_batcher.stats(),
+        "claude_stream_batch": {**stream_batcher.stats(), "skipped_frames": hub.skipped_transient},
+        "blobs": blob_store.stats(),
+        "diff_cache": {"hits": differ.hits, "misses": differ.misses}
+    })
+
+
+async def handle_metrics(request):
+    """Prometheus 텍스트 형식 메트릭"""
+    return web.Response(text=metrics.render(), content_type='text/plain', charset='utf-8')
+
+
+async def handle_blob(request):
+    """blob 전체 내용 (Accept-Encoding에 따라 gzip/deflate 압축)"""
+    data = blob_store.get(request.match_info['ref'])
+    if data is None:
+        return web.Response(status=404)
+    response = web.Response(body=data, content_type='text/plain', charset='utf-8')
+    if len(data) >= COMPRESS_MIN_SIZE:
+        response.enable_compression()
+    return response
+
+
 async def handle_claude_response(request):
     """Stop Hook에서 Claude 응답 수신"""
-    data = await request.json()
-    response_text = data.get("response", "")
-    session_id = data.get("session_id", "")
+    return web.json_response(await process_claude_response(await request.json()))
 
-    if response_text:
-        print(f"[서버] Claude 응답 수신: {len(response_text)} chars")
 
-        # 앱에 전송
-        await broadcast_to_app({
-            "type": "claude_response",
+# 프록시 usage에서 집계하는 토큰 종류
+TOKEN_KINDS = ('input_tokens', 'output_tokens', 'cache_read_input_tokens', 'cache_creation_input_tokens')
+
+
+async def process_proxy_event(data):
+    """API 프록시(pc_toast_v2.5/proxy.py) 이벤트 처리
+    - tool_use: 스트림에서 입력이 완성되는 즉시 앱에 미리보기 (Hook보다 먼저 도착)
+    - text: 생성 중인 텍스트를 그대로 앱에 전달
+    - usage: 토큰 메트릭만 갱신"""
+    kind = data.get("type", "")
+    session_id = data.get("session_id", "")
+    proxy_events.labels(kind).inc()
+
+    if kind == "tool_use":
+        # 앞서 생성된 텍스트를 먼저 보내서 순서 유지
+        stream_batcher.flush()
+        tool_name = data.get("name", "unknown")
+        tool_input = data.get("input") or {}
+        diff = await compute_diff(tool_name, tool_input)
+        input_preview, input_blobs = compact_input(tool_input, diff)
+        message = {
+            "type": "tool_use_preview",
             "session_id": session_id,
-            "response": response_text
+            "message_id": data.get("message_id"),
+            "tool_use_id": data.get("tool_use_id"),
+            "tool_name": tool_name,
+            "tool_input": input_preview
+        }
+        if diff:
+            message["diff"] = diff
+        if input_blobs:
+            message["blobs"] = input_blobs
+        await broadcast_to_app(message)
+
+    elif kind == "text":
+        text = data.get("text")
+        if text and isinstance(text, str):
+            stream_batcher.add({
+                "type": "claude_stream",
+                "session_id": session_id,
+                "message_id": data.get("message_id"),
+                "text": text
+            })
+
+    elif kind == "usage":
+        stream_batcher.flush()
+        usage = data.get("usage") or {}
+        for token_kind in TOKEN_KINDS:
+            value = usage.get(token_kind)
+            if isinstance(value, int) and value > 0:
+                proxy_tokens.labels(token_kind).inc(value)
+
+
+async def handle_proxy_events(request):
+    """API 프록시의 지속 연결 (WebSocket, 한 줄에 이벤트 하나)"""
+    ws = web.WebSocketResponse(heartbeat=30)
+    await ws.prepare(request)
+    print("[서버] API 프록시 연결됨")
+    try:
+        async for msg in ws:
+            if msg.type != web.WSMsgType.TEXT:
+                continue
+            try:
+                data = json.loads(msg.data)
+            except ValueError:
+                continue
+            await process_proxy_event(data)
+    finally:
+        print("[서버] API 프록시 연결 해제")
+    return ws
+
+
+def permission_hook_output(decision):
+    """서버 결정 → Claude PermissionRequest Hook 출력. 결정이 없으면 None (기본 동작)"""
+    if not decision:
+        return None
+    return {
+        "hookSpecificOutput": {
+            "hookEventName": "PermissionRequest",
+            "decision": {
+                "behavior": "allowForever" if decision == "always" else decision
+            }
+        }
+    }
+
+
+async def process_stop_event(data):
+    """Stop 이벤트: transcript에서 마지막 응답 추출 (지난 Stop 이후 부분만) 후 앱에 전송"""
+    session_id = data.get("session_id", "")
+    transcript_path = data.get("transcript_path")
+    if not transcript_path:
+        return
+    try:
+        size = os.path.getsize(transcript_path)
+    except OSError:
+        return
+    # session_id가 없는 예전 Hook은 세션을 만들지 않음 (transcript 처음부터 추출)
+    session = sessions.touch(session_id)[0] if session_id else None
+    start = session.stop_offset if session else 0
+    if start > size:
+        start = 0
+
+    loop = asyncio.get_running_loop()
+    response_text = await loop.run_in_executor(
+        None, get_last_assistant_response, transcript_path, start
+    )
+    if session:
+        session.stop_offset = size
+
+    await process_claude_response({
+        "session_id": session_id,
+        "transcript_path": transcript_path,
+        "response": response_text or "",
+        "trace": data.get("trace")
+    })
+
+
+async def process_hook_event(event, payload, trace=None):
+    """Hook 데몬 모드: hook_client.py가 전달한 Claude Hook stdin 원본 처리
+    - permission: 앱 결정까지 대기 후 Hook 출력(JSON) 반환
+    - tool-result / stop: 바로 응답하고 처리는 백그라운드에서
+    - trace: hook_client.py가 쿼리로 보낸 trace ID / Hook 시작 시각
+    (status, Hook 출력 또는 None) 반환"""
+    session_id = payload.get("session_id", "")
+    session = sessions.get(session_id)
+    common = {
+        "session_id": session_id,
+        "transcript_path": payload.get("transcript_path", ""),
+        "cwd": payload.get("cwd", ""),
+        # 창이 정해지지 않은 세션만 Hook 시점의 활성 창 확인 (이후에는 세션 창 유지)
+        "hwnd": None if session and session.hwnd else backend.get_foreground(),
+        "trace": trace
+    }
+
+    if event == 'permission':
+        tool_name = payload.get("tool_name", "unknown")
+        result = await process_permission_request({
+            **common,
+            "request_id": uuid.uuid4().hex,
+            "tool_name": tool_name,
+            "tool_input": payload.get("tool_input", {})
         })
+        return 200, permission_hook_output(result.get("decision"))
+
+    if event == 'tool-result':
+        run_in_background(process_tool_result({
+            **common,
+            "tool_name": payload.get("tool_name", "unknown"),
+            "tool_input": payload.get("tool_input", {}),
+            "tool_result": payload.get("tool_response", payload.get("tool_result", ""))
+        }))
+        return 200, None
 
-    return web.json_response({"status": "ok"})
+    if event == 'stop':
+        run_in_background(process_stop_event(common))
+        return 200, None
+
+    return 404, None
+
+
+def hook_trace(query):
+    """hook_client.py 쿼리(?trace=...&t0=...) → trace dict (없으면 None)"""
+    if not query.get('trace'):
+        return None
+    try:
+        hook_start = float(query.get('t0', ''))
+    except ValueError:
+        hook_start = None
+    return {"id": query['trace'], "hook_start": hook_start}
+
+
+async def handle_hook_event(request):
+    """Hook 데몬 모드 HTTP 엔드포인트"""
+    try:
+        payload = json.loads(await request.read())
+    except ValueError:
+        return web.Response(status=400)
+    status, output = await process_hook_event(request.match_info['event'], payload,
+                                              hook_trace(request.query))
+    if output:
+        return web.json_response(output, status=status)
+    return web.Response(status=status)
+
+
+# 로컬 IPC로 받는 경로 (HTTP 라우트와 동일한 처리)
+IPC_ROUTES = {
+    '/': process_permission_request,
+    '/tool-result': process_tool_result,
+    '/claude-response': process_claude_response,
+}
+
+
+async def handle_ipc_request(path, body):
+    """로컬 IPC 프레임 처리. (status, 응답 본문 bytes) 반환"""
+    try:
+        data = json.loads(body)
+    except ValueError:
+        return 400, b''
+
+    path, _, query = path.partition('?')
+    if path.startswith('/hook/'):
+        status, output = await process_hook_event(path[len('/hook/'):], data,
+                                                  hook_trace(dict(parse_qsl(query))))
+        return status, json.dumps(output).encode('utf-8') if output else b''
+
+    handler = IPC_ROUTES.get(path)
+    if handler is None:
+        return 404, b''
+    return 200, json.dumps(await handler(data)).encode('utf-8')
 
 
 async def main():
@@ -371,16 +1180,28 @@ async def main():
     app.router.add_post('/tool-result', handle_tool_result)  # 작업 결과
     app.router.add_post('/response', handle_app_http_response)  # 앱 HTTP 응답
     app.router.add_post('/claude-response', handle_claude_response)  # Claude 응답
+    app.router.add_post('/hook/{event}', handle_hook_event)  # Hook 데몬 모드 (hook_client.py)
+    app.router.add_get('/stats', handle_stats)  # 서버 상태 / 배치 통계
+    app.router.add_get('/metrics', handle_metrics)  # Prometheus 메트릭
+    app.router.add_get('/blob/{ref}', handle_blob)  # 긴 내용 전체 조회
+    app.router.add_get('/proxy-events', handle_proxy_events)  # API 프록시 이벤트 (WebSocket)
 
     runner = web.AppRunner(app)
     await runner.setup()
-    http_site = web.TCPSite(runner, '0.0.0.0', 8765)
+    http_site = web.TCPSite(runner, '0.0.0.0', HTTP_PORT)
     await http_site.start()
-    print("[서버] HTTP 서버 시작: 0.0.0.0:8765")
+    print(f"[서버] HTTP 서버 시작: 0.0.0.0:{HTTP_PORT}")
+
+    # Hook 전용 로컬 IPC (Unix domain socket / named pipe)
+    ipc_server = IpcServer(handle_ipc_request)
+    try:
+        await ipc_server.start()
+    except OSError as e:
+        print(f"[서버] 로컬 IPC 시작 실패 - HTTP만 사용: {e}")
 
     # WebSocket 서버 시작
-    print("[서버] WebSocket 서버 시작: 0.0.0.0:8766")
-    async with websockets.serve(handle_app_connection, "0.0.0.0", 8766):
+    print(f"[서버] WebSocket 서버 시작: 0.0.0.0:{WS_PORT}")
+    async with websockets.serve(handle_app_connection, "0.0.0.0", WS_PORT):
         await asyncio.Future()  # 무한 대기
 
 
@@ -389,7 +1210,7 @@ if __name__ == "__main__":
     print("=" * 50)
     print("  Claude Remote Control Server")
     print("=" * 50)
-    print(f"  앱에서 연결할 주소: {local_ip}:8766")
+    print(f"  앱에서 연결할 주소: {local_ip}:{WS_PORT}")
     print("=" * 50)
     print()
     asyncio.run(main())
@@ -0,0 +1,98 @@
+"""
+Claude 세션별 상태 관리
+- session_id마다 창(hwnd), 작업 폴더, 최근 히스토리, 대기 중인 권한 요청, Stop 오프셋을 따로 보관
+- 창은 세션을 처음 본 Hook의 활성 창으로 정하고 이후 Hook이 바꾸지 않음
+  (다른 세션 창이 앞에 있어도 잘못 연결되지 않음, 앱에서 직접 다시 지정 가능)
+- 앱은 모든 세션 또는 일부 세션만 구독 (AppClient.sessions)
+"""
+
+import time
+from collections import deque
+
+# 세션별로 메모리에 보관하는 최근 히스토리 수 (구독 시 history_sync로 전송)
+SESSION_HISTORY_SIZE = 20
+
+# 이 시간 동안 Hook이 없고 대기 중인 요청도 없는 세션은 정리 (초)
+SESSION_IDLE_TIMEOUT = 6 * 60 * 60
+
+
+class Session:
+    """Claude 세션 하나"""
+
+    def __init__(self, session_id):
+        self.session_id = session_id
+        self.hwnd = None
+        self.cwd = ""
+        self.transcript_path = ""
+        self.created_at = time.time()
+        self.last_seen = self.created_at
+        self.history = deque(maxlen=SESSION_HISTORY_SIZE)
+        self.pending = set()  # 대기 중인 권한 request_id
+        self.stop_offset = 0
+
+    def to_dict(self):
+        return {
+            "session_id": self.session_id,
+            "hwnd": self.hwnd,
+            "cwd": self.cwd,
+            "created_at": self.created_at,
+            "last_seen": self.last_seen,
+            "pending": len(self.pending),
+            "history": len(self.history)
+        }
+
+
+class SessionRouter:
+    """session_id → Session"""
+
+    def __init__(self, idle_timeout=SESSION_IDLE_TIMEOUT):
+        self.idle_timeout = idle_timeout
+        self.sessions = {}
+
+    def __len__(self):
+        return len(self.sessions)
+
+    def get(self, session_id):
+        return self.sessions.get(session_id)
+
+    def touch(self, session_id, hwnd=None, cwd=None, transcript_path=None):
+        """Hook 이벤트마다 호출. (Session, 새로 생겼거나 창이 바뀌었는지) 반환"""
+        session = self.sessions.get(session_id)
+        changed = False
+        if session is None:
+            self._expire()
+            session = Session(session_id)
+            self.sessions[session_id] = session
+            changed = True
+            print(f"[세션] 새 세션: {session_id[:8]} (총 {len(self.sessions)}개)")
+        session.last_seen = time.time()
+        if hwnd and session.hwnd is None:
+            session.hwnd = hwnd
+            changed = True
+        if cwd:
+            session.cwd = cwd
+        if transcript_path:
+            session.transcript_path = transcript_path
+        return session, changed
+
+    def bind(self, session_id, hwnd):
+        """앱에서 세션의 창을 직접 지정"""
+        session, _ = self.touch(session_id)
+        session.hwnd = hwnd
+        return session
+
+    def forget_window(self, hwnd):
+        """닫힌 창과 연결된 세션의 창 정보 제거 (다음 Hook에서 다시 정함)"""
+        for session in self.sessions.values():
+            if session.hwnd == hwnd:
+                session.hwnd = None
+
+    def _expire(self):
+        now = time.time()
+        for session_id, session in list(self.sessions.items()):
+            if not session.pending and now - session.last_seen > self.idle_timeout:
+                del self.sessions[session_id]
+
+    def to_list(self):
+        return sorted((s.to_dict() for s in self.sessions.values()),
+                      key=lambda s: s["last_seen"], reverse=True)
@@ -0,0 +1,127 @@
+"""
+tmux 패널 백엔드 (Linux)
+- EnumWindows 대신 tmux 패널 목록으로 Claude 세션 감지
+- 실행 중인 명령 / 패널 제목으로 필터 (TERMINAL_CLASSES / VSCODE_CLASS와 같은 역할)
+- load-buffer + paste-buffer + send-keys로 특정 패널에 입력 (포커스 변경, sleep 없음)
+- 패널 ID(%12) 숫자 + 1을 hwnd로 사용하므로 앱 프로토콜은 그대로 (%0 패널도 0이 아닌 값)
+"""
+
+import os
+import subprocess
+
+from window_registry import WindowBackend
+
+# tmux 서버 소켓 경로 (없으면 기본 서버)
+TMUX_SOCKET = os.environ.get("CLAUDE_REMOTE_TMUX_SOCKET") or None
+
+# 새 패널에서 실행할 명령
+TMUX_COMMAND = os.environ.get("CLAUDE_REMOTE_TMUX_CMD", "claude")
+
+# Claude 세션으로 보는 패널 명령 (pane_current_command)
+CLAUDE_COMMANDS = ['claude']
+
+# 명령이 이것이면 제목에 'claude'가 있을 때만 감지 (Claude CLI는 node로 보일 수 있음)
+TITLE_MATCH_COMMANDS = ['node']
+
+TMUX_TIMEOUT = 5
+
+PANE_FORMAT = '#{pane_id}\t#{pane_current_command}\t#{session_name}:#{window_index}.#{pane_index}\t#{pane_title}'
+
+
+def pane_target(hwnd):
+    """hwnd → tmux 패널 ID"""
+    return f"%{hwnd - 1}"
+
+
+def pane_handle(pane_id):
+    """tmux 패널 ID → hwnd"""
+    return int(pane_id[1:]) + 1
+
+
+class TmuxBackend(WindowBackend):
+    """tmux 패널 백엔드"""
+
+    name = "tmux"
+
+    def __init__(self, socket=TMUX_SOCKET, command=TMUX_COMMAND):
+        self.socket = socket
+        self.command = command
+
+    def _tmux(self, *args, input=None):
+        cmd = ['tmux']
+        if self.socket:
+            cmd += ['-S', self.socket]
+        cmd += list(args)
+        return subprocess.run(cmd, input=input, capture_output=True, timeout=TMUX_TIMEOUT)
+
+    def enumerate_windows(self):
+        """모든 세션의 패널을 한 번에 수집"""
+        result = self._tmux('list-panes', '-a', '-F', PANE_FORMAT)
+        if result.returncode != 0:
+            # tmux 서버가 없으면 패널도 없음
+            return []
+
+        windows = []
+        for line in result.stdout.decode('utf-8', errors='replace').splitlines():
+            parts = line.split('\t', 3)
+            if len(parts) < 4 or not parts[0].startswith('%'):
+                continue
+            pane_id, command, location, title = parts
+            windows.append({
+                'hwnd': pane_handle(pane_id),
+                'title': f"{location} {title}".strip(),
+                'class_name': command
+            })
+        return windows
+
+    def classify(self, window):
+        command = window['class_name']
+        if command in CLAUDE_COMMANDS:
+            return 'tmux'
+        if command in TITLE_MATCH_COMMANDS and 'claude' in window['title'].lower():
+            return 'tmux'
+        return None
+
+    def _display(self, hwnd, fmt):
+        result = self._tmux('display-message', '-p', '-t', pane_target(hwnd), fmt)
+        if result.returncode != 0:
+            return None
+        return result.stdout.decode('utf-8', errors='replace').rstrip('\n')
+
+    def is_window(self, hwnd):
+        return self._display(hwnd, '#{pane_id}') == pane_target(hwnd)
+
+    def get_title(self, hwnd):
+        return self._display(hwnd, '#{session_name}:#{window_index}.#{pane_index} #{pane_title}') or ""
+
+    def send_message(self, hwnd, message):
+        """패널에 메시지 붙여넣기 + Enter (bracketed paste라 여러 줄도 한 번에 입력).
+        세 단계를 tmux 명령 한 번으로 실행"""
+        target = pane_target(hwnd)
+        buffer_name = f"claude-remote-{target[1:]}"
+        try:
+            result = self._tmux(
+                'load-buffer', '-b', buffer_name, '-', ';',
+                'paste-buffer', '-d', '-p', '-b', buffer_name, '-t', target, ';',
+                'send-keys', '-t', target, 'Enter',
+                input=message.encode('utf-8')
+            )
+        except (OSError, subprocess.TimeoutExpired) as e:
+            return False, f"메시지 전송 실패: {e}"
+        if result.returncode != 0:
+            error = result.stderr.decode('utf-8', errors='replace').strip()
+            return False, f"tmux 전송 실패: {error}"
+        return True, None
+
+    def open_terminal(self):
+        """Claude를 실행하는 새 tmux 창 열기 (서버가 없으면 세션 생성)"""
+        result = self._tmux('new-window', '-d', self.command)
+        if result.returncode != 0:
+            self._tmux('new-session', '-d', '-s', 'claude-remote', self.command)
+
+    def get_scrollback(self, hwnd, max_bytes=None):
+        result = self._tmux('capture-pane', '-p', '-J', '-t', pane_target(hwnd), '-S', '-2000')
+        if result.returncode != 0:
+            return None
+        text = result.stdout.decode('utf-8', errors='replace').rstrip('\n')
+        return text[-max_bytes:] if max_bytes else text
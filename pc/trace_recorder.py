@@ -0,0 +1,161 @@
+"""
+구간별 지연 기록 (trace)
+- Hook이 만든 trace ID를 서버 / 앱 메시지에 그대로 싣고, 구간(span)마다 시작/끝 시각을 기록
+- 기록은 메모리에 모았다가 1초마다 전용 스레드에서 JSONL 파일에 추가 (크기 제한, 넘으면 .1로 교체)
+- 분석: python pc/trace_recorder.py [파일] [--json]  → 구간별 횟수 / p50 / p90 / p99 / 최대 (ms)
+
+구간 이름:
+    hook.startup     Hook 프로세스 시작 → 서버로 전송 직전 (예전 Hook 스크립트)
+    hook.to_server   Hook 전송 (또는 Hook 시작) → 서버 수신
+    server.dispatch  서버 수신 → 앱에 권한 요청 전송 (정책, diff 계산 포함)
+    app.wait         앱에 전송 → 앱 결정 수신 (네트워크 + 사람)
+    app.decide       앱 화면에 표시 → 버튼 누름 (앱 시계 기준)
+    server.total     서버 수신 → Hook에 응답
+    server.process   tool_result / Stop 처리
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+TRACE_PATH = os.environ.get(
+    "CLAUDE_REMOTE_TRACE_FILE",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "traces.jsonl")
+)
+
+# CLAUDE_REMOTE_TRACE=0이면 기록하지 않음
+TRACE_ENABLED = os.environ.get("CLAUDE_REMOTE_TRACE", "1") != "0"
+
+# 파일 최대 크기 (넘으면 .1로 옮기고 새로 시작)
+TRACE_MAX_BYTES = 5 * 1024 * 1024
+
+FLUSH_INTERVAL = 1.0
+
+
+class TraceRecorder:
+    """span 기록 + 롤링 파일 저장"""
+
+    def __init__(self, path=TRACE_PATH, enabled=TRACE_ENABLED, max_bytes=TRACE_MAX_BYTES):
+        self.path = path
+        self.enabled = enabled and bool(path)
+        self.max_bytes = max_bytes
+        self._buffer = []
+        self._flush_handle = None
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="trace")
+
+    def span(self, trace_id, name, start, end, **attrs):
+        """구간 하나 기록 (start / end는 epoch 초)"""
+        if not self.enabled or not trace_id or start is None or end is None:
+            return
+        self._buffer.append({
+            "trace_id": trace_id,
+            "span": name,
+            "start": round(start, 6),
+            "dur_ms": round((end - start) * 1000, 3),
+            **attrs
+        })
+        if self._flush_handle is None:
+            try:
+                loop = asyncio.get_running_loop()
+            except RuntimeError:
+                self.flush_sync()
+                return
+            self._flush_handle = loop.call_later(FLUSH_INTERVAL, self._flush)
+
+    def _flush(self):
+        self._flush_handle = None
+        lines, self._buffer = self._buffer, []
+        if lines:
+            self._executor.submit(self._write, lines)
+
+    def flush_sync(self):
+        lines, self._buffer = self._buffer, []
+        if lines:
+            self._write(lines)
+
+    def _write(self, spans):
+        try:
+            if os.path.exists(self.path) and os.path.getsize(self.path) > self.max_bytes:
+                os.replace(self.path, self.path + ".1")
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write("".join(json.dumps(s, ensure_ascii=False) + "\n" for s in spans))
+        except OSError as e:
+            print(f"[Trace] 기록 실패: {e}")
+
+
+def load_spans(path):
+    """기록 파일(+ 이전 파일 .1)의 span 목록"""
+    spans = []
+    for p in (path + ".1", path):
+        if not os.path.exists(p):
+            continue
+        with open(p, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    spans.append(json.loads(line))
+                except ValueError:
+                    continue
+    return spans
+
+
+def percentile(sorted_values, q):
+    if not sorted_values:
+        return 0
+    index = min(len(sorted_values) - 1, max(0, int(round(q * (len(sorted_values) - 1)))))
+    return sorted_values[index]
+
+
+def analyze(spans):
+    """구간별 지연 통계 (ms)"""
+    by_name = {}
+    for s in spans:
+        by_name.setdefault(s["span"], []).append(s["dur_ms"])
+    result = {}
+    for name, values in by_name.items():
+        values.sort()
+        result[name] = {
+            "count": len(values),
+            "mean": round(sum(values) / len(values), 2),
+            "p50": percentile(values, 0.50),
+            "p90": percentile(values, 0.90),
+            "p99": percentile(values, 0.99),
+            "max": values[-1]
+        }
+    return result
+
+
+STAGE_ORDER = ['hook.startup', 'hook.to_server', 'server.dispatch', 'app.wait',
+               'app.decide', 'server.total', 'server.process']
+
+
+def main():
+    parser = argparse.ArgumentParser(description="trace 파일 구간별 지연 분석")
+    parser.add_argument('path', nargs='?', default=TRACE_PATH)
+    parser.add_argument('--json', action='store_true')
+    args = parser.parse_args()
+
+    spans = load_spans(args.path)
+    if not spans:
+        print(f"기록 없음: {args.path}")
+        sys.exit(1)
+    stats = analyze(spans)
+    traces = len({s["trace_id"] for s in spans})
+
+    if args.json:
+        print(json.dumps({"traces": traces, "spans": len(spans), "stages": stats}, indent=2))
+        return
+
+    print(f"trace {traces}개, span {len(spans)}개 ({args.path})")
+    print(f"{'stage':<18} {'count':>7} {'mean':>9} {'p50':>9} {'p90':>9} {'p99':>9} {'max':>9}  (ms)")
+    names = [n for n in STAGE_ORDER if n in stats] + sorted(set(stats) - set(STAGE_ORDER))
+    for name in names:
+        s = stats[name]
+        print(f"{name:<18} {s['count']:>7} {s['mean']:>9} {s['p50']:>9} {s['p90']:>9} "
+              f"{s['p99']:>9} {s['max']:>9}")
+
+
+if __name__ == "__main__":
+    main()
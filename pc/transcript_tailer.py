@@ -0,0 +1,176 @@
+"""
+Transcript 실시간 추적
+- Hook이 알려준 세션별 transcript_path(JSONL)를 바이트 오프셋 기준으로 이어 읽기
+- 새로 추가된 assistant 텍스트 / tool_use 블록을 작은 claude_delta 이벤트로 전달
+- 턴이 끝나기 전에도 Claude 출력을 앱에서 바로 확인 가능
+- 파일 변경 감지는 폴링 (os.stat 크기 비교, 추가 의존성 없음)
+"""
+
+import asyncio
+import json
+import os
+import time
+
+# 폴링 주기 (초)
+POLL_INTERVAL = 0.25
+
+# 이 시간 동안 변화가 없는 파일은 추적 중단 (Hook이 다시 알려주면 재개)
+IDLE_TIMEOUT = 30 * 60
+
+# 한 번에 읽는 최대 바이트 (큰 덩어리가 들어와도 이벤트 루프를 오래 막지 않도록)
+READ_CHUNK = 1024 * 1024
+
+# tool_use 입력 값 미리보기 길이
+INPUT_PREVIEW = 200
+
+
+def _preview_input(tool_input):
+    """tool_use 입력에서 긴 문자열은 잘라서 전송량 축소"""
+    if not isinstance(tool_input, dict):
+        return tool_input
+    preview = {}
+    for key, value in tool_input.items():
+        if isinstance(value, str) and len(value) > INPUT_PREVIEW:
+            value = value[:INPUT_PREVIEW] + f"... ({len(value)} chars)"
+        elif isinstance(value, (list, dict)):
+            text = json.dumps(value)
+            if len(text) > INPUT_PREVIEW:
+                value = text[:INPUT_PREVIEW] + f"... ({len(text)} chars)"
+        preview[key] = value
+    return preview
+
+
+def parse_assistant_blocks(line):
+    """transcript 한 줄에서 assistant 텍스트 / tool_use 블록 추출. 해당 없으면 None"""
+    try:
+        msg = json.loads(line)
+    except (json.JSONDecodeError, UnicodeDecodeError):
+        return None
+    if not isinstance(msg, dict) or msg.get('type') != 'assistant':
+        return None
+
+    message = msg.get('message') if isinstance(msg.get('message'), dict) else {}
+    content = message.get('content', msg.get('content'))
+    if isinstance(content, str):
+        content = [{'type': 'text', 'text': content}]
+    if not isinstance(content, list):
+        return None
+
+    blocks = []
+    for part in content:
+        if isinstance(part, str):
+            blocks.append({'kind': 'text', 'text': part})
+        elif not isinstance(part, dict):
+            continue
+        elif part.get('type') == 'text' and part.get('text'):
+            blocks.append({'kind': 'text', 'text': part['text']})
+        elif part.get('type') == 'tool_use':
+            blocks.append({
+                'kind': 'tool_use',
+                'id': part.get('id'),
+                'name': part.get('name', 'unknown'),
+                'input': _preview_input(part.get('input', {}))
+            })
+    if not blocks:
+        return None
+    return {'message_id': message.get('id') or msg.get('uuid'), 'blocks': blocks}
+
+
+class TailState:
+    """파일 하나의 읽기 위치"""
+
+    def __init__(self, path, session_id, offset):
+        self.path = path
+        self.session_id = session_id
+        self.offset = offset
+        self.partial = b''
+        self.last_change = time.monotonic()
+
+
+class TranscriptTailer:
+    """transcript 파일들을 폴링하며 새 assistant 블록을 on_delta(session_id, delta)로 전달"""
+
+    def __init__(self, on_delta, poll_interval=POLL_INTERVAL, idle_timeout=IDLE_TIMEOUT):
+        self.on_delta = on_delta
+        self.poll_interval = poll_interval
+        self.idle_timeout = idle_timeout
+        self.files = {}  # path -> TailState
+        self._task = None
+
+    def watch(self, path, session_id=""):
+        """파일 추적 시작. 처음 보는 파일은 현재 끝부터 읽음 (지난 대화는 재전송하지 않음)"""
+        if not path:
+            return
+        state = self.files.get(path)
+        if state:
+            state.session_id = session_id or state.session_id
+            state.last_change = time.monotonic()
+            return
+        try:
+            offset = os.path.getsize(path)
+        except OSError:
+            return
+        self.files[path] = TailState(path, session_id, offset)
+        print(f"[Tail] 추적 시작: {os.path.basename(path)}")
+        if self._task is None:
+            self._task = asyncio.ensure_future(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while self.files:
+            await asyncio.sleep(self.poll_interval)
+            for state in list(self.files.values()):
+                try:
+                    deltas = await loop.run_in_executor(None, self._read_new, state)
+                except Exception as e:
+                    print(f"[Tail] 읽기 실패 {state.path}: {e}")
+                    deltas = None
+
+                if deltas is None:
+                    # 파일이 사라졌거나 오래 변화 없음
+                    if time.monotonic() - state.last_change > self.idle_timeout or \
+                            not os.path.exists(state.path):
+                        self.files.pop(state.path, None)
+                        print(f"[Tail] 추적 중단: {os.path.basename(state.path)}")
+                    continue
+
+                for delta in deltas:
+                    await self.on_delta(state.session_id, delta)
+        self._task = None
+
+    def _read_new(self, state):
+        """추가된 바이트만 읽어서 완성된 줄 파싱. 새 데이터가 없으면 None"""
+        size = os.path.getsize(state.path)
+        if size < state.offset:
+            # 파일이 잘렸으면 처음부터
+            state.offset = 0
+            state.partial = b''
+        if size == state.offset:
+            return None
+
+        with open(state.path, 'rb') as f:
+            f.seek(state.offset)
+            data = f.read(min(size - state.offset, READ_CHUNK))
+        state.offset += len(data)
+        state.last_change = time.monotonic()
+
+        lines = (state.partial + data).split(b'\n')
+        state.partial = lines.pop()  # 마지막 줄은 아직 쓰는 중일 수 있음
+
+        deltas = []
+        for line in lines:
+            if not line.strip():
+                continue
+            delta = parse_assistant_blocks(line)
+            if delta:
+                deltas.append(delta)
+        return deltas
@@ -8,8 +8,11 @@ import win32gui
 import win32con
 import pyautogui
 import pyperclip
+import subprocess
 import time
 
+from window_registry import WindowBackend
+
 
 def get_foreground_hwnd():
     """현재 활성 창의 HWND 반환"""
@@ -35,6 +38,10 @@ def is_window_valid(hwnd):
 def activate_window(hwnd):
     """HWND로 창 활성화. 실패시 에러 메시지 반환"""
     try:
+        # 이미 활성 창이면 활성화/대기 생략
+        if win32gui.GetForegroundWindow() == hwnd and not win32gui.IsIconic(hwnd):
+            return True, None
+
         # 창이 최소화되어 있으면 복원
         if win32gui.IsIconic(hwnd):
             win32gui.ShowWindow(hwnd, win32con.SW_RESTORE)
@@ -57,36 +64,57 @@ def send_message_to_window(hwnd, message):
     3. Ctrl+V 붙여넣기
     4. Enter 전송
     """
+    return send_messages_to_window(hwnd, [message])[0]
+
+
+def send_messages_to_window(hwnd, messages):
+    """
+    같은 창에 여러 메시지를 순서대로 전송 (창 활성화는 한 번만).
+    메시지별 (success, error_msg) 목록 반환, 실패하면 거기서 중단
+    """
     try:
         # 창 유효성 확인
         if not is_window_valid(hwnd):
             error_msg = f"유효하지 않은 HWND: {hwnd}"
             print(f"[창 제어] {error_msg}")
-            return False, error_msg
+            return [(False, error_msg)]
 
         # 창 활성화
         success, error_msg = activate_window(hwnd)
         if not success:
-            return False, error_msg
+            return [(False, error_msg)]
+    except Exception as e:
+        error_msg = f"메시지 전송 실패: {e}"
+        print(f"[창 제어] {error_msg}")
+        return [(False, error_msg)]
+
+    results = []
+    for i, message in enumerate(messages):
+        try:
+            if i > 0:
+                time.sleep(0.05)  # 이전 Enter 처리 대기
 
-        # 클립보드에 메시지 복사
-        pyperclip.copy(message)
-        time.sleep(0.05)
+            # 클립보드에 메시지 복사
+            pyperclip.copy(message)
+            time.sleep(0.05)
 
-        # Ctrl+V 붙여넣기
-        pyautogui.hotkey('ctrl', 'v')
-        time.sleep(0.1)
+            # Ctrl+V 붙여넣기
+            pyautogui.hotkey('ctrl', 'v')
+            time.sleep(0.1)
 
-        # Enter 전송
-        pyautogui.press('enter')
+            # Enter 전송
+            pyautogui.press('enter')
 
-        print(f"[창 제어] 메시지 전송 완료: {message[:50]}...")
-        return True, None
+            print(f"[창 제어] 메시지 전송 완료: {message[:50]}...")
+            results.append((True, None))
 
-    except Exception as e:
-        error_msg = f"메시지 전송 실패: {e}"
-        print(f"[창 제어] {error_msg}")
-        return False, error_msg
+        except Exception as e:
+            error_msg = f"메시지 전송 실패: {e}"
+            print(f"[창 제어] {error_msg}")
+            results.append((False, error_msg))
+            break
+
+    return results
 
 
 def find_windows_by_title(keyword):
@@ -128,6 +156,23 @@ def find_windows_by_class(class_names):
     return results
 
 
+def enum_visible_windows():
+    """보이는 창 전체를 한 번의 EnumWindows로 수집"""
+    results = []
+
+    def callback(hwnd, _):
+        if win32gui.IsWindowVisible(hwnd):
+            results.append({
+                'hwnd': hwnd,
+                'title': win32gui.GetWindowText(hwnd),
+                'class_name': win32gui.GetClassName(hwnd)
+            })
+        return True
+
+    win32gui.EnumWindows(callback, None)
+    return results
+
+
 # 터미널 관련 Class Names
 TERMINAL_CLASSES = [
     'ConsoleWindowClass',           # CMD (구형)
@@ -138,6 +183,46 @@ TERMINAL_CLASSES = [
 VSCODE_CLASS = 'Chrome_WidgetWin_1'
 
 
+class Win32Backend(WindowBackend):
+    """Win32 HWND 백엔드 (클립보드 + 붙여넣기)"""
+
+    name = "win32"
+
+    def enumerate_windows(self):
+        return enum_visible_windows()
+
+    def classify(self, window):
+        if window['class_name'] in TERMINAL_CLASSES:
+            return 'Terminal'
+        # VSCode에서 Claude 실행 중인 창
+        title = window['title']
+        if (window['class_name'] == VSCODE_CLASS and 'claude' in title.lower()
+                and 'Visual Studio Code' in title):
+            return 'VSCode'
+        return None
+
+    def is_window(self, hwnd):
+        return is_window_valid(hwnd)
+
+    def get_foreground(self):
+        try:
+            return get_foreground_hwnd()
+        except Exception:
+            return None
+
+    def get_title(self, hwnd):
+        return get_window_title(hwnd)
+
+    def send_message(self, hwnd, message):
+        return send_message_to_window(hwnd, message)
+
+    def send_messages(self, hwnd, messages):
+        return send_messages_to_window(hwnd, messages)
+
+    def open_terminal(self):
+        subprocess.Popen('start cmd', shell=True)
+
+
 if __name__ == "__main__":
     # 테스트
     print("현재 활성 창 HWND:", get_foreground_hwnd())
@@ -0,0 +1,211 @@
+"""
+창 레지스트리
+- 백엔드 인터페이스 (Win32 / Fake ...) 뒤에서 창 목록을 한 번의 순회로 수집
+- 결과를 TTL 동안 캐시하고 유효성/제목 조회(lookup)는 캐시에서 응답, 캐시에 없으면 executor에서 백엔드 조회
+- 창 열기/전송 실패 등 이벤트 발생 시 캐시 무효화
+"""
+
+import asyncio
+import os
+import time
+
+# 창 목록 캐시 유지 시간 (초)
+WINDOW_CACHE_TTL = 2.0
+
+# 감지된 창 표시 순서
+LABEL_ORDER = ['Terminal', 'VSCode', 'PTY', 'tmux']
+
+
+class WindowBackend:
+    """창 백엔드 인터페이스. 창 핸들(hwnd)은 int"""
+
+    name = "base"
+
+    def enumerate_windows(self):
+        """보이는 창 전체를 한 번에 수집. [{'hwnd', 'title', 'class_name'}, ...]"""
+        raise NotImplementedError
+
+    def classify(self, window):
+        """Claude 창이면 라벨('Terminal', 'VSCode' 등), 아니면 None"""
+        raise NotImplementedError
+
+    def is_window(self, hwnd):
+        raise NotImplementedError
+
+    def get_title(self, hwnd):
+        raise NotImplementedError
+
+    def send_message(self, hwnd, message):
+        """창에 메시지 입력. (success, error_msg) 반환"""
+        raise NotImplementedError
+
+    def send_messages(self, hwnd, messages):
+        """같은 창에 여러 메시지를 순서대로 입력. 메시지별 (success, error_msg) 목록 반환.
+        백엔드가 묶음 전송을 지원하면 재정의 (예: 창 활성화 한 번)"""
+        results = []
+        for message in messages:
+            result = self.send_message(hwnd, message)
+            results.append(result)
+            if not result[0]:
+                break
+        return results
+
+    def open_terminal(self):
+        """새 터미널 열기"""
+        raise NotImplementedError
+
+    def get_scrollback(self, hwnd, max_bytes=None):
+        """출력 스크롤백 텍스트. 출력을 캡처하지 않는 백엔드는 None"""
+        return None
+
+    def get_foreground(self):
+        """현재 활성 창 hwnd. 개념이 없는 백엔드는 None"""
+        return None
+
+    def close(self):
+        """백엔드가 소유한 자원 정리"""
+        pass
+
+
+class FakeBackend(WindowBackend):
+    """Windows API 없이 레지스트리/서버를 구동하기 위한 가짜 백엔드 (Linux 테스트, 벤치마크용)"""
+
+    name = "fake"
+
+    def __init__(self, windows=None, send_delay=0.0):
+        self.windows = {}  # hwnd -> {'hwnd', 'title', 'class_name'}
+        self.send_delay = send_delay
+        self.sent = []  # (hwnd, message)
+        self.enum_calls = 0
+        self._next_hwnd = 1000
+        for w in windows or []:
+            self.add_window(w.get('title', ''), w.get('class_name', 'ConsoleWindowClass'), w.get('hwnd'))
+
+    def add_window(self, title, class_name='ConsoleWindowClass', hwnd=None):
+        if hwnd is None:
+            hwnd = self._next_hwnd
+            self._next_hwnd += 1
+        self.windows[hwnd] = {'hwnd': hwnd, 'title': title, 'class_name': class_name}
+        return hwnd
+
+    def remove_window(self, hwnd):
+        self.windows.pop(hwnd, None)
+
+    def enumerate_windows(self):
+        self.enum_calls += 1
+        return [dict(w) for w in self.windows.values()]
+
+    def classify(self, window):
+        if window['class_name'] == 'ConsoleWindowClass':
+            return 'Terminal'
+        if 'claude' in window['title'].lower() and 'Visual Studio Code' in window['title']:
+            return 'VSCode'
+        return None
+
+    def is_window(self, hwnd):
+        return hwnd in self.windows
+
+    def get_title(self, hwnd):
+        w = self.windows.get(hwnd)
+        return w['title'] if w else ""
+
+    def send_message(self, hwnd, message):
+        if hwnd not in self.windows:
+            return False, f"유효하지 않은 HWND: {hwnd}"
+        if self.send_delay:
+            time.sleep(self.send_delay)
+        self.sent.append((hwnd, message))
+        return True, None
+
+    def open_terminal(self):
+        self.add_window("", 'ConsoleWindowClass')
+
+
+def create_backend(name=None):
+    """이름으로 백엔드 생성 (기본: 환경변수 CLAUDE_REMOTE_BACKEND, 없으면 win32)
+    - win32: HWND + 클립보드 붙여넣기 (Windows)
+    - pty: Claude CLI를 PTY로 직접 실행 (Linux / macOS)
+    - tmux: tmux 패널에 입력 (Linux)
+    - fake: 테스트/벤치마크용"""
+    name = name or os.environ.get("CLAUDE_REMOTE_BACKEND", "win32")
+    if name == "win32":
+        from window_controller import Win32Backend
+        return Win32Backend()
+    if name == "fake":
+        return FakeBackend()
+    if name == "pty":
+        from pty_backend import PtyBackend
+        return PtyBackend()
+    if name == "tmux":
+        from tmux_backend import TmuxBackend
+        return TmuxBackend()
+    raise ValueError(f"알 수 없는 창 백엔드: {name}")
+
+
+class WindowRegistry:
+    """창 목록 캐시. 전체 순회는 executor에서 한 번만, 조회는 캐시 우선"""
+
+    def __init__(self, backend, ttl=WINDOW_CACHE_TTL):
+        self.backend = backend
+        self.ttl = ttl
+        self.windows = {}      # hwnd -> 보이는 창 정보
+        self.candidates = []   # Claude 창 (표시용 제목 포함)
+        self.scanned_at = 0.0
+        self.scan_count = 0
+        self._lock = asyncio.Lock()
+
+    def is_fresh(self):
+        return time.monotonic() - self.scanned_at < self.ttl
+
+    def invalidate(self):
+        """다음 조회 때 다시 순회하도록 캐시 만료"""
+        self.scanned_at = 0.0
+
+    def _scan(self):
+        """한 번의 순회로 모든 창 수집 + Claude 창 분류"""
+        windows = {}
+        candidates = []
+        for w in self.backend.enumerate_windows():
+            windows[w['hwnd']] = w
+            label = self.backend.classify(w)
+            if label:
+                title = w['title'] or "(No Title)"
+                candidates.append({**w, 'label': label, 'title': f"[{label}] {title}"})
+
+        candidates.sort(key=lambda w: LABEL_ORDER.index(w['label'])
+                        if w['label'] in LABEL_ORDER else len(LABEL_ORDER))
+        return windows, candidates
+
+    async def scan(self, force=False):
+        """Claude 창 목록 반환. 캐시가 유효하면 순회 생략"""
+        if not force and self.is_fresh():
+            return self.candidates
+        async with self._lock:
+            # 대기 중에 다른 요청이 이미 갱신했으면 재사용
+            if not force and self.is_fresh():
+                return self.candidates
+            loop = asyncio.get_running_loop()
+            windows, candidates = await loop.run_in_executor(None, self._scan)
+            self.windows = windows
+            self.candidates = candidates
+            self.scanned_at = time.monotonic()
+            self.scan_count += 1
+        return self.candidates
+
+    def _lookup(self, hwnd):
+        try:
+            if not self.backend.is_window(hwnd):
+                return None
+            return self.backend.get_title(hwnd) or ""
+        except Exception:
+            return None
+
+    async def lookup(self, hwnd):
+        """유효한 창이면 제목, 아니면 None (캐시 우선, 백엔드 조회는 executor에서)
+        tmux처럼 조회가 외부 프로세스 호출인 백엔드가 이벤트 루프를 막지 않도록"""
+        if not hwnd:
+            return None
+        if self.is_fresh() and hwnd in self.windows:
+            return self.windows[hwnd]['title']
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self._lookup, hwnd)
@@ -6,12 +6,18 @@ Claude Code Proxy Server
 """
 
 import json
+import os
+import re
 import asyncio
 import aiohttp
 from aiohttp import web
 import threading
 import time
 
+from sse_parser import SSEParser, MessageDecoder
+from server_bridge import ServerBridge, BRIDGE_ENABLED, SERVER_EVENTS_URL
+from traffic_archive import ArchiveWriter
+
 # Windows Toast
 try:
     from windows_toasts import InteractableWindowsToaster, Toast, ToastButton, ToastActivatedEventArgs
@@ -29,9 +35,30 @@ except ImportError:
     WINDOW_CONTROL_AVAILABLE = False
     print("[WARNING] pyautogui/pygetwindow not installed. Window control disabled.")
 
-# 설정
-ANTHROPIC_API_URL = "https://api.anthropic.com"
-PROXY_PORT = 3456
+# 설정 (환경변수로 변경 가능, 예: 로컬 테스트 서버로 벤치마크)
+ANTHROPIC_API_URL = os.environ.get("ANTHROPIC_API_URL", "https://api.anthropic.com").rstrip('/')
+PROXY_PORT = int(os.environ.get("PROXY_PORT", "3456"))
+
+# 업스트림 연결 풀 (앱 시작 시 한 번 만들고 종료 시 닫음)
+POOL_ENABLED = os.environ.get("PROXY_POOL", "1") != "0"  # 0이면 요청마다 새 연결 (비교용)
+POOL_LIMIT = int(os.environ.get("PROXY_POOL_LIMIT", "100"))  # 전체 동시 연결 수
+POOL_LIMIT_PER_HOST = int(os.environ.get("PROXY_POOL_LIMIT_PER_HOST", "32"))
+KEEPALIVE_TIMEOUT = float(os.environ.get("PROXY_KEEPALIVE_TIMEOUT", "60"))  # 유휴 연결 유지 (초)
+DNS_CACHE_TTL = int(os.environ.get("PROXY_DNS_CACHE_TTL", "300"))  # 초
+
+# 긴 응답(스트리밍)도 끊지 않도록 전체 시간 제한 없음, 연결 / 읽기 대기만 제한
+UPSTREAM_TIMEOUT = aiohttp.ClientTimeout(total=None, sock_connect=30, sock_read=600)
+
+UPSTREAM_SESSION = web.AppKey("upstream_session", aiohttp.ClientSession)
+
+# PC 서버로 tool_use / 텍스트 / 사용량 전달 (PROXY_BRIDGE=0이면 끔)
+SERVER_BRIDGE = web.AppKey("server_bridge", ServerBridge)
+
+# 트래픽 기록 파일 (예: captures/traffic.jsonl.gz). 설정하면 요청 / 응답 스트림을 기록 (replay_server.py로 재생)
+RECORD_PATH = os.environ.get("PROXY_RECORD", "")
+TRAFFIC_RECORDER = web.AppKey("traffic_recorder", ArchiveWriter)
+
+SESSION_ID_PATTERN = re.compile(rb'"user_id"\s*:\s*"[^"]*?_session_([0-9a-fA-F-]+)"')
 
 
 def send_key_to_vscode(key: str):
@@ -61,7 +88,7 @@ def send_key_to_vscode(key: str):
         return False
 
 
-def on_toast_activated(args: ToastActivatedEventArgs):
+def on_toast_activated(args: "ToastActivatedEventArgs"):
     """Toast 버튼 클릭 핸들러"""
     action = args.arguments
     print(f"[TOAST] Button clicked: {action}")
@@ -128,10 +155,72 @@ def detect_tool_use(response_data: dict):
             ).start()
 
 
+def handle_stream_result(result: dict):
+    """MessageDecoder 결과 처리 (완성된 tool_use → Toast)"""
+    if result["type"] != "tool_use":
+        return
+    tool_name = result["name"]
+    print(f"[DEBUG] Found tool_use in stream: {tool_name}")
+    threading.Thread(
+        target=show_toast,
+        args=(tool_name, result["input"]),
+        daemon=True
+    ).start()
+
+
+def request_session_id(body: bytes) -> str:
+    """Claude Code 요청의 metadata.user_id("..._session_<uuid>")에서 세션 ID 추출 (없으면 "")
+    요청 본문 전체를 JSON 파싱하지 않고 정규식으로만 찾음"""
+    match = SESSION_ID_PATTERN.search(body)
+    return match.group(1).decode('ascii') if match else ""
+
+
+def bridge_event(result: dict, message_id, session_id: str):
+    """MessageDecoder 결과 → 서버로 보낼 이벤트 (보내지 않는 종류는 None)"""
+    event = {"type": result["type"], "session_id": session_id, "message_id": message_id}
+    if result["type"] == "tool_use":
+        event.update(tool_use_id=result["id"], name=result["name"], input=result["input"])
+    elif result["type"] == "usage":
+        event.update(usage=result["usage"], stop_reason=result["stop_reason"])
+    else:
+        return None
+    return event
+
+
+def handle_sse_chunk(parser: SSEParser, decoder: MessageDecoder, chunk: bytes,
+                     bridge: ServerBridge = None, session_id: str = ""):
+    """클라이언트로 보낸 청크를 그대로 파서에 넣고 완성된 이벤트를 메시지 상태에 반영.
+    서버 연결이 있으면 tool_use / usage와 이 청크의 텍스트(하나로 합쳐서)를 전달"""
+    texts = []
+    try:
+        for _, data_str in parser.feed(chunk):
+            if not data_str or data_str.strip() == '[DONE]':
+                continue
+            try:
+                event_data = json.loads(data_str)
+            except json.JSONDecodeError:
+                continue
+            if not isinstance(event_data, dict):
+                continue
+            for result in decoder.feed(event_data):
+                if result["type"] == "text":
+                    texts.append(result["text"])
+                    continue
+                handle_stream_result(result)
+                event = bridge_event(result, decoder.message_id, session_id)
+                if bridge and event:
+                    bridge.publish(event)
+        if bridge and texts:
+            bridge.publish({"type": "text", "session_id": session_id,
+                            "message_id": decoder.message_id, "text": "".join(texts)})
+    except Exception as e:
+        print(f"[DEBUG] Stream parse error: {e}")
+
+
 async def proxy_handler(request: web.Request):
-    """API 요청 프록시 핸들러"""
+    """API 요청 프록시 핸들러 (응답은 받는 대로 클라이언트에 전달)"""
     # 원본 경로 구성
-    path = request.path
+    path = request.path_qs
     target_url = f"{ANTHROPIC_API_URL}{path}"
 
     # 요청 헤더 복사 (host 제외)
@@ -145,73 +234,119 @@ async def proxy_handler(request: web.Request):
 
     print(f"[PROXY] {request.method} {path}")
 
-    async with aiohttp.ClientSession() as session:
-        try:
-            async with session.request(
-                method=request.method,
-                url=target_url,
-                headers=headers,
-                data=body,
-                ssl=True
-            ) as resp:
-                # 응답 본문 읽기
-                response_body = await resp.read()
-
-                # Content-Type 확인
-                content_type = resp.headers.get('Content-Type', '')
-                print(f"[DEBUG] Content-Type: {content_type}")
-
-                # JSON 응답이면 tool_use 감지
-                if 'application/json' in content_type:
-                    try:
-                        response_data = json.loads(response_body)
-                        print(f"[DEBUG] JSON response, checking for tool_use...")
-                        detect_tool_use(response_data)
-                    except json.JSONDecodeError:
-                        pass
-                # Streaming 응답 처리 (text/event-stream)
-                elif 'text/event-stream' in content_type:
-                    print(f"[DEBUG] Streaming response detected")
-                    # streaming 데이터에서 tool_use 이벤트 찾기
-                    try:
-                        text = response_body.decode('utf-8')
-                        for line in text.split('\n'):
-                            if line.startswith('data: '):
-                                data_str = line[6:]  # 'data: ' 제거
-                                if data_str.strip() == '[DONE]':
-                                    continue
-                                try:
-                                    event_data = json.loads(data_str)
-                                    # content_block_start 이벤트에서 tool_use 감지
-                                    if event_data.get('type') == 'content_block_start':
-                                        content_block = event_data.get('content_block', {})
-                                        if content_block.get('type') == 'tool_use':
-                                            tool_name = content_block.get('name', 'unknown')
-                                            print(f"[DEBUG] Found tool_use in stream: {tool_name}")
-                                            threading.Thread(
-                                                target=show_toast,
-                                                args=(tool_name, {}),
-                                                daemon=True
-                                            ).start()
-                                except json.JSONDecodeError:
-                                    pass
-                    except Exception as e:
-                        print(f"[DEBUG] Stream parse error: {e}")
-
-                # 응답 헤더 복사
-                response_headers = {
-                    key: value for key, value in resp.headers.items()
-                    if key.lower() not in ('content-encoding', 'transfer-encoding', 'content-length')
-                }
-
-                return web.Response(
-                    status=resp.status,
-                    headers=response_headers,
-                    body=response_body
-                )
-        except Exception as e:
-            print(f"[ERROR] Proxy error: {e}")
-            return web.Response(status=502, text=f"Proxy error: {e}")
+    session = request.app[UPSTREAM_SESSION]
+    recorder = request.app.get(TRAFFIC_RECORDER)
+    exchange = recorder.begin(request.method, path, request.headers, body) if recorder else None
+    response = None
+    try:
+        async with session.request(
+            method=request.method,
+            url=target_url,
+            headers=headers,
+            data=body,
+            ssl=True
+        ) as resp:
+            # Content-Type 확인
+            content_type = resp.headers.get('Content-Type', '')
+            print(f"[DEBUG] Content-Type: {content_type}")
+
+            # 응답 헤더 복사 (본문은 압축 해제된 상태로 chunked 전송)
+            response_headers = {
+                key: value for key, value in resp.headers.items()
+                if key.lower() not in ('content-encoding', 'transfer-encoding', 'content-length')
+            }
+            if exchange:
+                exchange.response(resp.status, response_headers)
+            response = web.StreamResponse(status=resp.status, headers=response_headers)
+            await response.prepare(request)
+
+            # Streaming 응답은 보낸 청크 그대로 증분 파싱, JSON 응답은 끝난 뒤 한 번에 검사
+            parser = SSEParser() if 'text/event-stream' in content_type else None
+            if parser:
+                print(f"[DEBUG] Streaming response detected")
+                decoder = MessageDecoder()
+                bridge = request.app.get(SERVER_BRIDGE)
+                session_id = request_session_id(body) if bridge else ""
+            json_body = bytearray() if 'application/json' in content_type else None
+
+            async for chunk in resp.content.iter_any():
+                await response.write(chunk)
+                if exchange:
+                    exchange.chunk(chunk)
+                if parser:
+                    handle_sse_chunk(parser, decoder, chunk, bridge, session_id)
+                elif json_body is not None:
+                    json_body += chunk
+            await response.write_eof()
+            if exchange:
+                recorder.finish(exchange)
+
+        # JSON 응답이면 tool_use 감지
+        if json_body:
+            try:
+                response_data = json.loads(json_body)
+                print(f"[DEBUG] JSON response, checking for tool_use...")
+                if isinstance(response_data, dict):
+                    detect_tool_use(response_data)
+            except json.JSONDecodeError:
+                pass
+
+        return response
+    except Exception as e:
+        if response is not None and response.prepared:
+            # 헤더를 이미 보냈으므로 502 대신 연결 종료
+            print(f"[ERROR] Stream interrupted: {e}")
+            return response
+        print(f"[ERROR] Proxy error: {e}")
+        return web.Response(status=502, text=f"Proxy error: {e}")
+
+
+def create_upstream_session():
+    """업스트림 API용 ClientSession (keep-alive 연결 풀 + DNS 캐시)"""
+    if POOL_ENABLED:
+        connector = aiohttp.TCPConnector(
+            limit=POOL_LIMIT,
+            limit_per_host=POOL_LIMIT_PER_HOST,
+            keepalive_timeout=KEEPALIVE_TIMEOUT,
+            ttl_dns_cache=DNS_CACHE_TTL
+        )
+    else:
+        # 예전 동작 (요청마다 새 TCP / TLS 연결, DNS 조회)
+        connector = aiohttp.TCPConnector(force_close=True, use_dns_cache=False, limit=0)
+    return aiohttp.ClientSession(connector=connector, timeout=UPSTREAM_TIMEOUT)
+
+
+async def start_upstream_session(app: web.Application):
+    app[UPSTREAM_SESSION] = create_upstream_session()
+
+
+async def close_upstream_session(app: web.Application):
+    await app[UPSTREAM_SESSION].close()
+
+
+async def start_traffic_recorder(app: web.Application):
+    if RECORD_PATH:
+        app[TRAFFIC_RECORDER] = ArchiveWriter(RECORD_PATH)
+        print(f"[RECORD] Recording traffic to {RECORD_PATH}")
+
+
+async def close_traffic_recorder(app: web.Application):
+    recorder = app.get(TRAFFIC_RECORDER)
+    if recorder:
+        recorder.close()
+
+
+async def start_server_bridge(app: web.Application):
+    if BRIDGE_ENABLED:
+        bridge = ServerBridge()
+        bridge.start()
+        app[SERVER_BRIDGE] = bridge
+
+
+async def close_server_bridge(app: web.Application):
+    bridge = app.get(SERVER_BRIDGE)
+    if bridge:
+        await bridge.close()
 
 
 async def health_check(request: web.Request):
@@ -219,6 +354,19 @@ async def health_check(request: web.Request):
     return web.json_response({"status": "ok", "service": "claude-code-proxy"})
 
 
+def create_app():
+    app = web.Application()
+    app.on_startup.append(start_upstream_session)
+    app.on_cleanup.append(close_upstream_session)
+    app.on_startup.append(start_server_bridge)
+    app.on_cleanup.append(close_server_bridge)
+    app.on_startup.append(start_traffic_recorder)
+    app.on_cleanup.append(close_traffic_recorder)
+    app.router.add_get('/health', health_check)
+    app.router.add_route('*', '/{path:.*}', proxy_handler)
+    return app
+
+
 def main():
     print(f"""
 ========================================================
@@ -226,7 +374,9 @@ def main():
 ========================================================
   Listening on: http://localhost:{PROXY_PORT}
   Proxying to:  {ANTHROPIC_API_URL}
+  Upstream pool: {f'{POOL_LIMIT_PER_HOST}/host, keep-alive {KEEPALIVE_TIMEOUT:g}s' if POOL_ENABLED else 'Disabled'}
   Toast notifications: {'Enabled' if TOAST_AVAILABLE else 'Disabled'}
+  Server bridge: {SERVER_EVENTS_URL if BRIDGE_ENABLED else 'Disabled'}
 ========================================================
 
 Add to ~/.claude/settings.json:
@@ -237,11 +387,7 @@ Add to ~/.claude/settings.json:
 }}
 """)
 
-    app = web.Application()
-    app.router.add_get('/health', health_check)
-    app.router.add_route('*', '/{path:.*}', proxy_handler)
-
-    web.run_app(app, host='127.0.0.1', port=PROXY_PORT, print=None)
+    web.run_app(create_app(), host='127.0.0.1', port=PROXY_PORT, print=None)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+기록된 트래픽 재생 서버 (api.anthropic.com 대신 사용)
+- traffic_archive 아카이브의 응답을 기록된 청크 단위 / 청크 간 시간 그대로 전송
+  (응답 헤더도 기록된 API 응답 시간(headers_ms)만큼 기다린 뒤 전송)
+- --speed 2 → 2배 빠르게, --speed 0 → 지연 없이 최대 속도
+- 요청 매칭: 같은 메서드 + 경로에서 본문이 같은 기록 우선, 없으면 그 경로의 기록을 순서대로 돌아가며 사용
+
+사용법:
+    python replay_server.py captures/traffic.jsonl.gz --port 3457 --speed 1
+    ANTHROPIC_API_URL=http://127.0.0.1:3457 python proxy.py
+"""
+
+import argparse
+import asyncio
+import itertools
+
+from aiohttp import web
+
+from traffic_archive import load_archive, body_hash
+
+# 재생하지 않는 응답 헤더 (본문은 기록된 청크 그대로 chunked 전송)
+SKIP_RESPONSE_HEADERS = {'content-length', 'content-encoding', 'transfer-encoding', 'connection'}
+
+
+class ReplayUpstream:
+    """아카이브 레코드 → 응답"""
+
+    def __init__(self, records, speed=1.0):
+        self.speed = speed
+        self.served = 0
+        self.unmatched = 0
+        self.by_path = {}  # (method, path) -> [record]
+        self.by_body = {}  # (method, path, request_hash) -> record
+        for record in records:
+            key = (record["method"], record["path"].split('?', 1)[0])
+            self.by_path.setdefault(key, []).append(record)
+            self.by_body[key + (record.get("request_hash"),)] = record
+        self._cycles = {key: itertools.cycle(group) for key, group in self.by_path.items()}
+
+    def match(self, method, path, body):
+        key = (method, path)
+        record = self.by_body.get(key + (body_hash(body),))
+        if record is None and key in self._cycles:
+            record = next(self._cycles[key])
+        return record
+
+    async def handle(self, request):
+        body = await request.read()
+        record = self.match(request.method, request.path, body)
+        if record is None:
+            self.unmatched += 1
+            return web.json_response({
+                "type": "error",
+                "error": {"type": "not_found_error", "message": f"no recording for {request.path}"}
+            }, status=404)
+
+        headers = {k: v for k, v in record["response_headers"].items()
+                   if k.lower() not in SKIP_RESPONSE_HEADERS}
+        response = web.StreamResponse(status=record["status"] or 200, headers=headers)
+        if self.speed > 0 and record["headers_delay"] > 0:
+            await asyncio.sleep(record["headers_delay"] / self.speed)
+        await response.prepare(request)
+        # 응답 헤더 기준 절대 시각으로 맞춤 (sleep 오차가 청크마다 누적되지 않도록)
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        offset = 0.0
+        for delay, data in record["chunks"]:
+            if self.speed > 0 and delay > 0:
+                offset += delay / self.speed
+                wait = started + offset - loop.time()
+                if wait > 0:
+                    await asyncio.sleep(wait)
+            await response.write(data)
+        await response.write_eof()
+        self.served += 1
+        return response
+
+
+def create_app(records, speed=1.0):
+    upstream = ReplayUpstream(records, speed)
+    app = web.Application()
+    app.router.add_route('*', '/{path:.*}', upstream.handle)
+    return app, upstream
+
+
+def main():
+    parser = argparse.ArgumentParser(description="기록된 API 트래픽 재생 서버")
+    parser.add_argument('archive')
+    parser.add_argument('--port', type=int, default=3457)
+    parser.add_argument('--speed', type=float, default=1.0, help="재생 속도 배수 (0 = 지연 없음)")
+    args = parser.parse_args()
+
+    records = load_archive(args.archive)
+    app, _ = create_app(records, args.speed)
+    print(f"[REPLAY] {len(records)} recordings from {args.archive}")
+    print(f"[REPLAY] Listening on http://127.0.0.1:{args.port} (speed x{args.speed:g})")
+    web.run_app(app, host='127.0.0.1', port=args.port, print=None)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+PC 서버(pc/server.py) 연결
+- 프록시가 스트림에서 찾은 tool_use / 텍스트 / 토큰 사용량을 서버로 전달 (서버가 앱에 미리보기로 전송)
+- ws://127.0.0.1:8765/proxy-events 에 WebSocket 하나를 유지, 끊기면 점점 늘어나는 간격으로 재연결
+- publish()는 큐에 넣고 바로 반환 (스트림 전달을 막지 않음), 큐가 가득 차면 오래된 이벤트부터 버림
+- 서버에 연결되지 않은 동안의 이벤트는 버림 (미리보기는 실시간일 때만 의미가 있음)
+"""
+
+import asyncio
+import json
+import os
+from collections import deque
+
+import aiohttp
+
+SERVER_EVENTS_URL = os.environ.get("CLAUDE_REMOTE_PROXY_EVENTS_URL", "ws://127.0.0.1:8765/proxy-events")
+
+# 0이면 서버로 전달하지 않음
+BRIDGE_ENABLED = os.environ.get("PROXY_BRIDGE", "1") != "0"
+
+QUEUE_SIZE = 1000
+
+# 재연결 간격 (초)
+RECONNECT_MIN = 0.5
+RECONNECT_MAX = 10.0
+
+
+class ServerBridge:
+    """프록시 → 서버 이벤트 채널"""
+
+    def __init__(self, url=SERVER_EVENTS_URL, queue_size=QUEUE_SIZE):
+        self.url = url
+        self.queue = deque(maxlen=queue_size)
+        self.connected = False
+        self.sent = 0
+        self.dropped = 0
+        self._wakeup = asyncio.Event()
+        self._task = None
+        self._session = None
+
+    def publish(self, event):
+        if not self.connected:
+            self.dropped += 1
+            return
+        if len(self.queue) == self.queue.maxlen:
+            self.dropped += 1
+        self.queue.append(event)
+        self._wakeup.set()
+
+    async def _send_loop(self, ws):
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            while self.queue:
+                await ws.send_str(json.dumps(self.queue.popleft(), ensure_ascii=False))
+                self.sent += 1
+
+    async def run(self):
+        delay = RECONNECT_MIN
+        while True:
+            try:
+                async with self._session.ws_connect(self.url, heartbeat=30) as ws:
+                    print(f"[BRIDGE] Connected to {self.url}")
+                    self.connected = True
+                    delay = RECONNECT_MIN
+                    sender = asyncio.create_task(self._send_loop(ws))
+                    try:
+                        # 서버가 연결을 닫을 때까지 대기 (서버 → 프록시 메시지는 없음)
+                        async for _ in ws:
+                            pass
+                    finally:
+                        sender.cancel()
+                print("[BRIDGE] Disconnected")
+            except (aiohttp.ClientError, OSError):
+                pass
+            finally:
+                self.connected = False
+                self.queue.clear()
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, RECONNECT_MAX)
+
+    def start(self):
+        self._session = aiohttp.ClientSession()
+        self._task = asyncio.create_task(self.run())
+
+    async def close(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        if self._session:
+            await self._session.close()
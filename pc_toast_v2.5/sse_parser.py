@@ -0,0 +1,157 @@
+"""
+SSE (text/event-stream) 증분 파서
+- 프록시가 받은 청크를 그대로 넣으면 완성된 이벤트만 반환
+- 이벤트 / 줄 / UTF-8 문자가 청크 경계에서 잘려도 다음 청크와 이어서 처리
+- 이미 확인한 부분은 다시 검사하지 않음 (청크마다 새로 들어온 바이트만 탐색)
+- MessageDecoder: 이벤트를 메시지 상태로 모아서 완성된 tool_use(이름 + 전체 입력) 생성
+"""
+
+import json
+
+
+class SSEParser:
+    """feed(chunk) → [(event 이름, data 문자열), ...]"""
+
+    def __init__(self):
+        self._buffer = bytearray()
+        self._scan_from = 0     # 줄바꿈을 아직 찾지 않은 위치
+        self._event = ""
+        self._data = []
+
+    def feed(self, chunk):
+        self._buffer += chunk
+        events = []
+        start = 0
+        while True:
+            end = self._buffer.find(b'\n', max(start, self._scan_from))
+            if end < 0:
+                break
+            line = bytes(self._buffer[start:end])
+            if line.endswith(b'\r'):
+                line = line[:-1]
+            start = end + 1
+            event = self._process_line(line.decode('utf-8', errors='replace'))
+            if event is not None:
+                events.append(event)
+        del self._buffer[:start]
+        self._scan_from = len(self._buffer)
+        return events
+
+    def _process_line(self, line):
+        if not line:
+            # 빈 줄 = 이벤트 끝
+            if not self._data and not self._event:
+                return None
+            event = (self._event or "message", "\n".join(self._data))
+            self._event = ""
+            self._data = []
+            return event
+        if line.startswith(':'):
+            return None  # 주석 (keep-alive)
+        field, _, value = line.partition(':')
+        if value.startswith(' '):
+            value = value[1:]
+        if field == 'event':
+            self._event = value
+        elif field == 'data':
+            self._data.append(value)
+        return None
+
+
+# tool_use 입력 JSON 최대 길이 (문자 수, 넘으면 더 모으지 않고 truncated 표시)
+MAX_TOOL_INPUT_BYTES = 1024 * 1024
+
+
+class _Block:
+    __slots__ = ('type', 'id', 'name', 'input', 'fragments', 'size', 'truncated')
+
+    def __init__(self, content_block):
+        self.type = content_block.get('type', '')
+        self.id = content_block.get('id', '')
+        self.name = content_block.get('name', 'unknown')
+        self.input = content_block.get('input') or {}
+        self.fragments = []
+        self.size = 0
+        self.truncated = False
+
+
+class MessageDecoder:
+    """Messages API 스트림 이벤트(JSON) → 완성된 결과 (요청 하나당 하나)
+    - content block을 index별로 추적, input_json_delta 조각을 모아서 content_block_stop에 한 번만 파싱
+    - 이벤트 하나당 작업은 조각 추가 정도, 블록 / 메시지가 끝나면 상태 해제
+
+    feed()가 반환하는 결과:
+        {"type": "tool_use", "id", "name", "input", "index"}   (truncated / error는 실패 시에만)
+        {"type": "text", "index", "text"}                      (text_delta 조각)
+        {"type": "usage", "usage", "stop_reason"}              (message_delta)
+        {"type": "message_stop", "message_id"}
+    """
+
+    def __init__(self, max_input_bytes=MAX_TOOL_INPUT_BYTES):
+        self.max_input_bytes = max_input_bytes
+        self.message_id = None
+        self.model = None
+        self.blocks = {}  # index -> _Block
+
+    def feed(self, event_data):
+        kind = event_data.get('type')
+        index = event_data.get('index')
+
+        if kind == 'message_start':
+            message = event_data.get('message') or {}
+            self.message_id = message.get('id')
+            self.model = message.get('model')
+            self.blocks.clear()
+            return []
+
+        if kind == 'content_block_start':
+            self.blocks[index] = _Block(event_data.get('content_block') or {})
+            return []
+
+        if kind == 'content_block_delta':
+            delta = event_data.get('delta') or {}
+            delta_type = delta.get('type')
+            if delta_type == 'text_delta':
+                return [{"type": "text", "index": index, "text": delta.get('text', '')}]
+            if delta_type == 'input_json_delta':
+                block = self.blocks.get(index)
+                if block is not None and not block.truncated:
+                    fragment = delta.get('partial_json', '')
+                    block.size += len(fragment)
+                    if block.size > self.max_input_bytes:
+                        block.truncated = True
+                        block.fragments = []
+                    else:
+                        block.fragments.append(fragment)
+            return []
+
+        if kind == 'content_block_stop':
+            block = self.blocks.pop(index, None)
+            if block is None or block.type != 'tool_use':
+                return []
+            return [self._tool_use(index, block)]
+
+        if kind == 'message_delta':
+            return [{
+                "type": "usage",
+                "usage": event_data.get('usage') or {},
+                "stop_reason": (event_data.get('delta') or {}).get('stop_reason')
+            }]
+
+        if kind == 'message_stop':
+            self.blocks.clear()
+            return [{"type": "message_stop", "message_id": self.message_id}]
+
+        return []
+
+    def _tool_use(self, index, block):
+        result = {"type": "tool_use", "id": block.id, "name": block.name,
+                  "input": block.input, "index": index}
+        if block.truncated:
+            result["truncated"] = True
+        elif block.fragments:
+            try:
+                result["input"] = json.loads("".join(block.fragments))
+            except ValueError as e:
+                result["error"] = f"input JSON 파싱 실패: {e}"
+        return result
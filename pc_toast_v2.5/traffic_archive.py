@@ -0,0 +1,114 @@
+"""
+프록시 트래픽 기록 / 재생용 아카이브
+- 요청 하나 = JSON 한 줄 (요청 메서드 / 경로 / 헤더 / 본문, 응답 상태 / 헤더와 헤더까지 걸린 시간,
+  응답 청크와 청크 간 시간)
+- gzip 파일에 한 줄씩 추가 (gzip 멤버를 이어 붙이는 방식이라 중간에 꺼져도 앞 기록은 유지)
+- 인증 헤더(x-api-key, authorization, cookie)는 기록하지 않음
+- 쓰기는 응답이 끝난 뒤 전용 스레드에서 (스트림 전달을 막지 않음)
+
+레코드 형식:
+    {"id", "ts", "method", "path", "request_headers", "request_body" (base64),
+     "status", "response_headers", "headers_ms" (요청 전송 → 응답 헤더),
+     "chunks": [[이전 청크(첫 청크는 헤더)부터의 ms, base64], ...]}
+"""
+
+import base64
+import gzip
+import hashlib
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# 기록하지 않는 요청 헤더
+SECRET_HEADERS = {'x-api-key', 'authorization', 'cookie', 'proxy-authorization'}
+
+
+def body_hash(body):
+    return hashlib.sha1(body).hexdigest()
+
+
+class Exchange:
+    """기록 중인 요청 / 응답 하나"""
+
+    def __init__(self, method, path, headers, body):
+        self.started = time.perf_counter()
+        self.last = self.started
+        self.record = {
+            "ts": time.time(),
+            "method": method,
+            "path": path,
+            "request_headers": {k: v for k, v in headers.items() if k.lower() not in SECRET_HEADERS},
+            "request_body": base64.b64encode(body).decode('ascii'),
+            "request_hash": body_hash(body),
+            "status": None,
+            "response_headers": {},
+            "headers_ms": None,
+            "chunks": []
+        }
+
+    def response(self, status, headers, headers_ms=None):
+        """응답 헤더 수신. headers_ms를 주면 측정 대신 그 값으로 기록 (합성 아카이브용)"""
+        now = time.perf_counter()
+        if headers_ms is None:
+            headers_ms = round((now - self.started) * 1000, 3)
+        self.record["status"] = status
+        self.record["response_headers"] = dict(headers)
+        self.record["headers_ms"] = headers_ms
+        self.last = now
+
+    def chunk(self, data, delay_ms=None):
+        """응답 청크 추가. delay_ms를 주면 측정 대신 그 간격으로 기록 (합성 아카이브용)"""
+        now = time.perf_counter()
+        if delay_ms is None:
+            delay_ms = round((now - self.last) * 1000, 3)
+        self.record["chunks"].append([delay_ms, base64.b64encode(data).decode('ascii')])
+        self.last = now
+
+
+class ArchiveWriter:
+    """Exchange를 아카이브 파일에 추가"""
+
+    def __init__(self, path):
+        self.path = path
+        self.count = 0
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="archive")
+
+    def begin(self, method, path, headers, body):
+        return Exchange(method, path, headers, body)
+
+    def finish(self, exchange):
+        self.count += 1
+        exchange.record["id"] = self.count
+        line = json.dumps(exchange.record, ensure_ascii=False) + "\n"
+        self._executor.submit(self._write, line)
+
+    def _write(self, line):
+        try:
+            with gzip.open(self.path, 'at', encoding='utf-8') as f:
+                f.write(line)
+        except OSError as e:
+            print(f"[RECORD] Write failed: {e}")
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+
+
+def load_archive(path):
+    """아카이브의 레코드 목록 (청크는 (지연 초, bytes), 헤더까지 걸린 시간은 headers_delay 초로 변환)"""
+    records = []
+    opener = gzip.open if path.endswith('.gz') else open
+    with opener(path, 'rt', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue  # 기록 도중 꺼져서 잘린 줄
+            record["request_body"] = base64.b64decode(record.get("request_body", ""))
+            record["headers_delay"] = (record.get("headers_ms") or 0) / 1000
+            record["chunks"] = [(delay / 1000, base64.b64decode(data))
+                                for delay, data in record.get("chunks", [])]
+            records.append(record)
+    return records
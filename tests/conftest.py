@@ -0,0 +1,8 @@
+"""pc/ 와 pc_toast_v2.5/ 모듈은 서로를 파일 이름으로 import하므로 두 폴더를 경로에 추가"""
+
+import os
+import sys
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+for folder in ('pc', 'pc_toast_v2.5'):
+    sys.path.insert(0, os.path.join(ROOT, folder))
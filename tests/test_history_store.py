@@ -0,0 +1,82 @@
+"""HistoryStore.page: 핫 캐시 / SQLite 경로 모두 같은 커서 페이지"""
+
+import asyncio
+
+import pytest
+
+from history_store import HistoryStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = HistoryStore(str(tmp_path / "history.db"), hot_size=10)
+    yield store
+    store.close()
+
+
+def fill(store, count):
+    for i in range(count):
+        store.append({
+            "ts": 1000.0 + i,
+            "tool_name": "Bash" if i % 2 else "Read",
+            "session_id": "a" if i < count // 2 else "b",
+        })
+
+
+def all_pages(store, **filters):
+    """next_cursor를 따라가며 전체 id 목록 (최신 페이지부터)"""
+    ids, cursor = [], None
+    while True:
+        items, cursor = asyncio.run(store.page(cursor=cursor, limit=4, **filters))
+        assert [e["id"] for e in items] == sorted(e["id"] for e in items)
+        ids = [e["id"] for e in items] + ids
+        if cursor is None:
+            return ids
+
+
+def test_append_assigns_ids_and_recent(store):
+    fill(store, 5)
+    assert len(store) == 5
+    assert [e["id"] for e in store.recent(3)] == [3, 4, 5]
+    assert store.recent(0) == []
+
+
+def test_page_from_hot_cache(store):
+    fill(store, 8)
+    items, cursor = asyncio.run(store.page(limit=3))
+    assert [e["id"] for e in items] == [6, 7, 8]
+    assert cursor == 6
+    assert all_pages(store) == list(range(1, 9))
+
+
+def test_page_falls_back_to_db(store):
+    # 핫 캐시(10개)보다 오래된 항목은 DB에서 조회
+    fill(store, 25)
+    assert all_pages(store) == list(range(1, 26))
+    items, cursor = asyncio.run(store.page(cursor=5, limit=10))
+    assert [e["id"] for e in items] == [1, 2, 3, 4]
+    assert cursor is None
+
+
+def test_page_filters(store):
+    fill(store, 25)
+    assert all_pages(store, tool_name="Bash") == list(range(2, 26, 2))
+    assert all_pages(store, session_id="a") == list(range(1, 13))
+    assert all_pages(store, since=1020.0) == list(range(21, 26))
+    assert all_pages(store, since=1003.0, until=1006.0) == [4, 5, 6, 7]
+
+
+def test_reload_keeps_history(tmp_path):
+    path = str(tmp_path / "history.db")
+    first = HistoryStore(path, hot_size=10)
+    fill(first, 15)
+    first.close()
+
+    second = HistoryStore(path, hot_size=10)
+    try:
+        assert len(second) == 15
+        assert [e["id"] for e in second.recent(2)] == [14, 15]
+        assert second.append({"ts": 2000.0})["id"] == 16
+        assert all_pages(second)[:3] == [1, 2, 3]
+    finally:
+        second.close()
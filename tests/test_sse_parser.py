@@ -0,0 +1,133 @@
+"""SSEParser: 청크 경계와 상관없이 같은 이벤트
+MessageDecoder: input_json_delta 조각 → 완성된 tool_use 입력"""
+
+import json
+from itertools import zip_longest
+
+from sse_parser import MessageDecoder, SSEParser
+
+
+def sse(name, data):
+    return f"event: {name}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n".encode('utf-8')
+
+
+STREAM = b"".join([
+    sse("message_start", {"type": "message_start", "message": {"id": "msg_1"}}),
+    b": keep-alive\n\n",
+    sse("content_block_delta", {"type": "content_block_delta", "index": 0,
+                                "delta": {"type": "text_delta", "text": "안녕하세요"}}),
+    sse("message_stop", {"type": "message_stop"}),
+])
+
+
+def parse_in_chunks(data, size):
+    parser = SSEParser()
+    events = []
+    for i in range(0, len(data), size):
+        events.extend(parser.feed(data[i:i + size]))
+    return events
+
+
+def test_whole_stream():
+    events = SSEParser().feed(STREAM)
+    assert [name for name, _ in events] == ["message_start", "content_block_delta", "message_stop"]
+    assert json.loads(events[1][1])["delta"]["text"] == "안녕하세요"
+
+
+def test_split_at_every_byte():
+    # 줄 / 이벤트 / UTF-8 문자가 청크 경계에서 잘려도 결과가 같음
+    assert parse_in_chunks(STREAM, 1) == SSEParser().feed(STREAM)
+
+
+def test_split_at_various_sizes():
+    expected = SSEParser().feed(STREAM)
+    for size in (2, 3, 7, 16, 64):
+        assert parse_in_chunks(STREAM, size) == expected
+
+
+def test_crlf_and_multiline_data():
+    events = SSEParser().feed(b"event: x\r\ndata: a\r\ndata: b\r\n\r\n")
+    assert events == [("x", "a\nb")]
+
+
+def test_default_event_name_and_incomplete_tail():
+    parser = SSEParser()
+    assert parser.feed(b"data: 1\n\ndata: 2\n") == [("message", "1")]
+    assert parser.feed(b"\n") == [("message", "2")]
+
+
+def tool_use_events(tool_input, index=1, step=5):
+    raw = json.dumps(tool_input)
+    events = [{"type": "content_block_start", "index": index,
+               "content_block": {"type": "tool_use", "id": "toolu_1", "name": "Bash", "input": {}}}]
+    events += [{"type": "content_block_delta", "index": index,
+                "delta": {"type": "input_json_delta", "partial_json": raw[i:i + step]}}
+               for i in range(0, len(raw), step)]
+    events.append({"type": "content_block_stop", "index": index})
+    return events
+
+
+def decode(decoder, events):
+    results = []
+    for event in events:
+        results.extend(decoder.feed(event))
+    return results
+
+
+def test_decoder_reassembles_tool_input():
+    tool_input = {"command": "pytest -q tests/", "description": "Run \"tests\""}
+    decoder = MessageDecoder()
+    results = decode(decoder, [{"type": "message_start", "message": {"id": "msg_1"}}]
+                     + tool_use_events(tool_input)
+                     + [{"type": "message_stop"}])
+    assert results == [
+        {"type": "tool_use", "id": "toolu_1", "name": "Bash", "input": tool_input, "index": 1},
+        {"type": "message_stop", "message_id": "msg_1"},
+    ]
+    assert decoder.blocks == {}
+
+
+def test_decoder_text_and_usage():
+    decoder = MessageDecoder()
+    results = decode(decoder, [
+        {"type": "content_block_start", "index": 0, "content_block": {"type": "text", "text": ""}},
+        {"type": "content_block_delta", "index": 0, "delta": {"type": "text_delta", "text": "hi"}},
+        {"type": "content_block_stop", "index": 0},
+        {"type": "message_delta", "delta": {"stop_reason": "tool_use"}, "usage": {"output_tokens": 3}},
+    ])
+    assert results == [
+        {"type": "text", "index": 0, "text": "hi"},
+        {"type": "usage", "usage": {"output_tokens": 3}, "stop_reason": "tool_use"},
+    ]
+
+
+def test_decoder_interleaved_blocks():
+    # 두 블록의 조각이 번갈아 도착해도 index별로 모음
+    a = tool_use_events({"command": "ls"}, index=1)
+    b = tool_use_events({"file_path": "/tmp/x"}, index=2)
+    deltas = [e for pair in zip_longest(a[1:-1], b[1:-1]) for e in pair if e is not None]
+    events = [a[0], b[0]] + deltas + [a[-1], b[-1]]
+    results = decode(MessageDecoder(), events)
+    assert [r["input"] for r in results] == [{"command": "ls"}, {"file_path": "/tmp/x"}]
+
+
+def test_decoder_input_limit_and_invalid_json():
+    truncated = decode(MessageDecoder(max_input_bytes=10), tool_use_events({"command": "x" * 50}))
+    assert truncated[0]["truncated"] is True
+    assert truncated[0]["input"] == {}
+
+    events = tool_use_events({"command": "ls"})
+    events[1]["delta"]["partial_json"] = "{broken"
+    invalid = decode(MessageDecoder(), events)
+    assert "error" in invalid[0]
+
+
+def test_decoder_from_sse_chunks():
+    # 프록시처럼 바이트 청크 → SSEParser → MessageDecoder
+    stream = b"".join(sse(e["type"], e) for e in tool_use_events({"command": "echo 안녕"}))
+    parser, decoder = SSEParser(), MessageDecoder()
+    results = []
+    for i in range(0, len(stream), 3):
+        for _, data in parser.feed(stream[i:i + 3]):
+            results.extend(decoder.feed(json.loads(data)))
+    assert results[0]["input"] == {"command": "echo 안녕"}
@@ -0,0 +1,98 @@
+"""WindowRegistry + FakeBackend (Windows API 없이 실행)"""
+
+import asyncio
+
+from window_registry import FakeBackend, WindowRegistry
+
+
+def make_registry(ttl=60.0):
+    backend = FakeBackend([
+        {'title': 'claude', 'class_name': 'ConsoleWindowClass', 'hwnd': 1},
+        {'title': 'notepad', 'class_name': 'Notepad', 'hwnd': 2},
+    ])
+    return backend, WindowRegistry(backend, ttl=ttl)
+
+
+def test_scan_returns_claude_windows_only():
+    backend, registry = make_registry()
+    windows = asyncio.run(registry.scan())
+    assert [w['hwnd'] for w in windows] == [1]
+    assert windows[0]['title'] == '[Terminal] claude'
+    assert backend.enum_calls == 1
+
+
+def test_scan_is_cached_within_ttl():
+    backend, registry = make_registry()
+
+    async def scan_twice():
+        await registry.scan()
+        backend.add_window('claude 2', hwnd=3)
+        return await registry.scan()
+
+    windows = asyncio.run(scan_twice())
+    assert [w['hwnd'] for w in windows] == [1]
+    assert backend.enum_calls == 1
+
+
+def test_scan_after_ttl_expires():
+    backend, registry = make_registry(ttl=0)
+
+    async def scan_twice():
+        await registry.scan()
+        backend.add_window('claude 2', hwnd=3)
+        return await registry.scan()
+
+    windows = asyncio.run(scan_twice())
+    assert sorted(w['hwnd'] for w in windows) == [1, 3]
+    assert backend.enum_calls == 2
+
+
+def test_invalidate_and_force_rescan():
+    backend, registry = make_registry()
+
+    async def run():
+        await registry.scan()
+        backend.add_window('claude 2', hwnd=3)
+        registry.invalidate()
+        first = await registry.scan()
+        backend.remove_window(3)
+        second = await registry.scan(force=True)
+        return first, second
+
+    first, second = asyncio.run(run())
+    assert sorted(w['hwnd'] for w in first) == [1, 3]
+    assert [w['hwnd'] for w in second] == [1]
+    assert backend.enum_calls == 3
+
+
+def test_lookup_uses_cache_then_backend():
+    backend, registry = make_registry()
+
+    async def run():
+        await registry.scan()
+        cached = await registry.lookup(1)
+        # 캐시에 없는 창은 백엔드에 직접 조회
+        backend.add_window('late', hwnd=4)
+        late = await registry.lookup(4)
+        missing = await registry.lookup(99)
+        empty = await registry.lookup(None)
+        return cached, late, missing, empty
+
+    cached, late, missing, empty = asyncio.run(run())
+    assert cached == 'claude'
+    assert late == 'late'
+    assert missing is None
+    assert empty is None
+    assert backend.enum_calls == 1
+
+
+def test_lookup_after_window_closed():
+    backend, registry = make_registry()
+
+    async def run():
+        await registry.scan()
+        backend.remove_window(1)
+        registry.invalidate()
+        return await registry.lookup(1)
+
+    assert asyncio.run(run()) is None